@@ -0,0 +1,35 @@
+"""Helpers shared by benchmarks."""
+
+import tracemalloc
+from typing import Any, Callable, Optional, Tuple, TypeVar
+
+from justree import Tree
+
+R = TypeVar('R')
+
+
+def build(n: int, fanout: int = 8, value: Optional[Callable[[int], Any]] = None) -> Tree:
+    """
+    :param n: number of nodes
+    :param fanout: number of children of every inner node, the last one may have fewer
+    :param value: value of node by its breadth first number, the number itself by default
+    :return: tree of nodes numbered in breadth first order
+    """
+    nodes = [Tree(0 if value is None else value(0))]
+    for i in range(1, n):
+        c = Tree(i if value is None else value(i))
+        nodes[(i - 1) // fanout].append(c)
+        nodes.append(c)
+    return nodes[0]
+
+
+def traced(f: Callable[[], R]) -> Tuple[R, int]:
+    """
+    :return: result of ``f()`` and bytes it allocated and kept
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    r = f()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return r, after - before
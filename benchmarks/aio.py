@@ -0,0 +1,74 @@
+"""Latency of an asyncio event loop while a tree is traversed: the longest pause of a task
+ticking every millisecond during synchronous :meth:`justree.Tree.dfs`/:meth:`justree.Tree.size`
+and during :meth:`justree.Tree.adfs`/:meth:`justree.Tree.asize` with several batch sizes.
+
+Run from the repository root:
+
+$ python -m benchmarks.aio [nodes]
+"""
+
+import asyncio
+import sys
+from time import perf_counter
+from typing import Awaitable, Callable, Tuple
+
+from justree import Tree
+from benchmarks._common import build
+
+
+async def measure(work: Callable[[], Awaitable]) -> Tuple[float, float]:
+    """
+    :return: total time of work and the longest pause of ticking task
+    """
+    pause = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal pause
+        last = perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = perf_counter()
+            pause = max(pause, now - last)
+            last = now
+
+    task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0.01)
+    start = perf_counter()
+    await work()
+    total = perf_counter() - start
+    done = True
+    await task
+    return total, pause
+
+
+async def main_async(tree: Tree) -> None:
+    async def sync_work():
+        sum(1 for _ in tree.dfs())
+        tree.size()
+
+    total, pause = await measure(sync_work)
+    print(f'dfs + size:           total {total:8.4f}s, longest pause {pause * 1000:9.2f}ms')
+    for batch in (1_000, 10_000, 100_000):
+        async def async_work():
+            async for _ in tree.adfs(batch=batch):
+                pass
+            await tree.asize(batch)
+
+        total, pause = await measure(async_work)
+        print(f'adfs + asize {batch:7}: total {total:8.4f}s, longest pause {pause * 1000:9.2f}ms')
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f'nodes: {n}')
+    # asyncio.run() appeared in Python 3.7
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(main_async(build(n)))
+    finally:
+        loop.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Timings of conversions between trees and NumPy arrays (requires ``numpy``)
+compared with tuples, and of vectorized subtree sums compared with :meth:`justree.Tree.fold`.
+
+Run from the repository root:
+
+$ python -m benchmarks.arrays [nodes]
+"""
+
+import sys
+from timeit import timeit
+
+import numpy as np
+
+from justree import Tree
+from justree.arrays import TreeArrays
+from benchmarks._common import build
+
+
+def subtree_sums(arrays: TreeArrays) -> np.ndarray:
+    # subtree of node k occupies pre-order numbers k .. k + size[k] - 1
+    sums = np.concatenate(([0], np.cumsum(arrays.values)))
+    return sums[np.arange(len(arrays.size)) + arrays.size] - sums[:-1]
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tree = build(n)
+    tpl = tree.to_tuple()
+    arrays = tree.to_arrays()
+    print(f'nodes: {n}')
+    print(f'to_tuple():       {timeit(tree.to_tuple, number=1):8.4f}s')
+    print(f'to_arrays():      {timeit(tree.to_arrays, number=1):8.4f}s')
+    print(f'from_tuple():     {timeit(lambda: Tree.from_tuple(tpl), number=1):8.4f}s')
+    from_arrays = timeit(lambda: Tree.from_arrays(arrays.values, arrays.parent), number=1)
+    print(f'from_arrays():    {from_arrays:8.4f}s')
+    # sums of all subtrees against the sum of the whole tree
+    print(f'fold() sum:       {timeit(lambda: tree.fold(int, lambda v, r: v + sum(r)), number=1):8.4f}s')
+    print(f'vectorized sums:  {timeit(lambda: subtree_sums(arrays), number=1):8.4f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""Timings of polling :meth:`justree.Tree.size`/:meth:`justree.Tree.height` between mutations
+of a plain and of an augmented (:meth:`justree.Tree.augment`) tree.
+
+Run from the repository root:
+
+$ python -m benchmarks.augment [nodes] [mutations]
+"""
+
+import sys
+from timeit import timeit
+
+from justree import Tree
+from benchmarks._common import build
+
+
+def poll(tree: Tree, mutations: int) -> None:
+    for i in range(mutations):
+        tree[(i % 8, i % 7, i % 6)].emplace(i)
+        tree.size()
+        tree[i % 8].height()
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    mutations = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    plain = build(n)
+    augmented = build(n)
+    print(f'nodes: {n}, mutations: {mutations}')
+    print(f'augment():  {timeit(augmented.augment, number=1):8.4f}s')
+    print(f'plain:      {timeit(lambda: poll(plain, mutations), number=1):8.4f}s')
+    print(f'augmented:  {timeit(lambda: poll(augmented, mutations), number=1):8.4f}s')
+
+
+if __name__ == '__main__':
+    main()
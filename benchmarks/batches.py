@@ -0,0 +1,54 @@
+"""Timings of visiting all nodes one by one by :meth:`justree.Tree.bfs`/:meth:`justree.Tree.dfs`
+and in lists by :meth:`justree.Tree.bfs_batches`, :meth:`justree.Tree.dfs_batches` and
+:meth:`justree.Tree.levels`, alone and with values stored into in-memory SQLite table
+row by row and by ``executemany`` per list.
+
+Run from the repository root:
+
+$ python -m benchmarks.batches [nodes] [batch size]
+"""
+
+import sqlite3
+import sys
+from collections import deque
+from operator import attrgetter
+from timeit import timeit
+
+from justree import Tree
+from benchmarks._common import build
+
+row = attrgetter('value', '_height')
+
+
+def store_one_by_one(nodes) -> None:
+    with sqlite3.connect(':memory:') as db:
+        db.execute('create table nodes (value integer, height integer)')
+        for t in nodes:
+            db.execute('insert into nodes values (?, ?)', row(t))
+
+
+def store_in_lists(batches) -> None:
+    with sqlite3.connect(':memory:') as db:
+        db.execute('create table nodes (value integer, height integer)')
+        for b in batches:
+            db.executemany('insert into nodes values (?, ?)', map(row, b))
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    tree: Tree = build(n)
+    print(f'nodes: {n}, batch size: {size}')
+    for name, nodes, batches in (('bfs', tree.bfs, lambda: tree.bfs_batches(size)),
+                                 ('levels', tree.bfs, tree.levels),
+                                 ('dfs', tree.dfs, lambda: tree.dfs_batches(size))):
+        one = timeit(lambda: deque(nodes(), 0), number=1)
+        many = timeit(lambda: deque(batches(), 0), number=1)
+        print(f'{name:6} traversal:  nodes {one:8.4f}s, lists {many:8.4f}s')
+        one = timeit(lambda: store_one_by_one(nodes()), number=1)
+        many = timeit(lambda: store_in_lists(batches()), number=1)
+        print(f'{name:6} to SQLite:  nodes {one:8.4f}s, lists {many:8.4f}s')
+
+
+if __name__ == '__main__':
+    main()
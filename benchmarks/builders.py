@@ -0,0 +1,59 @@
+"""Throughput (nodes/second) of bulk builders of :class:`justree.Tree` compared with
+the legacy :meth:`justree.Tree.from_tuple` appending nodes one by one. Garbage collector
+stays enabled as in a regular program.
+
+Run from the repository root:
+
+$ python -m benchmarks.builders [nodes]
+"""
+
+import sys
+from collections import deque
+from itertools import repeat
+from timeit import timeit
+
+from justree import Tree
+from benchmarks._common import build
+
+
+def legacy_from_tuple(itr: tuple) -> Tree:
+    t = Tree(itr[0])
+    q = deque(zip(itr[1], repeat(t)))
+    while q:
+        (d, i), p = q.popleft()
+        nt = Tree(d)
+        p.append(nt)
+        q.extend(zip(i, repeat(nt)))
+    return t
+
+
+def to_dict(tree: Tree) -> dict:
+    return tree.fold(lambda v: {v: None}, lambda v, r: {v: {k: c for d in r for k, c in d.items()}})
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tree = build(n)
+    tpl = tree.to_tuple()
+    values, counts = tree.to_preorder()
+    parents = [-1] + [(i - 1) // 8 for i in range(1, n)]
+    bfs_values = [t.value for t in tree.bfs()]
+    paths = [(p, t.value) for t, _, p in tree.bfs_ex()]
+    d = to_dict(tree)
+    builders = [
+        ('legacy from_tuple()', lambda: legacy_from_tuple(tpl)),
+        ('from_tuple()', lambda: Tree.from_tuple(tpl)),
+        ('from_preorder()', lambda: Tree.from_preorder(values, counts)),
+        ('from_parents()', lambda: Tree.from_parents(bfs_values, parents)),
+        ('from_paths()', lambda: Tree.from_paths(paths)),
+        ('from_dict()', lambda: Tree.from_dict(d)),
+    ]
+    print(f'nodes: {n}')
+    for name, f in builders:
+        assert f() == tree
+        seconds = min(timeit(f, 'gc.enable()', number=1) for _ in range(3))
+        print(f'{name:22}{seconds:8.4f}s {n / seconds / 1e6:6.2f}M nodes/s')
+
+
+if __name__ == '__main__':
+    main()
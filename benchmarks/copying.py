@@ -0,0 +1,55 @@
+"""Timings of shallow and deep copies of a tree by legacy engines appending nodes one by one
+and by the current ones, and of a single change of a frozen tree made on a full writable
+clone and on a copy-on-write clone (:meth:`justree.Tree.unfreeze` with ``cow=True``).
+
+Run from the repository root:
+
+$ python -m benchmarks.copying [nodes]
+"""
+
+import sys
+from collections import deque
+from copy import copy, deepcopy
+from itertools import repeat
+from timeit import timeit
+
+from justree import Tree
+from benchmarks._common import build
+
+
+def legacy_copy(self: Tree, copy_value=None) -> Tree:
+    memo = {}
+    t = Tree(self.value if copy_value is None else copy_value(self.value))
+    memo[id(self)] = t
+    q = deque(zip(self._children, repeat(t)))
+    while q:
+        ct, p = q.popleft()
+        if id(ct) in memo:
+            nt = memo[id(ct)]
+        else:
+            nt = Tree(ct.value if copy_value is None else copy_value(ct.value))
+        p.append(nt)
+        q.extend(zip(ct._children, repeat(nt)))
+    return t
+
+
+def change(tree: Tree, cow: bool) -> None:
+    clone = tree.unfreeze(cow=cow)
+    clone.insert((3, 2, 1, 0), Tree(-1))
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    tree = build(n)
+    print(f'nodes: {n}')
+    print(f'legacy copy:      {timeit(lambda: legacy_copy(tree), "gc.enable()", number=1):8.4f}s')
+    print(f'copy:             {timeit(lambda: copy(tree), "gc.enable()", number=1):8.4f}s')
+    print(f'legacy deepcopy:  {timeit(lambda: legacy_copy(tree, deepcopy), "gc.enable()", number=1):8.4f}s')
+    print(f'deepcopy:         {timeit(lambda: deepcopy(tree), "gc.enable()", number=1):8.4f}s')
+    tree.freeze()
+    print(f'clone + change:   {timeit(lambda: change(tree, False), "gc.enable()", number=1):8.4f}s')
+    print(f'cow + change:     {timeit(lambda: change(tree, True), "gc.enable()", number=1):8.4f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Timings of visiting nodes of a tree down to the first rejected node on each branch
+by filtering a full traversal and by pruned traversal (``descend`` argument).
+
+Run from the repository root:
+
+$ python -m benchmarks.descend [nodes]
+"""
+
+import sys
+from timeit import timeit
+
+from justree import Tree
+from benchmarks._common import build
+
+
+def accepted(t: Tree) -> bool:
+    return t.value % 8 != 3
+
+
+def filtered(tree: Tree) -> list:
+    # without pruning subtrees of rejected nodes are traversed and skipped
+    return [t for t, _, p in tree.dfs_ex(paths='lazy')
+            if all(accepted(tree[p[:k]]) for k in range(len(p)))]
+
+
+def pruned(tree: Tree) -> list:
+    return list(tree.dfs(descend=accepted))
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tree = build(n)
+    print(f'nodes: {n}, visited: {len(pruned(tree))}')
+    print(f'full dfs():  {timeit(lambda: list(tree.dfs()), number=1):8.4f}s')
+    print(f'filtered:    {timeit(lambda: filtered(tree), number=1):8.4f}s')
+    print(f'pruned:      {timeit(lambda: pruned(tree), number=1):8.4f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Timings of :meth:`justree.Tree.diff` of two near-identical trees, writable ones hashed
+from scratch and frozen ones sharing subtrees with cached hashes, compared with a plain
+equality check of identical trees, and of :meth:`justree.Tree.apply` of the edit script
+to a copy-on-write clone.
+
+Run from the repository root:
+
+$ python -m benchmarks.diff [nodes] [changes]
+"""
+
+import sys
+from timeit import timeit
+
+from justree import Tree
+from benchmarks._common import build
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    changes = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    a = build(n)
+    a.freeze()
+    hash(a)
+    b = a.unfreeze(cow=True)
+    for i in range(changes):
+        b.thaw((i % 8, i % 7, i % 6)).value = -i
+        b.insert((i % 8, 0, i % 5), Tree(-i))
+    b.freeze()
+    wa, wb, wc = a.clone(), b.clone(), a.clone()
+    patch = a.diff(b)
+    print(f'nodes: {n}, changes: {changes}, operations: {len(patch)}')
+    print(f'equality:         {timeit(lambda: wa == wc, number=1):8.4f}s')
+    print(f'writable diff:    {timeit(lambda: wa.diff(wb), number=1):8.4f}s')
+    print(f'frozen diff:      {timeit(lambda: a.diff(b), number=1):8.4f}s')
+    print(f'cow apply:        {timeit(lambda: a.unfreeze(cow=True).apply(patch), number=1):8.4f}s')
+
+
+if __name__ == '__main__':
+    main()
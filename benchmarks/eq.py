@@ -0,0 +1,56 @@
+"""Timings of tree equality on equal and unequal million-node trees, compared with the former
+implementation that returned early by raising ``AssertionError`` wrapping the result.
+
+Run from the repository root:
+
+$ python -m benchmarks.eq [nodes]
+"""
+
+import sys
+from collections import deque
+from timeit import timeit
+from typing import Any, NamedTuple
+
+from justree import Tree
+from benchmarks._common import build
+
+
+class ImmediateReturn(NamedTuple):
+    retval: Any
+
+
+def assert_eq(self: Tree, other: object) -> bool:
+    """Former implementation of :func:`justree.tree.non_recursive_tree_eq`"""
+    try:
+        assert isinstance(other, Tree), ImmediateReturn(False)
+        q = deque([(self, other)])
+        while q:
+            f, s = q.popleft()
+            assert f.value == s.value and len(f._children) == len(s._children), ImmediateReturn(False)
+            q.extend(zip(f._children, s._children))
+        return True
+    except AssertionError as err:
+        if err.args and isinstance(err.args[0], ImmediateReturn):
+            return err.args[0].retval
+        raise
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    # the last node of c differs
+    a, b, c = build(n), build(n), build(n, value=lambda i: i + (i == n - 1))
+    print(f'nodes: {n}')
+    print(f'{"":>24} {"assert":>9} {"plain":>9}')
+    for name, x, y in (('equal', a, b), ('unequal (last node)', a, c)):
+        old = timeit(lambda: assert_eq(x, y), number=1)
+        new = timeit(lambda: x == y, number=1)
+        print(f'{name:>24} {old:8.4f}s {new:8.4f}s')
+    for t in (a, b, c):
+        t.freeze()
+        hash(t)
+    new = timeit(lambda: a == c, number=1)
+    print(f'{"unequal, frozen+hashed":>24} {"":>9} {new:8.4f}s')
+
+
+if __name__ == '__main__':
+    main()
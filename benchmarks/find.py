@@ -0,0 +1,44 @@
+"""Timings of searching nodes by value with a loop over :meth:`justree.Tree.dfs`
+and with :meth:`justree.Tree.find` of writable and of frozen tree.
+
+Run from the repository root:
+
+$ python -m benchmarks.find [nodes] [searches]
+"""
+
+import random
+import sys
+from timeit import timeit
+
+from justree import Tree
+from benchmarks._common import build
+
+
+def loop(tree: Tree, values: list) -> None:
+    for v in values:
+        for t in tree.dfs():
+            if t.value == v:
+                break
+
+
+def find(tree: Tree, values: list) -> None:
+    for v in values:
+        tree.find(v)
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    searches = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    tree = build(n)
+    rnd = random.Random(0)
+    values = [rnd.randrange(n) for _ in range(searches)]
+    print(f'nodes: {n}, searches: {searches}')
+    print(f'dfs loop:        {timeit(lambda: loop(tree, values), number=1):8.4f}s')
+    print(f'find writable:   {timeit(lambda: find(tree, values), number=1):8.4f}s')
+    tree.freeze()
+    print(f'index_by():      {timeit(tree.index_by, number=1):8.4f}s')
+    print(f'find frozen:     {timeit(lambda: find(tree, values), number=1):8.4f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Timings of subtree sums computed by post-order traversal with results kept in a dict
+by ``id()`` of nodes and by :meth:`justree.Tree.fold`.
+
+Run from the repository root:
+
+$ python -m benchmarks.fold [nodes]
+"""
+
+import sys
+from timeit import timeit
+
+from justree import Tree
+from benchmarks._common import build
+
+
+def post_order(tree: Tree) -> int:
+    r = {}
+    for t in tree.dfs(post_order=True):
+        r[id(t)] = t.value + sum(r.pop(id(c)) for c in t)
+    return r[id(tree)]
+
+
+def fold(tree: Tree) -> int:
+    return tree.fold(lambda v: v, lambda v, sums: v + sum(sums))
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tree = build(n)
+    assert post_order(tree) == fold(tree)
+    print(f'nodes: {n}')
+    print(f'post-order + dict:  {timeit(lambda: post_order(tree), number=1):8.4f}s')
+    print(f'fold():             {timeit(lambda: fold(tree), number=1):8.4f}s')
+    # branches are frozen, the root stays writable
+    for t in tree:
+        t.freeze()
+    print(f'fold() memoizing:   {timeit(lambda: tree.fold(value_of, sum_of, memoize=True), number=1):8.4f}s')
+    tree.emplace(n)
+    print(f'fold() memoized:    {timeit(lambda: tree.fold(value_of, sum_of, memoize=True), number=1):8.4f}s')
+
+
+def value_of(v: int) -> int:
+    return v
+
+
+def sum_of(v: int, sums: tuple) -> int:
+    return v + sum(sums)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Frozen :class:`justree.Tree` versus packed :class:`justree.FrozenTree`:
+memory per node and timings of read-only operations.
+
+Run from the repository root:
+
+$ python -m benchmarks.frozen_tree [nodes]
+"""
+
+import sys
+from timeit import timeit
+
+from benchmarks._common import build, traced
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tree, tree_bytes = traced(lambda: build(n))
+    tree.freeze()
+    frozen, frozen_bytes = traced(lambda: tree.freeze(compact=True))
+    print(f'nodes: {n}')
+    print(f'{"":>12} {"Tree":>10} {"FrozenTree":>10}')
+    print(f'{"bytes/node":>12} {tree_bytes / n:10.1f} {frozen_bytes / n:10.1f}')
+    cases = {
+        'bfs': lambda t: sum(1 for _ in t.bfs()),
+        'dfs': lambda t: sum(1 for _ in t.dfs()),
+        'dfs_ex': lambda t: sum(1 for _ in t.dfs_ex()),
+        'size': lambda t: t.size(),
+        'height': lambda t: t.height(),
+        'hash': lambda t: hash(t),
+        'getitem': lambda t: t[7, 7, 7],
+    }
+    for name, case in cases.items():
+        a = timeit(lambda: case(tree), number=1)
+        b = timeit(lambda: case(frozen), number=1)
+        print(f'{name:>12} {a:9.4f}s {b:9.4f}s')
+    other = build(n)
+    other_frozen = other.freeze(compact=True)
+    a = timeit(lambda: tree == other, number=1)
+    b = timeit(lambda: frozen == other_frozen, number=1)
+    print(f'{"eq":>12} {a:9.4f}s {b:9.4f}s')
+    # packing is paid once per tree, it takes about as long as building the tree
+    a = timeit(lambda: tree == build(n), number=1)
+    b = timeit(lambda: frozen == build(n).freeze(compact=True), number=1)
+    print(f'{"build+eq":>12} {a:9.4f}s {b:9.4f}s')
+
+
+if __name__ == '__main__':
+    main()
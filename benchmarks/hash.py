@@ -0,0 +1,46 @@
+"""Timings of hashing frozen trees: the first hash of a large tree and hashing of new roots
+built over already hashed frozen subtrees, compared with the former ``dfs()`` fold.
+
+Run from the repository root:
+
+$ python -m benchmarks.hash [nodes]
+"""
+
+import sys
+from timeit import timeit
+
+from justree import Tree
+from benchmarks._common import build
+
+
+def fold_hash(self: Tree) -> int:
+    """Former implementation of :func:`justree.tree.non_recursive_tree_hash`"""
+    h = 0
+    for t in self.dfs():
+        h = hash((h, hash(t.value)))
+    return h
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    base = build(n)
+    base.freeze()
+    print(f'nodes: {n}')
+    print(f'{"":>28} {"dfs fold":>9} {"merkle":>9}')
+    old = timeit(lambda: fold_hash(base), number=1)
+    new = timeit(lambda: hash(base), number=1)
+    print(f'{"first hash":>28} {old:8.4f}s {new:8.4f}s')
+
+    def new_roots(f):
+        for i in range(100):
+            t = Tree(i, (base, base[i % 8]))
+            t.freeze()
+            f(t)
+
+    old = timeit(lambda: new_roots(fold_hash), number=1)
+    new = timeit(lambda: new_roots(hash), number=1)
+    print(f'{"100 new roots over subtrees":>28} {old:8.4f}s {new:8.4f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Memory of many frozen trees sharing large identical subtrees with and without interning,
+and timings of equality between them.
+
+Run from the repository root:
+
+$ python -m benchmarks.intern [trees] [subtree_nodes]
+"""
+
+import sys
+from timeit import timeit
+
+from justree import Tree, TreeInterner
+from benchmarks._common import build, traced
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+
+    def subtree(root: int) -> Tree:
+        return build(n, 4, lambda i: i % 100 if i else root)
+
+    def plain():
+        trees = [Tree(k, (subtree(0), subtree(k % 3))) for k in range(count)]
+        for t in trees:
+            t.freeze()
+        return trees
+
+    def interned():
+        interner = TreeInterner()
+        return interner, [interner.intern(Tree(k, (subtree(0), subtree(k % 3)))) for k in range(count)]
+
+    trees, plain_bytes = traced(plain)
+    (_, canonical), interned_bytes = traced(interned)
+    print(f'{count} trees of {trees[0].size()} nodes')
+    print(f'plain:    {plain_bytes / 2 ** 20:9.1f} MiB')
+    print(f'interned: {interned_bytes / 2 ** 20:9.1f} MiB')
+    print(f'eq plain subtrees:    {timeit(lambda: trees[0][0] == trees[1][0], number=10) / 10:.6f}s')
+    print(f'eq interned subtrees: {timeit(lambda: canonical[0][0] == canonical[1][0], number=10) / 10:.6f}s')
+    print(f'ne interned trees:    {timeit(lambda: canonical[0] == canonical[1], number=10) / 10:.6f}s')
+
+
+if __name__ == '__main__':
+    main()
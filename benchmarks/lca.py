@@ -0,0 +1,53 @@
+"""Timings of lowest common ancestor queries by search of node paths
+and by :meth:`justree.Tree.lca_index`.
+
+Run from the repository root:
+
+$ python -m benchmarks.lca [nodes] [queries]
+"""
+
+import random
+import sys
+from timeit import timeit
+
+from justree import Tree
+from benchmarks._common import build
+
+
+def search(tree: Tree, pairs: list) -> None:
+    for a, b in pairs:
+        paths = {}
+        for t, _, p in tree.dfs_ex(paths='lazy'):
+            if t is a or t is b:
+                paths[id(t)] = p
+                if len(paths) == 2:
+                    break
+        pa, pb = paths[id(a)].to_tuple(), paths[id(b)].to_tuple()
+        k = 0
+        while k < min(len(pa), len(pb)) and pa[k] == pb[k]:
+            k += 1
+        tree[pa[:k]]
+
+
+def indexed(tree: Tree, pairs: list) -> None:
+    index = tree.lca_index()
+    for a, b in pairs:
+        index.lca(a, b)
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    tree = build(n)
+    tree.freeze()
+    nodes = list(tree.dfs())
+    rnd = random.Random(0)
+    pairs = [(rnd.choice(nodes), rnd.choice(nodes)) for _ in range(queries)]
+    print(f'nodes: {n}, queries: {queries}')
+    print(f'search:        {timeit(lambda: search(tree, pairs), number=1):8.4f}s')
+    print(f'lca_index():   {timeit(tree.lca_index, number=1):8.4f}s')
+    print(f'indexed:       {timeit(lambda: indexed(tree, pairs), number=1):8.4f}s')
+
+
+if __name__ == '__main__':
+    main()
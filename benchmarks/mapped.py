@@ -0,0 +1,57 @@
+"""Startup and query timings of a memory mapped frozen tree (:meth:`justree.FrozenTree.open`)
+compared with parsing the same tree by :meth:`justree.Tree.load` and :meth:`justree.Tree.from_tuple`.
+
+Run from the repository root:
+
+$ python -m benchmarks.mapped [nodes]
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+from timeit import timeit
+
+from justree import FrozenTree, Tree
+from justree.serialization import IntCodec
+from benchmarks._common import build
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tree = build(n)
+    # the last node in depth first pre-order, one of the deepest in the tree
+    _, _, probe = next(iter(tree.dfs_ex(reverse=True)))
+    with tempfile.TemporaryDirectory() as d:
+        image, binary, tuples = (os.path.join(d, name) for name in ('tree.img', 'tree.bin', 'tree.pickle'))
+        with open(image, 'wb') as fp:
+            tree.freeze(compact=True).save(fp, IntCodec())
+        with open(binary, 'wb') as fp:
+            tree.dump(fp, IntCodec())
+        with open(tuples, 'wb') as fp:
+            pickle.dump(tree.to_tuple(), fp)
+
+        def from_tuple():
+            with open(tuples, 'rb') as f:
+                return Tree.from_tuple(pickle.load(f))
+
+        def load():
+            with open(binary, 'rb') as f:
+                return Tree.load(f, IntCodec())
+
+        print(f'nodes: {n}')
+        print(f'{"":>15} {"open":>9} {"size":>9} {"height":>9} {"getitem":>9} {"dfs":>9}')
+        for name, start in (('from_tuple', from_tuple), ('Tree.load', load),
+                            ('FrozenTree.open', lambda: FrozenTree.open(image, IntCodec()))):
+            r = []
+            opening = timeit(lambda: r.append(start()), number=1)
+            t = r[0]
+            size = timeit(lambda: t.size(), number=1)
+            height = timeit(lambda: t.height(), number=1)
+            getitem = timeit(lambda: t[probe].value, number=1)
+            dfs = timeit(lambda: sum(1 for _ in t.dfs()), number=1)
+            print(f'{name:>15} {opening:8.4f}s {size:8.4f}s {height:8.4f}s {getitem:8.4f}s {dfs:8.4f}s')
+
+
+if __name__ == '__main__':
+    main()
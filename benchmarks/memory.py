@@ -0,0 +1,60 @@
+"""Memory footprint of tree nodes: bytes per node of :class:`justree.Tree`
+compared with the former ``__dict__`` based layout.
+
+Run from the repository root:
+
+$ python -m benchmarks.memory [nodes]
+"""
+
+import sys
+from typing import Any, Callable, List
+
+from justree import Tree
+from benchmarks._common import traced
+
+
+class DictTree:
+    """Node layout used before ``__slots__``: every attribute lives in the instance ``__dict__``"""
+
+    _hash = None
+    _size = None
+    _height = None
+
+    def __init__(self, value: Any) -> None:
+        self._children: List['DictTree'] = []
+        self.value = value
+        self._is_frozen = False
+
+
+def build(factory: Callable[[Any], Any], n: int) -> Any:
+    # wide tree of depth 3 so that children lists look like in real trees
+    nodes = [factory(0)]
+    for i in range(1, n):
+        p = nodes[(i - 1) // 8]
+        c = factory(i)
+        p._children.append(c)
+        nodes.append(c)
+    # cache fields are filled in by ``size()``/``height()`` on frozen trees
+    for t in nodes:
+        t._size = t._height = t._hash = None
+    return nodes[0]
+
+
+def bytes_per_node(factory: Callable[[Any], Any], n: int) -> float:
+    root, size = traced(lambda: build(factory, n))
+    del root
+    return size / n
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    dict_bytes = bytes_per_node(DictTree, n)
+    slot_bytes = bytes_per_node(Tree, n)
+    print(f'nodes:            {n}')
+    print(f'__dict__ layout:  {dict_bytes:8.1f} bytes/node')
+    print(f'__slots__ layout: {slot_bytes:8.1f} bytes/node')
+    print(f'saved:            {100 * (1 - slot_bytes / dict_bytes):8.1f} %')
+
+
+if __name__ == '__main__':
+    main()
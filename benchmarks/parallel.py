@@ -0,0 +1,45 @@
+"""Scaling of :meth:`justree.Tree.parallel_map` and :meth:`justree.Tree.parallel_fold` with
+CPU-heavy functions from 1 to N worker processes, compared with :meth:`justree.Tree.map_values`
+and :meth:`justree.Tree.fold` in one process.
+
+Run from the repository root:
+
+$ python -m benchmarks.parallel [nodes] [max workers]
+"""
+
+import os
+import sys
+from timeit import timeit
+
+from benchmarks._common import build
+
+
+def heavy(v: int) -> int:
+    for _ in range(100):
+        v = (v * 1103515245 + 12345) % 2147483648
+    return v
+
+
+def heavy_leaf(v: int) -> int:
+    return heavy(v)
+
+
+def heavy_combine(v: int, results) -> int:
+    return (heavy(v) + sum(results)) % 2147483648
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    tree = build(n)
+    print(f'nodes: {n}, cpus: {os.cpu_count()}')
+    print(f'map_values:               {timeit(lambda: tree.map_values(heavy), number=1):8.4f}s')
+    print(f'fold:                     {timeit(lambda: tree.fold(heavy_leaf, heavy_combine), number=1):8.4f}s')
+    for workers in range(1, max_workers + 1):
+        m = timeit(lambda: tree.parallel_map(heavy, workers), number=1)
+        f = timeit(lambda: tree.parallel_fold(heavy_leaf, heavy_combine, workers), number=1)
+        print(f'parallel, {workers:2} workers:     map {m:8.4f}s, fold {f:8.4f}s')
+
+
+if __name__ == '__main__':
+    main()
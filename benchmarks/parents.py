@@ -0,0 +1,42 @@
+"""Timings of finding parent and path of nodes by search from the root and by parent links
+of a linked (:meth:`justree.Tree.link`) tree.
+
+Run from the repository root:
+
+$ python -m benchmarks.parents [nodes] [lookups]
+"""
+
+import sys
+from timeit import timeit
+
+from justree import Tree
+from benchmarks._common import build
+
+
+def search(tree: Tree, nodes: list) -> None:
+    for node in nodes:
+        # the only way without links: scan whole tree for node
+        for t, _, p in tree.dfs_ex(paths='lazy'):
+            if t is node:
+                tree[p[:-1]], p.to_tuple()
+                break
+
+
+def linked(nodes: list) -> None:
+    for node in nodes:
+        node.parent, node.path()
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    tree = build(n)
+    nodes = list(tree.bfs())[n - lookups:]
+    print(f'nodes: {n}, lookups: {lookups}')
+    print(f'search:  {timeit(lambda: search(tree, nodes), number=1):8.4f}s')
+    print(f'link():  {timeit(tree.link, number=1):8.4f}s')
+    print(f'linked:  {timeit(lambda: linked(nodes), number=1):8.4f}s')
+
+
+if __name__ == '__main__':
+    main()
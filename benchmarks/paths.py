@@ -0,0 +1,55 @@
+"""Timings of :meth:`justree.Tree.dfs_ex`/:meth:`justree.Tree.bfs_ex` with every kind of ``paths``
+on a wide tree and on a degenerate deep tree.
+
+Run from the repository root:
+
+$ python -m benchmarks.paths [nodes]
+"""
+
+import sys
+import tracemalloc
+from timeit import timeit
+
+from justree import Tree
+
+
+def wide(n: int) -> Tree:
+    nodes = [Tree(0)]
+    for i in range(1, n):
+        c = Tree(i)
+        nodes[(i - 1) // 8].append(c)
+        nodes.append(c)
+    return nodes[0]
+
+
+def deep(n: int) -> Tree:
+    root = t = Tree(0)
+    for i in range(1, n):
+        c = Tree(i)
+        t.append(c)
+        t = c
+    return root
+
+
+def peak(f) -> int:
+    tracemalloc.start()
+    f()
+    r = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return r
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for name, tree in (('wide', wide(n)), ('deep', deep(min(n, 5_000)))):
+        print(f'{name} tree, {tree.size()} nodes')
+        for paths in ('tuple', 'lazy', 'none'):
+            for traversal in ('bfs_ex', 'dfs_ex'):
+                f = getattr(tree, traversal)
+                sec = timeit(lambda: sum(1 for _ in f(paths=paths)), number=1)
+                mem = peak(lambda: list(f(paths=paths)))
+                print(f'  {traversal} paths={paths!r:8} {sec:8.4f}s {mem / 2 ** 20:9.1f} MiB kept')
+
+
+if __name__ == '__main__':
+    main()
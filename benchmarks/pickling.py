@@ -0,0 +1,56 @@
+"""Timings and sizes of pickled trees: flat pre-order protocol of :class:`justree.Tree`
+versus naive pickling of nested structure (:meth:`justree.Tree.to_tuple`), on wide and deep trees.
+
+Run from the repository root:
+
+$ python -m benchmarks.pickling [nodes]
+"""
+
+import pickle
+import sys
+from timeit import timeit
+
+from justree import Tree
+
+
+def wide(n: int) -> Tree:
+    nodes = [Tree(0)]
+    for i in range(1, n):
+        c = Tree(i)
+        nodes[(i - 1) // 8].append(c)
+        nodes.append(c)
+    return nodes[0]
+
+
+def deep(n: int) -> Tree:
+    t = Tree(0)
+    for i in range(1, n):
+        t = Tree(i, (t,))
+    return t
+
+
+def measure(f):
+    try:
+        r = []
+        sec = timeit(lambda: r.append(f()), number=1)
+        return sec, r[0]
+    except RecursionError:
+        return None, None
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f'{"":>6} {"":>7} {"dumps":>9} {"loads":>9} {"bytes":>11}')
+    for name, tree in (('wide', wide(n)), ('deep', deep(n))):
+        for kind, obj, load in (('naive', lambda: tree.to_tuple(), Tree.from_tuple),
+                                ('flat', lambda: tree, lambda t: t)):
+            dumps, data = measure(lambda: pickle.dumps(obj(), pickle.HIGHEST_PROTOCOL))
+            if data is None:
+                print(f'{name:>6} {kind:>7} {"RecursionError":>21}')
+                continue
+            loads, _ = measure(lambda: load(pickle.loads(data)))
+            print(f'{name:>6} {kind:>7} {dumps:8.3f}s {loads:8.3f}s {len(data):>11}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Peak memory and time of copying a tree through nested tuples (:meth:`justree.Tree.to_tuple`)
+and through a stream of records (:meth:`justree.Tree.to_records`), the peak includes the copy itself.
+
+Run from the repository root:
+
+$ python -m benchmarks.records [nodes]
+"""
+
+import sys
+import tracemalloc
+from time import perf_counter
+from typing import Callable
+
+from justree import Tree
+from benchmarks._common import build
+
+
+def measure(f: Callable[[], Tree]) -> str:
+    tracemalloc.start()
+    start = perf_counter()
+    f()
+    seconds = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return f'{seconds:8.4f}s {peak / 2 ** 20:8.1f}MiB'
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    tree = build(n)
+    print(f'nodes: {n}')
+    print(f'tuples:   {measure(lambda: Tree.from_tuple(tree.to_tuple()))}')
+    print(f'records:  {measure(lambda: Tree.from_records(tree.to_records()))}')
+
+
+if __name__ == '__main__':
+    main()
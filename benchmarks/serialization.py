@@ -0,0 +1,39 @@
+"""Throughput of :meth:`justree.Tree.dump` and :meth:`justree.Tree.load` in MB/s
+for every codec of :mod:`justree.serialization`.
+
+Run from the repository root:
+
+$ python -m benchmarks.serialization [nodes]
+"""
+
+import os
+import sys
+import tempfile
+from timeit import timeit
+
+from justree import Tree
+from justree.serialization import IntCodec, PickleCodec, StrCodec
+from benchmarks._common import build
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f'nodes: {n}')
+    print(f'{"codec":>12} {"size MB":>9} {"dump MB/s":>10} {"load MB/s":>10} '
+          f'{"dump kn/s":>10} {"load kn/s":>10}')
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'tree.bin')
+        for name, codec, value in (('IntCodec', IntCodec(), int), ('StrCodec', StrCodec(), str),
+                                   ('PickleCodec', PickleCodec(), lambda i: (i, str(i)))):
+            tree = build(n, value=value)
+            with open(path, 'wb') as fp:
+                dump = timeit(lambda: tree.dump(fp, codec), number=1)
+            size = os.path.getsize(path) / 1e6
+            with open(path, 'rb') as fp:
+                load = timeit(lambda: Tree.load(fp, codec), number=1)
+            print(f'{name:>12} {size:9.2f} {size / dump:10.1f} {size / load:10.1f} '
+                  f'{n / dump / 1e3:10.0f} {n / load / 1e3:10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Timings of :func:`str`, :func:`repr` and :meth:`justree.Tree.write_to`
+on trees from 1e3 to 1e7 nodes, compared with the former ``s += ...`` implementation.
+
+Run from the repository root:
+
+$ python -m benchmarks.str_repr [max_nodes]
+"""
+
+import os
+import sys
+from collections import deque
+from itertools import repeat
+from timeit import timeit
+
+from justree import Tree
+from benchmarks._common import build
+
+
+def concat_str(self: Tree) -> str:
+    """Former implementation of :func:`justree.tree.non_recursive_tree_str`"""
+    s = ''
+    p = -1
+    q = deque([(self, 0)])
+    while q:
+        t, c = q.popleft()
+        s += ')' * (p - c + 1) + ' (' + str(t.value)
+        p = c
+        q.extendleft(zip(reversed(t._children), repeat(c + 1)))
+    return s[1:] + ')' * (p + 1)
+
+
+def main() -> None:
+    max_nodes = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10 ** 7
+    print(f'{"nodes":>10} {"s +=":>9} {"str":>9} {"repr":>9} {"write_to":>9}')
+    n = 1000
+    while n <= max_nodes:
+        tree = build(n)
+        old = timeit(lambda: concat_str(tree), number=1)
+        new = timeit(lambda: str(tree), number=1)
+        rep = timeit(lambda: repr(tree), number=1)
+        with open(os.devnull, 'w') as fp:
+            out = timeit(lambda: tree.write_to(fp), number=1)
+        print(f'{n:>10} {old:8.3f}s {new:8.3f}s {rep:8.3f}s {out:8.3f}s')
+        n *= 10
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Throughput of concurrent reads (hash, size, height and indexed search of subtrees)
+of a finalized frozen tree (:meth:`justree.Tree.finalize`) from 1 to N threads. Reads
+scale with threads only on a free-threaded interpreter (``python3.13t`` and later),
+with the GIL the total throughput stays flat.
+
+Run from the repository root:
+
+$ python -m benchmarks.threads [nodes] [max threads] [reads per thread]
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from timeit import timeit
+
+from justree import Tree
+from benchmarks._common import build
+
+
+def read(tree: Tree, reads: int) -> int:
+    r = 0
+    for i in range(reads):
+        t = tree[(i % 8, i % 7, i % 6)]
+        r += hash(t) % 2 + t.size() + t.height() + (tree.find(i) is not None)
+    return r
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    max_threads = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    reads = int(sys.argv[3]) if len(sys.argv) > 3 else 100_000
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    tree = build(n)
+    print(f'nodes: {n}, cpus: {os.cpu_count()}, GIL: {"enabled" if gil else "disabled"}')
+    print(f'finalize():  {timeit(tree.finalize, number=1):8.4f}s')
+    tree.find(0)
+    for threads in range(1, max_threads + 1):
+        with ThreadPoolExecutor(threads) as executor:
+            start = perf_counter()
+            list(executor.map(read, [tree] * threads, [reads] * threads))
+            elapsed = perf_counter() - start
+        print(f'{threads:2} threads: {threads * reads / elapsed / 1e6:8.3f}M reads/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,14 @@ pure python :class:`justree.tree.Tree`.
 You can start using this module like:
 
 >>> from justree import Tree
+
+Read-mostly trees may be packed into flat arrays with :class:`justree.frozen_tree.FrozenTree`:
+
+>>> frozen = Tree(...).freeze(compact=True)
 """
 
 from .tree import Tree
+from .frozen_tree import FrozenTree
+from .path import IndexPath
+from .tools import TreeStateError, TreeIsFrozenError, TreeIsNotFrozenError, TreeIsNotLinkedError
+from .intern import TreeInterner
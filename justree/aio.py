@@ -0,0 +1,98 @@
+"""
+Cooperative traversals of trees for asyncio event loops.
+
+Coroutines and async iterators here drive the same engines as synchronous methods
+(:mod:`justree.bfs`, :mod:`justree.dfs`) and give control back to the event loop after every
+`batch` nodes, so traversals of huge trees do not block other tasks for longer than a batch takes:
+
+>>> async def count_leaves(tree):
+...     return sum([1 async for t in tree.adfs(batch=1000) if not t])
+
+Tree must not be changed by other tasks while it is traversed.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Iterable, List, Optional, Tuple
+
+from .bfs import non_recursive_tree_bfs_forward_original, non_recursive_tree_bfs_forward_mirror, \
+    non_recursive_tree_bfs_forward_original_ex
+from .dfs import non_recursive_tree_dfs_forward_original, non_recursive_tree_dfs_forward_original_ex
+from .tools import Descend, T
+
+BATCH_SIZE = 10_000
+"""Default number of nodes processed between switches to event loop"""
+
+
+async def batched(nodes: Iterable[T], batch: int) -> AsyncIterator[T]:
+    """
+    :return: the same nodes, switching to event loop after every `batch` of them
+    """
+    if batch < 1:
+        raise ValueError(f'batch must be positive, not {batch}')
+    k = 0
+    for t in nodes:
+        yield t
+        k += 1
+        if k == batch:
+            k = 0
+            await asyncio.sleep(0)
+
+
+async def tree_abfs(self: T, reverse: bool, mirror: bool, descend: Optional[Descend],
+                    batch: int) -> AsyncIterator[T]:
+    if mirror:
+        nodes: Iterable[T] = non_recursive_tree_bfs_forward_mirror(self, descend)
+    else:
+        nodes = non_recursive_tree_bfs_forward_original(self, descend)
+    if reverse:
+        # reversed engines collect all nodes at once, forward order is collected in batches instead
+        collected = [t async for t in batched(nodes, batch)]
+        collected.reverse()
+        nodes = collected
+    async for t in batched(nodes, batch):
+        yield t
+
+
+async def tree_asize(self: Any, batch: int) -> int:
+    if self._is_augmented or (self._is_frozen and self._size is not None):
+        return self._size
+    size = 0
+    async for _ in batched(non_recursive_tree_dfs_forward_original(self), batch):
+        size += 1
+    if self._is_frozen:
+        self._size = size
+    return size
+
+
+async def tree_aheight(self: Any, batch: int) -> int:
+    if self._is_augmented or (self._is_frozen and self._height is not None):
+        return self._height
+    height = 0
+    # depths of nodes in breadth first order do not decrease
+    async for _, height, _ in batched(non_recursive_tree_bfs_forward_original_ex(self, paths='none'), batch):
+        pass
+    if self._is_frozen:
+        self._height = height
+    return height
+
+
+def is_writable(t: Any) -> bool:
+    return not t._is_frozen
+
+
+async def tree_afreeze(self: Any, batch: int) -> None:
+    # whole subtree of a frozen node is frozen already, its children are not entered
+    async for t in batched(non_recursive_tree_dfs_forward_original(self, is_writable), batch):
+        t._is_frozen = True
+
+
+async def tree_ato_tuple(self: Any, batch: int) -> Tuple[Any, List[Tuple]]:
+    # tuples of nodes along path to the current node of pre-order
+    s: List[Tuple[Any, List[Tuple]]] = []
+    async for t, d, _ in batched(non_recursive_tree_dfs_forward_original_ex(self, paths='none'), batch):
+        nt: Tuple[Any, List[Tuple]] = (t.value, [])
+        del s[d - 1:]
+        if s:
+            s[-1][1].append(nt)
+        s.append(nt)
+    return s[0]
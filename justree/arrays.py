@@ -0,0 +1,135 @@
+"""
+Conversion of trees into NumPy arrays and back for vectorized analytics.
+
+Requires optional dependency ``numpy`` (``pip install justree[numpy]``). Nodes are numbered
+in depth first pre-order, so the subtree of node ``k`` occupies numbers ``k .. k + size[k] - 1``:
+
+>>> arrays = Tree.from_tuple((1, [(2, [(3, [])]), (4, [])])).to_arrays()
+>>> arrays.parent, arrays.depth, arrays.size
+(array([-1,  0,  1,  0]), array([1, 2, 3, 2]), array([4, 2, 1, 1]))
+>>> np.bincount(arrays.depth)[1:]  # number of nodes per level
+array([1, 2, 1])
+"""
+
+from itertools import repeat
+from typing import Any, List, NamedTuple, Sequence, Tuple, Type, TypeVar
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from .tree_node import TreeNode
+
+T = TypeVar('T', bound=TreeNode)
+
+
+class TreeArrays(NamedTuple):
+    """
+    Structure and values of tree as NumPy arrays, all indexed by pre-order numbers of nodes
+    """
+
+    values: Any
+    """values of nodes, numeric dtype if all values are numbers of one type converted exactly,
+    ``object`` otherwise"""
+    parent: Any
+    """pre-order number of parent node, ``-1`` for the root"""
+    depth: Any
+    """depth of node, 1 for the root as in :meth:`justree.tree.Tree.dfs_ex`"""
+    size: Any
+    """number of nodes in subtree"""
+    postorder: Any
+    """depth first post-order number of node"""
+    child_count: Any
+    """number of children"""
+    child_offsets: Any
+    """children of node ``k`` are ``children[child_offsets[k]:child_offsets[k + 1]]``"""
+    children: Any
+    """pre-order numbers of children grouped by parent"""
+
+
+def ensure_numpy() -> None:
+    if np is None:
+        raise ImportError('numpy is required for array conversions, install justree[numpy]')
+
+
+def tree_to_arrays(self: TreeNode) -> TreeArrays:
+    ensure_numpy()
+    values: List[Any] = []
+    parent: List[int] = []
+    depth: List[int] = []
+    counts: List[int] = []
+    q: List[Tuple[TreeNode, int, int]] = [(self, -1, 1)]
+    while q:
+        t, p, d = q.pop()
+        k = len(values)
+        values.append(t.value)
+        parent.append(p)
+        depth.append(d)
+        counts.append(len(t._children))
+        q.extend(zip(reversed(t._children), repeat(k), repeat(d + 1)))
+    parent_a = np.array(parent, dtype=np.int64)
+    depth_a = np.array(depth, dtype=np.int64)
+    count_a = np.array(counts, dtype=np.int64)
+    # sizes are summed up level by level, from the deepest one
+    size = np.ones(len(values), dtype=np.int64)
+    order = np.argsort(depth_a, kind='stable')
+    levels = np.split(order, np.flatnonzero(np.diff(depth_a[order])) + 1)
+    for level in reversed(levels[1:]):
+        np.add.at(size, parent_a[level], size[level])
+    preorder = np.arange(len(values), dtype=np.int64)
+    return TreeArrays(
+        values=values_array(values),
+        parent=parent_a,
+        depth=depth_a,
+        size=size,
+        postorder=preorder + size - depth_a,
+        child_count=count_a,
+        child_offsets=np.concatenate(([0], np.cumsum(count_a))),
+        children=1 + np.argsort(parent_a[1:], kind='stable'),
+    )
+
+
+def values_array(values: Sequence[Any]) -> Any:
+    # mixed types are coerced to one dtype, e.g. 2 ** 63 with -1 to float64, so they stay objects
+    if len(set(map(type, values))) == 1:
+        try:
+            a = np.array(values)
+        except (ValueError, OverflowError):
+            a = None
+        # dtype of the whole array is the dtype of a single value unless some value does not fit it
+        if a is not None and a.ndim == 1 and a.dtype.kind in 'biufc' and \
+                a.dtype.kind == np.array(values[:1]).dtype.kind:
+            return a
+    r = np.empty(len(values), dtype=object)
+    r[:] = values
+    return r
+
+
+def tree_from_arrays(cls: Type[T], values: Sequence[Any], parent: Sequence[int]) -> T:
+    ensure_numpy()
+    parent = np.asarray(parent, dtype=np.int64)
+    values = values.tolist() if isinstance(values, np.ndarray) else list(values)
+    n = len(values)
+    if parent.ndim != 1 or len(parent) != n:
+        raise ValueError(f'parent must be a flat array of {n} items, not of shape {parent.shape}')
+    roots = np.flatnonzero(parent == -1)
+    if len(roots) != 1:
+        raise ValueError(f'tree must have exactly one root node (parent -1), not {len(roots)}')
+    if n and (parent.min() < -1 or parent.max() >= n):
+        raise ValueError('parent indexes are out of range')
+    # pointer jumping: every chain of parents must end at the root in at most n steps
+    jump = parent.copy()
+    jump[roots[0]] = roots[0]
+    for _ in range(n.bit_length()):
+        jump = jump[jump]
+    if (jump != roots[0]).any():
+        raise ValueError('parent links contain cycles, not all nodes are reachable from the root')
+    nodes = list(map(cls, values))
+    # children grouped by parent in order of their numbers, so children of a node are a slice
+    children = list(map(nodes.__getitem__, np.argsort(parent, kind='stable')[1:].tolist()))
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(parent[parent >= 0], minlength=n)))).tolist()
+    for t, b, e in zip(nodes, offsets, offsets[1:]):
+        if b != e:
+            t._children = children[b:e]
+    return nodes[roots[0]]
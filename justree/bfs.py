@@ -1,52 +1,87 @@
 from collections import deque
+from itertools import repeat
 from typing import Iterable, List, Tuple, Deque, Optional, Union
 
-from .tools import reversed_enumerate, T
+from .path import Path, paths_preparation
+from .tools import Descend, T, rechunked
 from .tree_node import TreeNode
 
 
-def non_recursive_tree_bfs_forward_original(self: T) -> Iterable[T]:
+def non_recursive_tree_bfs_forward_original(self: T, descend: Optional[Descend] = None) -> Iterable[T]:
     assert isinstance(self, TreeNode)
     q: Deque[TreeNode] = deque([self])
     while q:
         t = q.popleft()
-        q.extend(t._children)
+        if descend is None or descend(t):
+            q.extend(t._children)
         yield t
 
 
-def non_recursive_tree_bfs_forward_mirror(self: T) -> Iterable[T]:
+def non_recursive_tree_bfs_forward_mirror(self: T, descend: Optional[Descend] = None) -> Iterable[T]:
     assert isinstance(self, TreeNode)
     q: Deque[TreeNode] = deque([self])
     while q:
         t = q.popleft()
-        q.extend(reversed(t._children))
+        if descend is None or descend(t):
+            q.extend(reversed(t._children))
         yield t
 
 
-def non_recursive_tree_bfs_reverse_original(self: T) -> List[T]:
+def non_recursive_tree_bfs_reverse_original(self: T, descend: Optional[Descend] = None) -> List[T]:
     assert isinstance(self, TreeNode)
     q: Deque[TreeNode] = deque([self])
     r: List[TreeNode] = [self]
     while q:
         t = q.popleft()
-        q.extend(t._children)
-        r.extend(t._children)
+        if descend is None or descend(t):
+            q.extend(t._children)
+            r.extend(t._children)
     r.reverse()
     return r
 
 
-def non_recursive_tree_bfs_reverse_mirror(self: T) -> List[T]:
+def non_recursive_tree_bfs_reverse_mirror(self: T, descend: Optional[Descend] = None) -> List[T]:
     assert isinstance(self, TreeNode)
     q: Deque[TreeNode] = deque([self])
     r: List[TreeNode] = [self]
     while q:
         t = q.popleft()
-        q.extend(reversed(t._children))
-        r.extend(reversed(t._children))
+        if descend is None or descend(t):
+            q.extend(reversed(t._children))
+            r.extend(reversed(t._children))
     r.reverse()
     return r
 
 
+def non_recursive_tree_bfs_levels_original(self: T, descend: Optional[Descend] = None) -> Iterable[List[T]]:
+    assert isinstance(self, TreeNode)
+    level: List[TreeNode] = [self]
+    while level:
+        # the next level is taken before the current one is given away, so it can be changed by consumer
+        if descend is None:
+            children = [c for t in level for c in t._children]
+        else:
+            children = [c for t in level if descend(t) for c in t._children]
+        yield level
+        level = children
+
+
+def non_recursive_tree_bfs_levels_mirror(self: T, descend: Optional[Descend] = None) -> Iterable[List[T]]:
+    for level in non_recursive_tree_bfs_levels_original(self, descend):
+        level.reverse()
+        yield level
+
+
+def non_recursive_tree_bfs_batches_original(self: T, size: int, descend: Optional[Descend] = None) \
+        -> Iterable[List[T]]:
+    return rechunked(non_recursive_tree_bfs_levels_original(self, descend), size)
+
+
+def non_recursive_tree_bfs_batches_mirror(self: T, size: int, descend: Optional[Descend] = None) \
+        -> Iterable[List[T]]:
+    return rechunked(non_recursive_tree_bfs_levels_mirror(self, descend), size)
+
+
 _Int = Union[int, float]
 
 
@@ -54,55 +89,65 @@ def bfs_ex_preparation(depth: Optional[_Int]) -> _Int:
     return float('inf') if depth is None else depth
 
 
-def non_recursive_tree_bfs_forward_original_ex(self: T, depth: Optional[_Int] = None) \
-        -> Iterable[Tuple[T, int, Tuple[int, ...]]]:
+def non_recursive_tree_bfs_forward_original_ex(self: T, depth: Optional[_Int] = None, paths: str = 'tuple',
+                                               descend: Optional[Descend] = None) \
+        -> Iterable[Tuple[T, int, Path]]:
     assert isinstance(self, TreeNode)
     depth = bfs_ex_preparation(depth)
-    q: Deque[Tuple[TreeNode, int, Tuple[int, ...]]] = deque([(self, 1, ())])
+    root, sub_paths = paths_preparation(paths)
+    q: Deque[Tuple[TreeNode, int, Path]] = deque([(self, 1, root)])
     while q:
         t, d, i = q.popleft()
-        if d < depth:
-            q.extend((ct, d + 1, i + (ci,)) for ci, ct in enumerate(t._children))
+        if d < depth and (descend is None or descend(t)):
+            q.extend(zip(t._children, repeat(d + 1), sub_paths(i, len(t._children))))
         yield t, d, i
 
 
-def non_recursive_tree_bfs_forward_mirror_ex(self: T, depth: Optional[_Int] = None) \
-        -> Iterable[Tuple[T, int, Tuple[int, ...]]]:
+def non_recursive_tree_bfs_forward_mirror_ex(self: T, depth: Optional[_Int] = None, paths: str = 'tuple',
+                                             descend: Optional[Descend] = None) \
+        -> Iterable[Tuple[T, int, Path]]:
     assert isinstance(self, TreeNode)
     depth = bfs_ex_preparation(depth)
-    q: Deque[Tuple[TreeNode, int, Tuple[int, ...]]] = deque([(self, 1, ())])
+    root, sub_paths = paths_preparation(paths)
+    q: Deque[Tuple[TreeNode, int, Path]] = deque([(self, 1, root)])
     while q:
         t, d, i = q.popleft()
-        if d < depth:
-            q.extend((ct, d + 1, i + (ci,)) for ci, ct in reversed_enumerate(t._children))
+        if d < depth and (descend is None or descend(t)):
+            q.extend(zip(reversed(t._children), repeat(d + 1), reversed(sub_paths(i, len(t._children)))))
         yield t, d, i
 
 
-def non_recursive_tree_bfs_reverse_original_ex(self: T, depth: Optional[_Int] = None) \
-        -> List[Tuple[T, int, Tuple[int, ...]]]:
+def non_recursive_tree_bfs_reverse_original_ex(self: T, depth: Optional[_Int] = None, paths: str = 'tuple',
+                                               descend: Optional[Descend] = None) \
+        -> List[Tuple[T, int, Path]]:
     assert isinstance(self, TreeNode)
     depth = bfs_ex_preparation(depth)
-    q: Deque[Tuple[TreeNode, int, Tuple[int, ...]]] = deque([(self, 1, ())])
-    r: List[Tuple[TreeNode, int, Tuple[int, ...]]] = [(self, 1, ())]
+    root, sub_paths = paths_preparation(paths)
+    q: Deque[Tuple[TreeNode, int, Path]] = deque([(self, 1, root)])
+    r: List[Tuple[TreeNode, int, Path]] = [(self, 1, root)]
     while q:
         t, d, i = q.popleft()
-        if d < depth:
-            q.extend((ct, d + 1, i + (ci,)) for ci, ct in enumerate(t._children))
-            r.extend((ct, d + 1, i + (ci,)) for ci, ct in enumerate(t._children))
+        if d < depth and (descend is None or descend(t)):
+            c = list(zip(t._children, repeat(d + 1), sub_paths(i, len(t._children))))
+            q.extend(c)
+            r.extend(c)
     r.reverse()
     return r
 
 
-def non_recursive_tree_bfs_reverse_mirror_ex(self: T, depth: Optional[_Int] = None) \
-        -> List[Tuple[T, int, Tuple[int, ...]]]:
+def non_recursive_tree_bfs_reverse_mirror_ex(self: T, depth: Optional[_Int] = None, paths: str = 'tuple',
+                                             descend: Optional[Descend] = None) \
+        -> List[Tuple[T, int, Path]]:
     assert isinstance(self, TreeNode)
     depth = bfs_ex_preparation(depth)
-    q: Deque[Tuple[TreeNode, int, Tuple[int, ...]]] = deque([(self, 1, ())])
-    r: List[Tuple[TreeNode, int, Tuple[int, ...]]] = [(self, 1, ())]
+    root, sub_paths = paths_preparation(paths)
+    q: Deque[Tuple[TreeNode, int, Path]] = deque([(self, 1, root)])
+    r: List[Tuple[TreeNode, int, Path]] = [(self, 1, root)]
     while q:
         t, d, i = q.popleft()
-        if d < depth:
-            q.extend((ct, d + 1, i + (ci,)) for ci, ct in reversed_enumerate(t._children))
-            r.extend((ct, d + 1, i + (ci,)) for ci, ct in reversed_enumerate(t._children))
+        if d < depth and (descend is None or descend(t)):
+            c = list(zip(reversed(t._children), repeat(d + 1), reversed(sub_paths(i, len(t._children)))))
+            q.extend(c)
+            r.extend(c)
     r.reverse()
     return r
@@ -1,52 +1,91 @@
 from itertools import repeat
 from typing import Iterable, List, Tuple, Union, Optional
 
-from .tools import reversed_enumerate, T
+from .path import Path, paths_preparation
+from .tools import Descend, T
 from .tree_node import TreeNode
 
 
-def non_recursive_tree_dfs_forward_original(self: T) -> Iterable[T]:
+def non_recursive_tree_dfs_forward_original(self: T, descend: Optional[Descend] = None) -> Iterable[T]:
     assert isinstance(self, TreeNode)
     q: List[TreeNode] = [self]
     while q:
         t = q.pop()
-        q.extend(reversed(t._children))
+        if descend is None or descend(t):
+            q.extend(reversed(t._children))
         yield t
 
 
-def non_recursive_tree_dfs_forward_mirror(self: T) -> Iterable[T]:
+def non_recursive_tree_dfs_forward_mirror(self: T, descend: Optional[Descend] = None) -> Iterable[T]:
     assert isinstance(self, TreeNode)
     q: List[TreeNode] = [self]
     while q:
         t = q.pop()
-        q.extend(t._children)
+        if descend is None or descend(t):
+            q.extend(t._children)
         yield t
 
 
-def non_recursive_tree_dfs_reverse_original(self: T) -> Iterable[T]:
+def non_recursive_tree_dfs_reverse_original(self: T, descend: Optional[Descend] = None) -> Iterable[T]:
     assert isinstance(self, TreeNode)
     q: List[Tuple[bool, TreeNode]] = [(True, self)]
     while q:
         f, t = q[-1]
         if f:
             q[-1] = (False, t)
-            q.extend(zip(repeat(True), t._children))
+            if descend is None or descend(t):
+                q.extend(zip(repeat(True), t._children))
         else:
             yield q.pop()[1]
 
 
-def non_recursive_tree_dfs_reverse_mirror(self: T) -> Iterable[T]:
+def non_recursive_tree_dfs_reverse_mirror(self: T, descend: Optional[Descend] = None) -> Iterable[T]:
     assert isinstance(self, TreeNode)
     q: List[Tuple[bool, TreeNode]] = [(True, self)]
     while q:
         f, t = q[-1]
         if f:
             q[-1] = (False, t)
-            q.extend(zip(repeat(True), reversed(t._children)))
+            if descend is None or descend(t):
+                q.extend(zip(repeat(True), reversed(t._children)))
         else:
             yield q.pop()[1]
 
 
+def non_recursive_tree_dfs_batches_original(self: T, size: int, descend: Optional[Descend] = None) \
+        -> Iterable[List[T]]:
+    assert isinstance(self, TreeNode)
+    q: List[TreeNode] = [self]
+    batch: List[TreeNode] = []
+    while q:
+        t = q.pop()
+        if descend is None or descend(t):
+            q.extend(reversed(t._children))
+        batch.append(t)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def non_recursive_tree_dfs_batches_mirror(self: T, size: int, descend: Optional[Descend] = None) \
+        -> Iterable[List[T]]:
+    assert isinstance(self, TreeNode)
+    q: List[TreeNode] = [self]
+    batch: List[TreeNode] = []
+    while q:
+        t = q.pop()
+        if descend is None or descend(t):
+            q.extend(t._children)
+        batch.append(t)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
 _Int = Union[int, float]
 
 
@@ -54,55 +93,64 @@ def bfs_ex_preparation(depth: Optional[_Int]) -> _Int:
     return float('inf') if depth is None else depth
 
 
-def non_recursive_tree_dfs_forward_original_ex(self: T, depth: Optional[_Int] = None) \
-        -> Iterable[Tuple[T, int, Tuple[int, ...]]]:
+def non_recursive_tree_dfs_forward_original_ex(self: T, depth: Optional[_Int] = None, paths: str = 'tuple',
+                                               descend: Optional[Descend] = None) \
+        -> Iterable[Tuple[T, int, Path]]:
     assert isinstance(self, TreeNode)
     depth = bfs_ex_preparation(depth)
-    q: List[Tuple[TreeNode, int, Tuple[int, ...]]] = [(self, 1, ())]
+    root, sub_paths = paths_preparation(paths)
+    q: List[Tuple[TreeNode, int, Path]] = [(self, 1, root)]
     while q:
         t, d, i = q.pop()
-        if d < depth:
-            q.extend((ct, d + 1, i + (ci,)) for ci, ct in reversed_enumerate(t._children))
+        if d < depth and (descend is None or descend(t)):
+            q.extend(zip(reversed(t._children), repeat(d + 1), reversed(sub_paths(i, len(t._children)))))
         yield t, d, i
 
 
-def non_recursive_tree_dfs_forward_mirror_ex(self: T, depth: Optional[_Int] = None) \
-        -> Iterable[Tuple[T, int, Tuple[int, ...]]]:
+def non_recursive_tree_dfs_forward_mirror_ex(self: T, depth: Optional[_Int] = None, paths: str = 'tuple',
+                                             descend: Optional[Descend] = None) \
+        -> Iterable[Tuple[T, int, Path]]:
     assert isinstance(self, TreeNode)
     depth = bfs_ex_preparation(depth)
-    q: List[Tuple[TreeNode, int, Tuple[int, ...]]] = [(self, 1, ())]
+    root, sub_paths = paths_preparation(paths)
+    q: List[Tuple[TreeNode, int, Path]] = [(self, 1, root)]
     while q:
         t, d, i = q.pop()
-        if d < depth:
-            q.extend((ct, d + 1, i + (ci,)) for ci, ct in enumerate(t._children))
+        if d < depth and (descend is None or descend(t)):
+            q.extend(zip(t._children, repeat(d + 1), sub_paths(i, len(t._children))))
         yield t, d, i
 
 
-def non_recursive_tree_dfs_reverse_original_ex(self: T, depth: Optional[_Int] = None) \
-        -> Iterable[Tuple[T, int, Tuple[int, ...]]]:
+def non_recursive_tree_dfs_reverse_original_ex(self: T, depth: Optional[_Int] = None, paths: str = 'tuple',
+                                               descend: Optional[Descend] = None) \
+        -> Iterable[Tuple[T, int, Path]]:
     assert isinstance(self, TreeNode)
     depth = bfs_ex_preparation(depth)
-    q: List[Tuple[bool, TreeNode, int, Tuple[int, ...]]] = [(True, self, 1, ())]
+    root, sub_paths = paths_preparation(paths)
+    q: List[Tuple[bool, TreeNode, int, Path]] = [(True, self, 1, root)]
     while q:
         f, t, d, i = q[-1]
         if f:
             q[-1] = (False, t, d, i)
-            if d < depth:
-                q.extend((True, ct, d + 1, i + (ci,)) for ci, ct in enumerate(t._children))
+            if d < depth and (descend is None or descend(t)):
+                q.extend(zip(repeat(True), t._children, repeat(d + 1), sub_paths(i, len(t._children))))
         else:
             yield q.pop()[1:]
 
 
-def non_recursive_tree_dfs_reverse_mirror_ex(self: T, depth: Optional[_Int] = None) \
-        -> Iterable[Tuple[T, int, Tuple[int, ...]]]:
+def non_recursive_tree_dfs_reverse_mirror_ex(self: T, depth: Optional[_Int] = None, paths: str = 'tuple',
+                                             descend: Optional[Descend] = None) \
+        -> Iterable[Tuple[T, int, Path]]:
     assert isinstance(self, TreeNode)
     depth = bfs_ex_preparation(depth)
-    q: List[Tuple[bool, TreeNode, int, Tuple[int, ...]]] = [(True, self, 1, ())]
+    root, sub_paths = paths_preparation(paths)
+    q: List[Tuple[bool, TreeNode, int, Path]] = [(True, self, 1, root)]
     while q:
         f, t, d, i = q[-1]
         if f:
             q[-1] = (False, t, d, i)
-            if d < depth:
-                q.extend((True, ct, d + 1, i + (ci,)) for ci, ct in reversed_enumerate(t._children))
+            if d < depth and (descend is None or descend(t)):
+                q.extend(zip(repeat(True), reversed(t._children), repeat(d + 1),
+                             reversed(sub_paths(i, len(t._children)))))
         else:
             yield q.pop()[1:]
@@ -0,0 +1,185 @@
+"""
+Edit scripts turning one tree into another.
+
+:func:`tree_diff` compares trees top-down and descends only into subtrees whose Merkle hashes
+(see :func:`justree.tools.node_hash`) differ. Frozen trees keep hashes of their subtrees, so trees
+sharing frozen subtrees (e.g. made by :meth:`justree.tree.Tree.unfreeze` with ``cow=True``) are
+compared in time proportional to the change. Hashes only pick candidates, subtrees are skipped
+or moved after they are checked to be the same or equal (both are immediate for shared subtrees),
+values of nodes must be hashable.
+
+Operations are applied in order, every path addresses a node in the tree as it is after the
+previous operations, exactly as :meth:`justree.tree.Tree.insert`, item assignment and deletion do:
+
+>>> a = Tree.from_tuple((1, [(2, []), (3, []), (4, [])]))
+>>> b = Tree.from_tuple((0, [(4, []), (2, []), (3, [(5, [])])]))
+>>> patch = a.diff(b)
+>>> patch
+[Replace(path=(), value=0), Move(path=(2,), to=(0,)), Insert(path=(2, 0), tree=Tree(value=5, children=()))]
+>>> a.apply(patch)
+>>> a == b
+True
+"""
+
+from collections import deque
+from difflib import SequenceMatcher
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .tools import TreeIsFrozenError, node_hash
+from .tree_node import TreeNode
+
+
+class Insert(NamedTuple):
+    """
+    Insert subtree as a new node at path
+    """
+    path: Tuple[int, ...]
+    tree: Any
+
+
+class Delete(NamedTuple):
+    """
+    Delete node at path with its subtree
+    """
+    path: Tuple[int, ...]
+
+
+class Replace(NamedTuple):
+    """
+    Replace value of node at path, children stay in place
+    """
+    path: Tuple[int, ...]
+    value: Any
+
+
+class Move(NamedTuple):
+    """
+    Move node at path with its subtree to path `to`, which addresses the node after its removal
+    """
+    path: Tuple[int, ...]
+    to: Tuple[int, ...]
+
+
+Operation = Union[Insert, Delete, Replace, Move]
+
+
+def tree_diff(self: TreeNode, other: TreeNode) -> List[Operation]:
+    key = subtree_keys(self, other)
+    ops: List[Operation] = []
+    q = deque([(self, other, ())])
+    while q:
+        s, t, p = q.popleft()
+        if key(s) == key(t) and same(s, t):
+            continue
+        if s.value != t.value:
+            ops.append(Replace(p, t.value))
+        sc, tc = s._children, t._children
+        sk, tk = list(map(key, sc)), list(map(key, tc))
+        # source index of every target child, None for inserted ones
+        sources: List[Optional[int]] = [None] * len(tc)
+        pairs: List[Tuple[int, int]] = []
+        blocks: List[Tuple[int, int, int, int]] = []
+        opcodes = [('equal', 0, len(sk), 0, len(tk))] if sk == tk else \
+            SequenceMatcher(None, sk, tk, autojunk=False).get_opcodes()
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == 'equal':
+                sources[j1:j2] = range(i1, i2)
+                # colliding hashes, nodes stay in place and are compared recursively
+                pairs.extend((i, j) for i, j in zip(range(i1, i2), range(j1, j2)) if not same(sc[i], tc[j]))
+            else:
+                blocks.append((i1, i2, j1, j2))
+        # equal subtrees deleted at one position and inserted at another are moved
+        deleted: Dict[int, List[int]] = {}
+        for i1, i2, _, _ in blocks:
+            for i in range(i1, i2):
+                deleted.setdefault(sk[i], []).append(i)
+        moved = set()
+        for _, _, j1, j2 in blocks:
+            for j in range(j1, j2):
+                m = deleted.get(tk[j], ())
+                i = next((i for i in m if same(sc[i], tc[j])), None)
+                if i is not None:
+                    m.remove(i)
+                    sources[j] = i
+                    moved.add(i)
+        # the rest are aligned by values, nodes paired with each other are compared recursively
+        for i1, i2, j1, j2 in blocks:
+            si = [i for i in range(i1, i2) if i not in moved]
+            tj = [j for j in range(j1, j2) if sources[j] is None]
+            vs, vt = [sc[i].value for i in si], [tc[j].value for j in tj]
+            for tag, a1, a2, b1, b2 in SequenceMatcher(None, vs, vt, autojunk=False).get_opcodes():
+                k = a2 - a1 if tag == 'equal' else min(a2 - a1, b2 - b1) if tag == 'replace' else 0
+                for i, j in zip(si[a1:a1 + k], tj[b1:b1 + k]):
+                    sources[j] = i
+                    pairs.append((i, j))
+        kept = {i for i in sources if i is not None}
+        for i in range(len(sc) - 1, -1, -1):
+            if i not in kept:
+                ops.append(Delete(p + (i,)))
+        current: List[int] = [i for i in range(len(sc)) if i in kept]
+        for j, i in enumerate(sources):
+            if i is None:
+                ops.append(Insert(p + (j,), tc[j]))
+                current.insert(j, -1)
+            elif current[j] != i:
+                k = current.index(i, j)
+                ops.append(Move(p + (k,), p + (j,)))
+                current.insert(j, current.pop(k))
+        q.extend((sc[i], tc[j], p + (j,)) for i, j in pairs)
+    return ops
+
+
+def same(s: TreeNode, t: TreeNode) -> bool:
+    return s is t or s == t
+
+
+def subtree_keys(*trees: TreeNode) -> Callable[[TreeNode], int]:
+    """
+    :return: function returning Merkle hash of any subtree of trees, hashes of writable nodes
+        are computed once in advance, frozen nodes keep their own
+    """
+    hashes: Dict[int, int] = {}
+    for tree in trees:
+        # pre-order without descending into frozen subtrees
+        o: List[TreeNode] = []
+        q: List[TreeNode] = [tree]
+        while q:
+            t = q.pop()
+            o.append(t)
+            if not t._is_frozen:
+                q.extend(reversed(t._children))
+        r: List[int] = []
+        for t in reversed(o):
+            if t._is_frozen:
+                h = hash(t)
+            else:
+                n = len(t._children)
+                h = node_hash(t.value, tuple(r[:-n - 1:-1]))
+                del r[len(r) - n:]
+            hashes[id(t)] = h
+            r.append(h)
+
+    def key(t: TreeNode) -> int:
+        h = hashes.get(id(t))
+        return hash(t) if h is None else h
+    return key
+
+
+def tree_apply(self: Any, patch: Iterable[Operation]) -> None:
+    for op in patch:
+        if isinstance(op, Replace):
+            t = self.thaw(op.path)
+            if t._is_frozen:
+                raise TreeIsFrozenError(f'node at {op.path} is frozen, its value can not be replaced')
+            t.value = op.value
+        elif isinstance(op, Delete):
+            del self[op.path]
+        elif isinstance(op, Insert):
+            # frozen subtrees are safe to share, writable ones are copied
+            self.insert(op.path, op.tree if op.tree._is_frozen else op.tree.clone())
+        elif isinstance(op, Move):
+            t = self[op.path]
+            del self[op.path]
+            self.insert(op.to, t)
+        else:
+            raise TypeError(f'unknown operation of patch {op!r}')
@@ -0,0 +1,643 @@
+from array import array
+from collections import deque
+from itertools import accumulate, chain, repeat
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+
+from .mapped import ARRAYS, map_image, write_image
+from .path import Path, as_indices, paths_preparation
+from .serialization import PickleCodec, ValueCodec
+from .tools import Descend, index_typecode, node_hash
+from .tree import Tree, indices_type_error
+from .tree_node import TreeNode
+
+_Int = Union[int, float]
+
+
+class FrozenStore:
+    """
+    Columnar storage of a frozen tree.
+
+    Nodes are numbered in breadth first order, so children of every node occupy a contiguous
+    range of indexes ``[first_child[i], first_child[i] + child_count[i])`` and the whole subtree
+    of a node occupies a contiguous range of :attr:`order` starting at ``preorder[i]``.
+    """
+
+    __slots__ = ('values', 'parent', 'first_child', 'child_count', 'preorder', 'order', 'size',
+                 '_depth', '_height', '_hash')
+
+    values: Sequence[Any]
+    """Values of nodes in breadth first order"""
+    parent: Sequence[int]
+    """Index of parent node (``-1`` for root)"""
+    first_child: Sequence[int]
+    """Index of the first child node"""
+    child_count: Sequence[int]
+    """Number of children"""
+    preorder: Sequence[int]
+    """Position of node in depth first (pre-order) traversal"""
+    order: Sequence[int]
+    """Indexes of nodes in depth first (pre-order) traversal, inverse of :attr:`preorder`"""
+    size: Sequence[int]
+    """Number of nodes in subtree"""
+
+    def __init__(self, values: Sequence[Any], parent: Sequence[int], first_child: Sequence[int],
+                 child_count: Sequence[int], preorder: Sequence[int], order: Sequence[int],
+                 size: Sequence[int]) -> None:
+        self.values = values
+        self.parent = parent
+        self.first_child = first_child
+        self.child_count = child_count
+        self.preorder = preorder
+        self.order = order
+        self.size = size
+        self._depth: Optional[Sequence[int]] = None
+        self._height: Optional[Sequence[int]] = None
+        self._hash: Optional[Sequence[int]] = None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def depth(self) -> Sequence[int]:
+        """
+        :return: depth of every node (root has depth 1), computed once
+        """
+        if self._depth is None:
+            self._depth = packed_depth(self.parent)
+        return self._depth
+
+    def height(self) -> Sequence[int]:
+        """
+        :return: height of every subtree, computed once
+        """
+        if self._height is None:
+            self._height = packed_height(self.parent)
+        return self._height
+
+    def hash(self) -> Sequence[int]:
+        """
+        :return: hash of every subtree, computed once
+        """
+        if self._hash is None:
+            self._hash = packed_hash(self)
+        return self._hash
+
+    def children(self, i: int) -> range:
+        f = self.first_child[i]
+        return range(f, f + self.child_count[i])
+
+    def subtree_order(self, i: int) -> Sequence[int]:
+        p = self.preorder[i]
+        return self.order[p:p + self.size[i]]
+
+
+class FrozenTree:
+    """
+    Read-only tree packed into flat arrays (see :class:`FrozenStore`).
+
+    Every node of a frozen tree is a lightweight view (store, index), views are created on demand
+    only for nodes handed out to the caller. Packing takes about as long as building the tree,
+    so it pays off for trees read more than once. Usually created with :meth:`justree.tree.Tree.freeze`:
+
+    >>> frozen = Tree.from_tuple((1, [(2, []), (3, [])])).freeze(compact=True)
+    >>> print(frozen[1])
+    (3)
+    """
+
+    __slots__ = ('_store', '_index')
+
+    _store: FrozenStore
+    _index: int
+
+    def __init__(self, tree: Union[TreeNode, 'FrozenTree']) -> None:
+        """
+        Pack a tree into flat arrays
+
+        :param tree: :class:`justree.tree.Tree` to pack, it stays untouched,
+            or :class:`FrozenTree` sharing its arrays unless it is a subtree
+        """
+        self._store = pack_tree(tree)
+        self._index = 0
+
+    @classmethod
+    def from_tree(cls, tree: TreeNode) -> 'FrozenTree':
+        """
+        Pack a tree into flat arrays
+
+        :param tree: :class:`justree.tree.Tree` to pack
+        :return: packed frozen tree
+        """
+        return cls(tree)
+
+    @property
+    def value(self) -> Any:
+        """
+        Value of a tree node
+        """
+        return self._store.values[self._index]
+
+    def __eq__(self, o: object) -> bool:
+        """
+        Overloaded equation method, frozen trees are comparable with :class:`justree.tree.Tree` as well
+
+        :param o: another tree to check equation with
+        :return: boolean result of equation
+        """
+        if isinstance(o, FrozenTree):
+            return packed_tree_eq(self._store, self._index, o._store, o._index)
+        elif isinstance(o, TreeNode):
+            return packed_tree_eq_tree(self._store, self._index, o)
+        return NotImplemented
+
+    def __ne__(self, o: object) -> bool:
+        """
+        Overloaded not-equation method
+
+        :param o: another tree to check not-equation with
+        :return: boolean result of not-equation
+        """
+        return not (self == o)
+
+    def __hash__(self) -> int:
+        """
+        Overloaded hash method, equal to hash of the equal frozen :class:`justree.tree.Tree`
+
+        :return: hash value
+        """
+        return self._store.hash()[self._index]
+
+    def __str__(self) -> str:
+        """
+        Overloaded string method
+
+        :return: string representation of tree, the same as for :class:`justree.tree.Tree`
+        """
+        return ''.join(packed_tree_str_chunks(self._store, self._index))
+
+    def __repr__(self) -> str:
+        """
+        Overloaded repr method
+
+        :return: string representation of tree that is the valid Python expression
+        """
+        return ''.join(packed_tree_repr_chunks(type(self), self._store, self._index))
+
+    def write_to(self, fp: TextIO, representation: bool = False) -> None:
+        """
+        Write string representation of tree into text stream piece by piece
+
+        :param fp: text stream with ``write`` method
+        :param representation: write :func:`repr` of tree instead of :class:`str`
+        """
+        if representation:
+            fp.writelines(packed_tree_repr_chunks(type(self), self._store, self._index))
+        else:
+            fp.writelines(packed_tree_str_chunks(self._store, self._index))
+
+    def __len__(self) -> int:
+        """
+        :return: number of children of the tree root node
+        """
+        return self._store.child_count[self._index]
+
+    def __iter__(self) -> Iterator['FrozenTree']:
+        """
+        :return: children of the tree root node
+        """
+        return packed_views(type(self), self._store, self._store.children(self._index))
+
+    def __getitem__(self, v: object) -> 'FrozenTree':
+        """
+        Get node by index or by address specified as tuple of indexes
+
+        :param v: index or tuple of indexes
+        :return: node by index
+        """
+        v = as_indices(v)
+        if isinstance(v, int):
+            return self[v,]
+        elif isinstance(v, tuple):
+            return self._view(packed_dereference(self._store, self._index, v))
+        else:
+            raise TypeError(indices_type_error(self, v))
+
+    def size(self) -> int:
+        """
+        :return: number of tree nodes
+        """
+        return self._store.size[self._index]
+
+    def height(self) -> int:
+        """
+        :return: height of tree
+        """
+        return self._store.height()[self._index]
+
+    def freeze(self) -> None:
+        """
+        Frozen tree is always readonly, method exists for compatibility with :class:`justree.tree.Tree`
+        """
+
+    def unfreeze(self) -> Tree:
+        """
+        Make writable copy of tree
+
+        :return: writable :class:`justree.tree.Tree`
+        """
+        return packed_tree_unpack(self._store, self._index)
+
+    def save(self, fp: BinaryIO, codec: Optional[ValueCodec] = None) -> None:
+        """
+        Write image of tree to be opened with :meth:`open` (see :mod:`justree.mapped`)
+
+        :param fp: binary stream
+        :param codec: codec of values, :class:`justree.serialization.PickleCodec` by default
+        """
+        store = self._store if self._index == 0 else pack_tree(self.unfreeze())
+        arrays = [getattr(store, name) for name in ARRAYS[:-1]] + [store.height()]
+        write_image(fp, store.values, arrays, PickleCodec() if codec is None else codec)
+
+    @classmethod
+    def open(cls, path: str, codec: Optional[ValueCodec] = None) -> 'FrozenTree':
+        """
+        Memory map image of tree written by :meth:`save`, nothing is parsed or copied on opening:
+        tree operations run against the mapped pages, values are decoded on access
+
+        :param path: path to image file
+        :param codec: codec of values, the same as used by :meth:`save`
+        :return: frozen tree backed by the mapped file
+        """
+        values, arrays = map_image(path, PickleCodec() if codec is None else codec)
+        store = FrozenStore(values, *arrays[:-1])
+        store._height = arrays[-1]
+        return packed_view(cls, store, 0)
+
+    def to_tuple(self) -> Tuple[Any, Iterable[Tuple]]:
+        """
+        Convert tree into flat structure.
+
+        :return: flat structure with the same order of elements
+        """
+        return packed_tree_to_tuple(self._store, self._index)
+
+    def bfs(self, reverse: bool = False, mirror: bool = False, descend: Optional[Descend] = None) \
+            -> Iterable['FrozenTree']:
+        """
+        Breadth First Search
+
+        :param reverse: reverse resulting order of nodes
+        :param mirror: used reversed children order on whole tree
+        :param descend: predicate of node telling whether to visit its children
+            (see :meth:`justree.tree.Tree.bfs`)
+        :return: nodes in requested order
+        """
+        r = packed_bfs(self._store, self._index, mirror, self._descend(descend))
+        if reverse:
+            r = reversed(list(r))
+        return packed_views(type(self), self._store, r)
+
+    def bfs_ex(self, depth: Optional[int] = None, reverse: bool = False, mirror: bool = False,
+               paths: str = 'tuple', descend: Optional[Descend] = None) \
+            -> Iterable[Tuple['FrozenTree', int, Path]]:
+        """
+        Breadth First Search appended with nodes positions
+
+        :param depth: limit search with max allowed depth
+        :param reverse: reverse resulting order of nodes
+        :param mirror: used reversed children order on whole tree
+        :param paths: kind of nodes positions: ``'tuple'``, ``'lazy'`` or ``'none'``
+            (see :meth:`justree.tree.Tree.bfs_ex`)
+        :param descend: predicate of node telling whether to visit its children
+            (see :meth:`justree.tree.Tree.bfs`)
+        :return: nodes in requested order
+        """
+        r = packed_bfs_ex(type(self), self._store, self._index, depth, mirror, paths, descend)
+        return reversed(list(r)) if reverse else r
+
+    def dfs(self, reverse: bool = False, mirror: bool = False, post_order: bool = False,
+            descend: Optional[Descend] = None) -> Iterable['FrozenTree']:
+        """
+        Depth First Search
+
+        :param reverse: reverse resulting order of nodes
+        :param mirror: used reversed children order on whole tree
+        :param post_order: taking node on leaving (usually on entering), incompatible with param `reverse`
+        :param descend: predicate of node telling whether to visit its children
+            (see :meth:`justree.tree.Tree.bfs`)
+        :return: nodes in requested order
+        """
+        assert not (reverse and post_order), 'Param `post_order` incompatible with param `reverse`'
+        # post-order is the reversed pre-order of the mirrored tree
+        if post_order:
+            reverse, mirror = True, not mirror
+        r = packed_dfs(self._store, self._index, mirror, self._descend(descend))
+        if reverse:
+            r = reversed(r if hasattr(r, '__len__') else list(r))
+        return packed_views(type(self), self._store, r)
+
+    def dfs_ex(self, depth: Optional[int] = None,
+               reverse: bool = False, mirror: bool = False, post_order: bool = False, paths: str = 'tuple',
+               descend: Optional[Descend] = None) -> Iterable[Tuple['FrozenTree', int, Path]]:
+        """
+        Depth First Search appended with nodes positions
+
+        :param depth: limit search with max allowed depth
+        :param reverse: reverse resulting order of nodes
+        :param mirror: used reversed children order on whole tree
+        :param post_order: taking node on leaving (usually on entering), incompatible with param `reverse`
+        :param paths: kind of nodes positions: ``'tuple'``, ``'lazy'`` or ``'none'``
+            (see :meth:`justree.tree.Tree.dfs_ex`)
+        :param descend: predicate of node telling whether to visit its children
+            (see :meth:`justree.tree.Tree.bfs`)
+        :return: nodes in requested order
+        """
+        assert not (reverse and post_order), 'Param `post_order` incompatible with param `reverse`'
+        if post_order:
+            reverse, mirror = True, not mirror
+        r = packed_dfs_ex(type(self), self._store, self._index, depth, mirror, paths, descend)
+        return reversed(list(r)) if reverse else r
+
+    def _view(self, i: int) -> 'FrozenTree':
+        return packed_view(type(self), self._store, i)
+
+    def _descend(self, descend: Optional[Descend]) -> Optional[Callable[[int], bool]]:
+        return None if descend is None else lambda i: descend(self._view(i))
+
+
+def packed_view(cls: type, store: FrozenStore, i: int) -> FrozenTree:
+    t = object.__new__(cls)
+    t._store = store
+    t._index = i
+    return t
+
+
+def packed_views(cls: type, store: FrozenStore, indexes: Iterable[int]) -> Iterator[FrozenTree]:
+    # views are made inline, a call per node would double the cost of traversals
+    new = object.__new__
+    for i in indexes:
+        t = new(cls)
+        t._store = store
+        t._index = i
+        yield t
+
+
+def pack_tree(self: Union[TreeNode, FrozenTree]) -> FrozenStore:
+    if isinstance(self, FrozenTree):
+        # stores are immutable, the whole tree shares its store, a subtree is packed anew
+        return self._store if self._index == 0 else pack_tree(self.unfreeze())
+    if not isinstance(self, TreeNode):
+        raise TypeError(f'{type(self).__name__} is not a tree, FrozenTree packs Tree or FrozenTree')
+    q: List[TreeNode] = [self]
+    counts: List[int] = []
+    # the list grows while it is iterated, so nodes come in breadth first order
+    for t in q:
+        ch = t._children
+        counts.append(len(ch))
+        q.extend(ch)
+    values = [t.value for t in q]
+    del q
+
+    n = len(values)
+    tc = index_typecode(n)
+    child_count = array(tc, counts)
+    # children of all nodes follow each other in breadth first order
+    first_child = array(tc, accumulate(chain((1,), counts)))
+    del first_child[n:]
+    parent = array(tc, chain((-1,), chain.from_iterable(map(repeat, range(n), counts))))
+    order = array(tc)
+    stack = [0]
+    while stack:
+        i = stack.pop()
+        order.append(i)
+        f = first_child[i]
+        stack.extend(range(f + child_count[i] - 1, f - 1, -1))
+    preorder = array(tc, bytes(order.itemsize * n))
+    for r, i in enumerate(order):
+        preorder[i] = r
+    size = array(tc, repeat(1, n))
+    for i in range(n - 1, 0, -1):
+        size[parent[i]] += size[i]
+    return FrozenStore(values, parent, first_child, child_count, preorder, order, size)
+
+
+def packed_depth(parent: Sequence[int]) -> Sequence[int]:
+    depth = array(index_typecode(len(parent)), repeat(1, len(parent)))
+    for i in range(1, len(parent)):
+        depth[i] = depth[parent[i]] + 1
+    return depth
+
+
+def packed_height(parent: Sequence[int]) -> Sequence[int]:
+    height = array(index_typecode(len(parent)), repeat(1, len(parent)))
+    for i in range(len(parent) - 1, 0, -1):
+        p = parent[i]
+        if height[p] <= height[i]:
+            height[p] = height[i] + 1
+    return height
+
+
+def packed_dereference(store: FrozenStore, i: int, ix: Tuple[int, ...]) -> int:
+    for k in ix:
+        c = store.child_count[i]
+        if k < 0:
+            k += c
+        if not 0 <= k < c:
+            raise IndexError('list index out of range')
+        i = store.first_child[i] + k
+    return i
+
+
+def packed_bfs(store: FrozenStore, root: int, mirror: bool, descend: Optional[Callable[[int], bool]] = None) \
+        -> Iterable[int]:
+    if root == 0 and not mirror and descend is None:
+        # breadth first order is the storage order
+        return range(len(store))
+    return packed_bfs_indexes(store, root, mirror, descend)
+
+
+def packed_bfs_indexes(store: FrozenStore, root: int, mirror: bool,
+                       descend: Optional[Callable[[int], bool]] = None) -> Iterable[int]:
+    q = deque([root])
+    while q:
+        i = q.popleft()
+        if descend is None or descend(i):
+            r = store.children(i)
+            q.extend(reversed(r) if mirror else r)
+        yield i
+
+
+def packed_dfs(store: FrozenStore, root: int, mirror: bool, descend: Optional[Callable[[int], bool]] = None) \
+        -> Iterable[int]:
+    if not mirror and descend is None:
+        # subtree occupies contiguous range of pre-order
+        return store.subtree_order(root)
+    return packed_dfs_indexes(store, root, mirror, descend)
+
+
+def packed_dfs_indexes(store: FrozenStore, root: int, mirror: bool,
+                       descend: Optional[Callable[[int], bool]] = None) -> Iterable[int]:
+    q = [root]
+    while q:
+        i = q.pop()
+        if descend is None or descend(i):
+            r = store.children(i)
+            q.extend(r if mirror else reversed(r))
+        yield i
+
+
+def packed_bfs_ex(cls: type, store: FrozenStore, root: int, depth: Optional[_Int], mirror: bool, paths: str,
+                  descend: Optional[Descend] = None) -> Iterable[Tuple[FrozenTree, int, Path]]:
+    depth = float('inf') if depth is None else depth
+    path, sub_paths = paths_preparation(paths)
+    first_child, child_count = store.first_child, store.child_count
+    new = object.__new__
+    q = deque([(root, 1, path)])
+    while q:
+        i, d, p = q.popleft()
+        # views are made inline, a call per node would double the cost of traversals
+        t = new(cls)
+        t._store = store
+        t._index = i
+        if d < depth and (descend is None or descend(t)):
+            f = first_child[i]
+            r = range(f, f + child_count[i])
+            if mirror:
+                q.extend(zip(reversed(r), repeat(d + 1), reversed(sub_paths(p, len(r)))))
+            else:
+                q.extend(zip(r, repeat(d + 1), sub_paths(p, len(r))))
+        yield t, d, p
+
+
+def packed_dfs_ex(cls: type, store: FrozenStore, root: int, depth: Optional[_Int], mirror: bool, paths: str,
+                  descend: Optional[Descend] = None) -> Iterable[Tuple[FrozenTree, int, Path]]:
+    if depth is None and not mirror and descend is None:
+        return packed_dfs_ex_preorder(cls, store, root, paths)
+    return packed_dfs_ex_stack(cls, store, root, depth, mirror, paths, descend)
+
+
+def packed_dfs_ex_preorder(cls: type, store: FrozenStore, root: int, paths: str) \
+        -> Iterable[Tuple[FrozenTree, int, Path]]:
+    # subtree occupies contiguous range of pre-order, depths come from the store,
+    # paths of children of every node on the current branch are kept by depth
+    path, sub_paths = paths_preparation(paths)
+    parent, first_child, child_count = store.parent, store.first_child, store.child_count
+    depth = store.depth()
+    base = depth[root] - 1
+    new = object.__new__
+    kids: List[Any] = [[path]]
+    for i in store.subtree_order(root):
+        d = depth[i] - base
+        p = kids[d - 1][i - first_child[parent[i]]] if d > 1 else path
+        t = new(cls)
+        t._store = store
+        t._index = i
+        n = child_count[i]
+        if n:
+            del kids[d:]
+            kids.append(sub_paths(p, n))
+        yield t, d, p
+
+
+def packed_dfs_ex_stack(cls: type, store: FrozenStore, root: int, depth: Optional[_Int], mirror: bool,
+                        paths: str, descend: Optional[Descend]) -> Iterable[Tuple[FrozenTree, int, Path]]:
+    depth = float('inf') if depth is None else depth
+    path, sub_paths = paths_preparation(paths)
+    first_child, child_count = store.first_child, store.child_count
+    new = object.__new__
+    q = [(root, 1, path)]
+    while q:
+        i, d, p = q.pop()
+        t = new(cls)
+        t._store = store
+        t._index = i
+        if d < depth and (descend is None or descend(t)):
+            f = first_child[i]
+            r = range(f, f + child_count[i])
+            if mirror:
+                q.extend(zip(r, repeat(d + 1), sub_paths(p, len(r))))
+            else:
+                q.extend(zip(reversed(r), repeat(d + 1), reversed(sub_paths(p, len(r)))))
+        yield t, d, p
+
+
+def packed_tree_eq(store: FrozenStore, root: int, other: FrozenStore, other_root: int) -> bool:
+    if store is other and root == other_root:
+        return True
+    if store.size[root] != other.size[other_root]:
+        return False
+    if root == 0 and other_root == 0:
+        return store.child_count == other.child_count and store.values == other.values
+    for i, j in zip(packed_bfs_indexes(store, root, False), packed_bfs_indexes(other, other_root, False)):
+        if store.child_count[i] != other.child_count[j] or store.values[i] != other.values[j]:
+            return False
+    return True
+
+
+def packed_tree_eq_tree(store: FrozenStore, root: int, other: TreeNode) -> bool:
+    values, child_count = store.values, store.child_count
+    q = deque([other])
+    pop, extend = q.popleft, q.extend
+    for i in packed_bfs(store, root, False):
+        t = pop()
+        ch = t._children
+        if child_count[i] != len(ch) or values[i] != t.value:
+            return False
+        extend(ch)
+    return True
+
+
+def packed_hash(store: FrozenStore) -> List[int]:
+    values = store.values
+    first_child = store.first_child
+    child_count = store.child_count
+    h = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        f = first_child[i]
+        h[i] = node_hash(values[i], tuple(h[f:f + child_count[i]]))
+    return h
+
+
+def packed_tree_str_chunks(store: FrozenStore, root: int) -> Iterable[str]:
+    values = store.values
+    yield '(' + str(values[root])
+    p = 0
+    q = list(zip(reversed(store.children(root)), repeat(1)))
+    while q:
+        i, c = q.pop()
+        yield ')' * (p - c + 1) + ' (' + str(values[i])
+        p = c
+        q.extend(zip(reversed(store.children(i)), repeat(c + 1)))
+    yield ')' * (p + 1)
+
+
+def packed_tree_repr_chunks(cls: type, store: FrozenStore, root: int) -> Iterable[str]:
+    values = store.values
+    yield f'{cls.__name__}.from_tree(Tree(value={repr(values[root])}, children=('
+    p = 0
+    q = list(zip(reversed(store.children(root)), repeat(1)))
+    while q:
+        i, c = q.pop()
+        yield ')),' * (p - c + 1) + f' Tree(value={repr(values[i])}, children=('
+        p = c
+        q.extend(zip(reversed(store.children(i)), repeat(c + 1)))
+    yield ')),' * p + ')))'
+
+
+def packed_tree_unpack(store: FrozenStore, root: int) -> Tree:
+    values = store.values
+    nodes = {i: Tree(values[i]) for i in packed_bfs(store, root, False)}
+    for i, t in nodes.items():
+        t._children = [nodes[j] for j in store.children(i)]
+    return nodes[root]
+
+
+def packed_tree_to_tuple(store: FrozenStore, root: int) -> Tuple[Any, Iterable[Tuple]]:
+    values = store.values
+    t: Tuple[Any, List[Tuple]] = (values[root], [])
+    q = deque([(root, t[1])])
+    while q:
+        i, l = q.popleft()
+        for j in store.children(i):
+            nt: Tuple[Any, List[Tuple]] = (values[j], [])
+            l.append(nt)
+            q.append((j, nt[1]))
+    return t
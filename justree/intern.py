@@ -0,0 +1,91 @@
+from typing import Any, List, Tuple, TypeVar
+from weakref import WeakValueDictionary
+
+from .tools import node_hash
+from .tree_node import TreeNode
+
+T = TypeVar('T', bound=TreeNode)
+
+
+class TreeInterner:
+    """
+    Table of canonical frozen subtrees (hash-consing).
+
+    Interning a tree returns an equal frozen tree whose every subtree is the single canonical
+    instance of all equal subtrees interned with the same table, so equal subtrees are stored
+    once and equality of interned trees is decided by identity. The table keeps only weak
+    references, a canonical subtree is evicted as soon as no interned tree uses it.
+
+    Values are matched by type and equality, so ``1``, ``1.0`` and ``True`` stay different nodes.
+    Canonical nodes are always new ones owned by the table, nodes of interned trees are never adopted,
+    so unfreezing in place or linking of the given tree does not affect other interned trees.
+
+    >>> interner = TreeInterner()
+    >>> a = interner.intern(Tree.from_tuple((1, [(2, []), (2, [])])))
+    >>> a[0] is a[1]
+    True
+    """
+
+    __slots__ = ('_table', '__weakref__')
+
+    _table: 'WeakValueDictionary[Tuple[type, Any, Tuple[int, ...]], TreeNode]'
+
+    def __init__(self) -> None:
+        self._table = WeakValueDictionary()
+
+    def __len__(self) -> int:
+        """
+        :return: number of canonical subtrees alive
+        """
+        return len(self._table)
+
+    def intern(self, tree: T) -> T:
+        """
+        Get canonical frozen tree equal to the given one, values of tree nodes must be hashable
+
+        :param tree: tree to intern, stays untouched
+        :return: canonical frozen tree
+        """
+        return non_recursive_tree_intern(self._table, tree)
+
+    def clear(self) -> None:
+        """
+        Forget all canonical subtrees, trees interned before are not shared with trees interned after
+        """
+        self._table.clear()
+
+
+default_interner = TreeInterner()
+"""
+Interner used by :meth:`justree.tree.Tree.intern` by default
+"""
+
+
+def non_recursive_tree_intern(table: 'WeakValueDictionary[Tuple[type, Any, Tuple[int, ...]], TreeNode]',
+                              self: T) -> T:
+    o: List[TreeNode] = []
+    q: List[TreeNode] = [self]
+    while q:
+        t = q.pop()
+        o.append(t)
+        q.extend(reversed(t._children))
+    # in reversed pre-order canonical children lay on top of stack, the first child is the topmost
+    r: List[Any] = []
+    for t in reversed(o):
+        n = len(t._children)
+        children = r[:-n - 1:-1]
+        del r[len(r) - n:]
+        # children are canonical already, so their identities describe the whole subtree,
+        # type of value keeps equal values of different types (e.g. 1, 1.0 and True) apart
+        key = (type(t.value), t.value, tuple(map(id, children)))
+        c = table.get(key)
+        if c is None:
+            # nodes of the given tree are not adopted, its owner may unfreeze or link them later
+            c = type(t)(t.value, children)
+            c._is_frozen = True
+            c._hash = node_hash(c.value, tuple(ct._hash for ct in children))
+            c._size = 1 + sum(ct._size for ct in children)
+            c._height = 1 + max((ct._height for ct in children), default=0)
+            table[key] = c
+        r.append(c)
+    return r[0]
@@ -0,0 +1,132 @@
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple, TypeVar, Union
+
+from .path import IndexPath, as_indices
+from .tools import index_typecode
+from .tree_node import TreeNode
+
+T = TypeVar('T', bound=TreeNode)
+_Query = Union[TreeNode, Tuple[int, ...], IndexPath]
+
+
+class LcaIndex:
+    """
+    Index of a frozen tree answering lowest common ancestor queries in O(1)
+    and level ancestor queries in O(log n) time.
+
+    Nodes are numbered in depth first pre-order. For nodes ``u < v`` the shallowest node among
+    ``u + 1 .. v`` is a child of their lowest common ancestor, so a sparse table of range minimums
+    of depths over pre-order (a compact form of Euler tour) answers the query with two lookups.
+    Ancestors of a node at a given depth are found by bisection of pre-order numbers of that level.
+
+    Queries accept nodes of the tree or their paths, results are of the same kind as the first
+    argument. Every node must have one position, trees sharing subtrees
+    (see :meth:`justree.tree.Tree.intern`) are not indexed.
+
+    >>> tree = Tree.from_tuple((1, [(2, [(3, []), (4, [])]), (5, [])]))
+    >>> tree.freeze()
+    >>> index = tree.lca_index()
+    >>> index.lca((0, 0), (0, 1)), index.ancestor((0, 1), 2), index.distance((0, 1), (1,))
+    ((0,), (), 3)
+    """
+
+    __slots__ = ('_tree', '_nodes', '_numbers', '_depth', '_parent', '_table', '_levels')
+
+    def __init__(self, tree: T) -> None:
+        """
+        Build index, O(n log n) time and memory
+
+        :param tree: frozen tree, must not be changed while index is in use
+        """
+        self._tree = tree
+        self._nodes: List[TreeNode] = []
+        self._depth = array('i')
+        for t, d, _ in tree.dfs_ex(paths='none'):
+            self._nodes.append(t)
+            self._depth.append(d)
+        n = len(self._nodes)
+        typecode = index_typecode(n)
+        self._numbers: Dict[int, int] = {id(t): k for k, t in enumerate(self._nodes)}
+        if len(self._numbers) != n:
+            raise ValueError('tree shares subtrees between positions, nodes have no single ancestors')
+        self._parent = array(typecode, [-1]) * n
+        self._levels: List['array[int]'] = [array(typecode) for _ in range(max(self._depth, default=0) + 1)]
+        s: List[int] = []
+        for k, d in enumerate(self._depth):
+            del s[d - 1:]
+            if s:
+                self._parent[k] = s[-1]
+            s.append(k)
+            self._levels[d].append(k)
+        # depth and number packed into one key, so builtin min compares depths first
+        level = array('q', (d * n + k for k, d in enumerate(self._depth)))
+        self._table = [level]
+        half = 1
+        while 2 * half <= n:
+            level = array('q', map(min, level[:len(level) - half], level[half:]))
+            self._table.append(level)
+            half *= 2
+
+    def lca(self, a: _Query, b: _Query) -> _Query:
+        """
+        :param a: node or its path
+        :param b: node or its path
+        :return: lowest common ancestor of nodes
+        """
+        k = self._lca(self._number(a), self._number(b))
+        return self._result(a, k)
+
+    def ancestor(self, a: _Query, k: int) -> Optional[_Query]:
+        """
+        :param a: node or its path
+        :param k: number of levels to go up, 0 for the node itself, 1 for its parent
+        :return: ancestor ``k`` levels above the node, ``None`` if the root is closer
+        """
+        if k < 0:
+            raise ValueError(f'k must not be negative, not {k}')
+        u = self._number(a)
+        d = self._depth[u] - k
+        if d < 1:
+            return None
+        level = self._levels[d]
+        return self._result(a, level[bisect_right(level, u) - 1])
+
+    def distance(self, a: _Query, b: _Query) -> int:
+        """
+        :param a: node or its path
+        :param b: node or its path
+        :return: number of edges on the path between nodes
+        """
+        u, v = self._number(a), self._number(b)
+        return self._depth[u] + self._depth[v] - 2 * self._depth[self._lca(u, v)]
+
+    def depth(self, a: _Query) -> int:
+        """
+        :param a: node or its path
+        :return: depth of node, 1 for the root as in :meth:`justree.tree.Tree.dfs_ex`
+        """
+        return self._depth[self._number(a)]
+
+    def _lca(self, u: int, v: int) -> int:
+        if u == v:
+            return u
+        if u > v:
+            u, v = v, u
+        j = (v - u).bit_length() - 1
+        level = self._table[j]
+        m = min(level[u + 1], level[v + 1 - (1 << j)])
+        return self._parent[m % len(self._nodes)]
+
+    def _number(self, a: Any) -> int:
+        if isinstance(a, (tuple, IndexPath)):
+            a = self._tree[a]
+        try:
+            return self._numbers[id(a)]
+        except KeyError:
+            raise ValueError(f'{a!r} is not a node of indexed tree') from None
+
+    def _result(self, a: Any, k: int) -> Any:
+        if isinstance(a, (tuple, IndexPath)):
+            return as_indices(a)[:self._depth[k] - 1]
+        return self._nodes[k]
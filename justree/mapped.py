@@ -0,0 +1,133 @@
+"""
+Image format of frozen trees designed for memory mapping.
+
+Image keeps arrays of :class:`justree.frozen_tree.FrozenStore` as is, so a mapped image is used
+without parsing: processes mapping one file share its pages through the page cache and only values
+of requested nodes are decoded. Integers are little-endian::
+
+    header:   b'JTRI' magic, uint8 version (1), uint8 array typecode ('i' or 'q'), 2 bytes padding,
+              uint64 n - number of nodes
+    arrays:   parent, first_child, child_count, preorder, order, size, height
+              n items of typecode each, every array padded to 8 bytes
+    values:   values encoded with a :class:`justree.serialization.ValueCodec` concatenated,
+              padded to 8 bytes
+    offsets:  uint64[n + 1] offsets of encoded values from start of values section
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Sequence as SequenceABC
+from typing import Any, BinaryIO, Iterable, List, Sequence, Tuple, Union
+
+from .serialization import ValueCodec, little_endian
+
+MAGIC = b'JTRI'
+VERSION = 1
+ARRAYS = ('parent', 'first_child', 'child_count', 'preorder', 'order', 'size', 'height')
+
+_HEADER = struct.Struct('<4sBcxxQ')
+_Buffer = Union[memoryview, 'array[int]']
+
+
+class MappedValues(SequenceABC):
+    """
+    Read-only sequence of values decoded on access from encoded buffer
+    """
+
+    __slots__ = ('_data', '_offsets', '_codec')
+
+    def __init__(self, data: memoryview, offsets: Sequence[int], codec: ValueCodec) -> None:
+        self._data = data
+        self._offsets = offsets
+        self._codec = codec
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: Any) -> Any:
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('values index out of range')
+        return self._codec.decode(self._data[self._offsets[i]:self._offsets[i + 1]])
+
+    def __eq__(self, o: object) -> bool:
+        if not isinstance(o, SequenceABC):
+            return NotImplemented
+        return len(self) == len(o) and all(a == b for a, b in zip(self, o))
+
+    __hash__ = None  # type: ignore
+
+
+def write_image(fp: BinaryIO, values: Iterable[Any], arrays: Sequence[Sequence[int]],
+                codec: ValueCodec) -> None:
+    """
+    Write image of frozen tree
+
+    :param fp: binary stream
+    :param values: values of nodes in storage order
+    :param arrays: arrays of storage in order of :data:`ARRAYS`
+    :param codec: codec of values
+    """
+    n = len(arrays[0])
+    typecode = arrays[0].typecode if isinstance(arrays[0], array) else arrays[0].format
+    fp.write(_HEADER.pack(MAGIC, VERSION, typecode.encode(), n))
+    for a in arrays:
+        a = little_endian(array(typecode, a))
+        fp.write(a.tobytes())
+        fp.write(padding(len(a) * a.itemsize))
+    offsets = array('q', [0])
+    o = 0
+    for v in values:
+        data = codec.encode(v)
+        fp.write(data)
+        o += len(data)
+        offsets.append(o)
+    fp.write(padding(o))
+    fp.write(little_endian(offsets).tobytes())
+
+
+def map_image(path: str, codec: ValueCodec) -> Tuple[MappedValues, List[_Buffer]]:
+    """
+    Map image of frozen tree into memory
+
+    :param path: path to image file
+    :param codec: codec of values, the same as used by :func:`write_image`
+    :return: values and arrays in order of :data:`ARRAYS`
+    """
+    with open(path, 'rb') as fp:
+        buffer = memoryview(mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ))
+    magic, version, typecode, n = _HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError(f'{path} is not an image of frozen tree')
+    if version != VERSION:
+        raise ValueError(f'unsupported version {version} of frozen tree image')
+    typecode = typecode.decode()
+    itemsize = array(typecode).itemsize
+    o = _HEADER.size
+    arrays = []
+    for _ in ARRAYS:
+        arrays.append(cast(buffer[o:o + n * itemsize], typecode))
+        o += n * itemsize
+        o += len(padding(n * itemsize))
+    offsets = cast(buffer[len(buffer) - (n + 1) * 8:], 'q')
+    values = MappedValues(buffer[o:], offsets, codec)
+    return values, arrays
+
+
+def cast(buffer: memoryview, typecode: str) -> _Buffer:
+    if sys.byteorder == 'little':
+        # zero-copy view of mapped pages
+        return buffer.cast('B').cast(typecode)
+    a = array(typecode)
+    a.frombytes(buffer)
+    a.byteswap()
+    return a
+
+
+def padding(n: int) -> bytes:
+    return bytes(-n % 8)
@@ -0,0 +1,153 @@
+"""
+Map and fold of trees in a pool of worker processes.
+
+Workers get flat pre-order encoding of nodes (values and numbers of children, see
+:meth:`justree.tree.Tree.to_preorder`) instead of pickled nested trees. A subtree occupies
+a contiguous slice of pre-order, so chunks are slices: for map any slices of balanced length,
+for fold disjoint subtrees picked top-down by their sizes, whose results are combined
+with the rest of nodes in the calling process. Functions are pickled, so they must be defined
+at module level, as required by :class:`concurrent.futures.ProcessPoolExecutor`.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+CHUNKS_PER_WORKER = 4
+"""Chunks made for every worker, so workers getting lighter chunks do not idle till the end"""
+
+
+def map_chunk(fn: Callable[[Any], Any], values: Sequence[Any]) -> List[Any]:
+    return list(map(fn, values))
+
+
+def fold_chunk(leaf_fn: Callable[[Any], Any], combine_fn: Callable[[Any, Tuple[Any, ...]], Any],
+               values: Sequence[Any], counts: Sequence[int]) -> List[Any]:
+    """
+    Fold forest given by pre-order, the same way as :meth:`justree.tree.Tree.fold` does
+
+    :return: results of roots of forest in order
+    """
+    r: List[Any] = []
+    for k in range(len(values) - 1, -1, -1):
+        n = counts[k]
+        if n:
+            v = combine_fn(values[k], tuple(r[:-n - 1:-1]))
+            del r[len(r) - n:]
+        else:
+            v = leaf_fn(values[k])
+        r.append(v)
+    r.reverse()
+    return r
+
+
+def preorder_sizes(counts: Sequence[int]) -> List[int]:
+    sizes = [0] * len(counts)
+    r: List[int] = []
+    for k in range(len(counts) - 1, -1, -1):
+        n = counts[k]
+        s = 1 + sum(r[len(r) - n:]) if n else 1
+        del r[len(r) - n:]
+        sizes[k] = s
+        r.append(s)
+    return sizes
+
+
+def subtree_chunks(counts: Sequence[int], sizes: Sequence[int], limit: int) -> List[int]:
+    """
+    :return: pre-order numbers of roots of disjoint subtrees not larger than limit,
+        taken as high as possible, in pre-order
+    """
+    roots: List[int] = []
+    q = [0]
+    while q:
+        k = q.pop()
+        if sizes[k] <= limit:
+            roots.append(k)
+            continue
+        children = []
+        c = k + 1
+        for _ in range(counts[k]):
+            children.append(c)
+            c += sizes[c]
+        q.extend(reversed(children))
+    return roots
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f'workers must be positive, not {workers}')
+    return workers
+
+
+def parallel_map(fn: Callable[[Any], Any], values: Sequence[Any], workers: Optional[int]) -> List[Any]:
+    """
+    :return: transformed values in order
+    """
+    workers = resolve_workers(workers)
+    if workers == 1:
+        return map_chunk(fn, values)
+    step = -(-len(values) // (workers * CHUNKS_PER_WORKER))
+    chunks = [values[b:b + step] for b in range(0, len(values), step)]
+    with ProcessPoolExecutor(workers) as executor:
+        r: List[Any] = []
+        for chunk in executor.map(map_chunk, repeat(fn), chunks):
+            r.extend(chunk)
+    return r
+
+
+def parallel_fold(leaf_fn: Callable[[Any], Any], combine_fn: Callable[[Any, Tuple[Any, ...]], Any],
+                  values: Sequence[Any], counts: Sequence[int], workers: Optional[int]) -> Any:
+    """
+    :return: result of the root of tree given by pre-order
+    """
+    workers = resolve_workers(workers)
+    if workers == 1:
+        return fold_chunk(leaf_fn, combine_fn, values, counts)[0]
+    sizes = preorder_sizes(counts)
+    limit = -(-len(values) // (workers * CHUNKS_PER_WORKER))
+    roots = subtree_chunks(counts, sizes, limit)
+    # neighbouring small subtrees are shipped together as one forest
+    tasks: List[List[int]] = [[]]
+    load = 0
+    for k in roots:
+        if load >= limit:
+            tasks.append([])
+            load = 0
+        tasks[-1].append(k)
+        load += sizes[k]
+    forest_values: List[List[Any]] = []
+    forest_counts: List[List[int]] = []
+    for task in tasks:
+        forest_values.append([])
+        forest_counts.append([])
+        for k in task:
+            forest_values[-1].extend(values[k:k + sizes[k]])
+            forest_counts[-1].extend(counts[k:k + sizes[k]])
+    with ProcessPoolExecutor(workers) as executor:
+        results: Dict[int, Any] = {}
+        forests = executor.map(fold_chunk, repeat(leaf_fn), repeat(combine_fn), forest_values, forest_counts)
+        for task, r in zip(tasks, forests):
+            results.update(zip(task, r))
+    # nodes above subtrees are folded here, subtrees stand for their results
+    o: List[int] = []
+    k = 0
+    while k < len(values):
+        o.append(k)
+        k += sizes[k] if k in results else 1
+    r: List[Any] = []
+    for k in reversed(o):
+        if k in results:
+            r.append(results[k])
+            continue
+        n = counts[k]
+        if n:
+            v = combine_fn(values[k], tuple(r[:-n - 1:-1]))
+            del r[len(r) - n:]
+        else:
+            v = leaf_fn(values[k])
+        r.append(v)
+    return r[0]
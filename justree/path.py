@@ -0,0 +1,139 @@
+from functools import total_ordering
+from itertools import repeat
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+
+@total_ordering
+class IndexPath:
+    """
+    Position of a tree node stored as a link to the position of its parent node.
+
+    Paths of sibling nodes share the whole prefix, so creating a path costs O(1) time and memory
+    regardless of node depth. Paths compare, hash and index exactly like the tuples of indexes
+    they represent, the tuple itself is built only on demand with :meth:`to_tuple`:
+
+    >>> path = IndexPath(IndexPath(IndexPath(), 1), 0)
+    >>> path == (1, 0), hash(path) == hash((1, 0)), path[-1]
+    (True, True, 0)
+    """
+
+    __slots__ = ('_parent', '_index', '_len')
+
+    _parent: Optional['IndexPath']
+    _index: int
+    _len: int
+
+    def __init__(self, parent: Optional['IndexPath'] = None, index: int = 0) -> None:
+        """
+        Create a path
+
+        :param parent: path of parent node, omit to create empty path of the root node
+        :param index: index of node in children list of parent node
+        """
+        self._parent = parent
+        self._index = index
+        self._len = 0 if parent is None else parent._len + 1
+
+    @property
+    def parent(self) -> Optional['IndexPath']:
+        """
+        Path of parent node (``None`` for root)
+        """
+        return self._parent
+
+    def to_tuple(self) -> Tuple[int, ...]:
+        """
+        :return: tuple of indexes
+        """
+        r = [0] * self._len
+        p = self
+        for k in range(self._len - 1, -1, -1):
+            r[k] = p._index
+            p = p._parent
+        return tuple(r)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.to_tuple())
+
+    def __getitem__(self, k: Union[int, slice]) -> Any:
+        return self.to_tuple()[k]
+
+    def __add__(self, o: Tuple[int, ...]) -> Tuple[int, ...]:
+        return self.to_tuple() + o
+
+    def __radd__(self, o: Tuple[int, ...]) -> Tuple[int, ...]:
+        return o + self.to_tuple()
+
+    def __eq__(self, o: object) -> bool:
+        if isinstance(o, IndexPath):
+            f, s = self, o
+            if f._len != s._len:
+                return False
+            # paths coming from one traversal share prefixes, stop at the first shared link
+            while f is not s:
+                if f._index != s._index:
+                    return False
+                f, s = f._parent, s._parent
+            return True
+        elif isinstance(o, tuple):
+            return self._len == len(o) and self.to_tuple() == o
+        return NotImplemented
+
+    def __lt__(self, o: object) -> bool:
+        if isinstance(o, IndexPath):
+            o = o.to_tuple()
+        if isinstance(o, tuple):
+            return self.to_tuple() < o
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.to_tuple())
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}{self.to_tuple()}'
+
+
+Path = Union[Tuple[int, ...], IndexPath, None]
+
+_SubPaths = Callable[[Any, int], List[Any]]
+
+
+def tuple_sub_paths(i: Tuple[int, ...], n: int) -> List[Tuple[int, ...]]:
+    return [i + (ci,) for ci in range(n)]
+
+
+def lazy_sub_paths(i: IndexPath, n: int) -> List[IndexPath]:
+    return list(map(IndexPath, repeat(i, n), range(n)))
+
+
+def none_sub_paths(_i: None, n: int) -> List[None]:
+    return [None] * n
+
+
+_PATHS: Dict[str, Tuple[Callable[[], Path], _SubPaths]] = {
+    'tuple': (tuple, tuple_sub_paths),
+    'lazy': (IndexPath, lazy_sub_paths),
+    'none': (lambda: None, none_sub_paths),
+}
+
+
+def paths_preparation(paths: str) -> Tuple[Path, _SubPaths]:
+    """
+    :param paths: kind of node positions: ``'tuple'``, ``'lazy'`` (:class:`IndexPath`) or ``'none'``
+    :return: path of the root node and function creating paths of ``n`` children by path of parent
+    """
+    try:
+        root, sub_paths = _PATHS[paths]
+    except KeyError:
+        raise ValueError(f'paths must be one of {", ".join(map(repr, _PATHS))}, not {paths!r}') from None
+    return root(), sub_paths
+
+
+def as_indices(v: object) -> object:
+    """
+    :return: tuple of indexes for :class:`IndexPath`, any other object as is
+    """
+    return v.to_tuple() if isinstance(v, IndexPath) else v
@@ -0,0 +1,196 @@
+"""
+Binary format of trees.
+
+Stream starts with a header followed by chunks, every chunk describes next nodes of tree
+in depth first pre-order. All integers are unsigned 32-bit little-endian::
+
+    header:  b'JTRE' magic, 1 byte of format version (1)
+    chunk:   uint32 n                number of nodes in chunk, 0 marks the end of stream
+             uint32[n] counts        numbers of children of nodes
+             uint32[n] lengths       lengths of encoded values
+             bytes[sum(lengths)]     values encoded with a :class:`ValueCodec` concatenated
+
+Writer and reader keep in memory one chunk at a time, so stream of any length is processed
+with bounded memory (the tree being built aside).
+"""
+
+import abc
+import pickle
+import struct
+import sys
+from array import array
+from typing import Any, BinaryIO, Iterable, Iterator, List, Tuple
+
+MAGIC = b'JTRE'
+VERSION = 1
+CHUNK_SIZE = 1 << 16
+
+_HEADER = struct.Struct('<4sB')
+_COUNT = struct.Struct('<I')
+_UINT32 = 'I' if array('I').itemsize == 4 else 'L'
+
+
+class ValueCodec(abc.ABC):
+    """
+    Converts values of tree nodes into bytes and back, abstract base class of pluggable codecs,
+    a codec missing any of the methods fails to instantiate
+    """
+
+    @abc.abstractmethod
+    def encode(self, value: Any) -> bytes:
+        """
+        :param value: value of node
+        :return: encoded value
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def decode(self, data: memoryview) -> Any:
+        """
+        :param data: bytes-like object produced by :meth:`encode`
+        :return: value of node
+        """
+        raise NotImplementedError
+
+
+class PickleCodec(ValueCodec):
+    """
+    Codec of arbitrary picklable values (default)
+    """
+
+    def __init__(self, protocol: int = pickle.HIGHEST_PROTOCOL) -> None:
+        self.protocol = protocol
+
+    def encode(self, value: Any) -> bytes:
+        return pickle.dumps(value, self.protocol)
+
+    def decode(self, data: memoryview) -> Any:
+        return pickle.loads(data)
+
+
+class StrCodec(ValueCodec):
+    """
+    Codec of :class:`str` values
+    """
+
+    def __init__(self, encoding: str = 'utf-8') -> None:
+        self.encoding = encoding
+
+    def encode(self, value: str) -> bytes:
+        return value.encode(self.encoding)
+
+    def decode(self, data: memoryview) -> str:
+        return str(data, self.encoding)
+
+
+class IntCodec(ValueCodec):
+    """
+    Codec of :class:`int` values of any size
+    """
+
+    def encode(self, value: int) -> bytes:
+        return value.to_bytes(value.bit_length() // 8 + 1, 'little', signed=True)
+
+    def decode(self, data: memoryview) -> int:
+        return int.from_bytes(data, 'little', signed=True)
+
+
+class BytesCodec(ValueCodec):
+    """
+    Codec of :class:`bytes` values
+    """
+
+    def encode(self, value: bytes) -> bytes:
+        return value
+
+    def decode(self, data: memoryview) -> bytes:
+        return bytes(data)
+
+
+def write_preorder(fp: BinaryIO, nodes: Iterable[Tuple[Any, int]], codec: ValueCodec,
+                   chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Write nodes into binary stream
+
+    :param fp: binary stream with ``write`` method
+    :param nodes: pairs of value and number of children in depth first pre-order
+    :param codec: codec of values
+    :param chunk_size: max number of nodes in one chunk
+    """
+    fp.write(_HEADER.pack(MAGIC, VERSION))
+    values: List[Any] = []
+    counts = array(_UINT32)
+    for v, c in nodes:
+        values.append(v)
+        counts.append(c)
+        if len(values) == chunk_size:
+            write_chunk(fp, values, counts, codec)
+            values.clear()
+            del counts[:]
+    if values:
+        write_chunk(fp, values, counts, codec)
+    fp.write(_COUNT.pack(0))
+
+
+def write_chunk(fp: BinaryIO, values: List[Any], counts: 'array[int]', codec: ValueCodec) -> None:
+    encoded = list(map(codec.encode, values))
+    lengths = array(_UINT32, map(len, encoded))
+    fp.write(_COUNT.pack(len(values)))
+    fp.write(little_endian(counts).tobytes())
+    fp.write(little_endian(lengths).tobytes())
+    fp.write(b''.join(encoded))
+
+
+def read_preorder(fp: BinaryIO, codec: ValueCodec) -> Iterator[Tuple[Any, int]]:
+    """
+    Read nodes from binary stream
+
+    :param fp: binary stream with ``read`` method
+    :param codec: codec of values
+    :return: pairs of value and number of children in depth first pre-order
+    """
+    magic, version = _HEADER.unpack(read_exact(fp, _HEADER.size))
+    if magic != MAGIC:
+        raise ValueError('stream is not a serialized tree')
+    if version != VERSION:
+        raise ValueError(f'unsupported version {version} of serialized tree')
+    while True:
+        n, = _COUNT.unpack(read_exact(fp, _COUNT.size))
+        if not n:
+            return
+        counts = read_uint32(fp, n)
+        lengths = read_uint32(fp, n)
+        data = memoryview(read_exact(fp, sum(lengths)))
+        o = 0
+        for c, length in zip(counts, lengths):
+            yield codec.decode(data[o:o + length]), c
+            o += length
+
+
+def read_uint32(fp: BinaryIO, n: int) -> 'array[int]':
+    a = array(_UINT32)
+    a.frombytes(read_exact(fp, n * a.itemsize))
+    return little_endian(a)
+
+
+def read_exact(fp: BinaryIO, n: int) -> bytes:
+    data = fp.read(n)
+    if len(data) == n:
+        return data
+    parts = [data]
+    while n > len(data) and data:
+        n -= len(data)
+        data = fp.read(n)
+        parts.append(data)
+    if n > len(data):
+        raise ValueError('unexpected end of serialized tree')
+    return b''.join(parts)
+
+
+def little_endian(a: 'array[int]') -> 'array[int]':
+    """
+    Swap bytes of array in place on big-endian platforms (swapping is symmetric)
+    """
+    if sys.byteorder == 'big':
+        a.byteswap()
+    return a
@@ -1,10 +1,36 @@
-from typing import Sequence, Iterable, Tuple, TypeVar, NamedTuple, Any, Callable
+import gc
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Sequence, Iterable, Tuple, TypeVar
 
 T = TypeVar('T')
+Descend = Callable[[Any], bool]
 
 
-class ImmediateReturn(NamedTuple):
-    retval: Any
+class TreeStateError(AssertionError):
+    """
+    Operation is not allowed in the current state of a tree.
+
+    Derived from :class:`AssertionError` that was raised for such cases by plain ``assert`` statements,
+    unlike them it is raised under ``python -O`` as well.
+    """
+
+
+class TreeIsFrozenError(TreeStateError):
+    """
+    Attempt to modify a frozen tree
+    """
+
+
+class TreeIsNotFrozenError(TreeStateError):
+    """
+    Operation is allowed only for a frozen tree
+    """
+
+
+class TreeIsNotLinkedError(TreeStateError):
+    """
+    Operation is allowed only for a tree linked with parent nodes
+    """
 
 
 def reversed_enumerate(seq: Sequence[T]) -> Iterable[Tuple[int, T]]:
@@ -14,10 +40,60 @@ def reversed_enumerate(seq: Sequence[T]) -> Iterable[Tuple[int, T]]:
         yield i, x
 
 
-def immediate_return_routine(routine: Callable[..., Any], args: Tuple[Any, ...]) -> Any:
+def rechunked(chunks: Iterable[List[T]], size: int) -> Iterable[List[T]]:
+    """
+    :param chunks: lists of items of any lengths
+    :param size: length of resulting lists
+    :return: the same items in lists of `size` items, the last one may be shorter
+    """
+    buffer: List[T] = []
+    for chunk in chunks:
+        i = 0
+        if buffer:
+            i = size - len(buffer)
+            buffer.extend(chunk[:i])
+            if len(buffer) < size:
+                continue
+            yield buffer
+        n = len(chunk)
+        while n - i >= size:
+            yield chunk[i:i + size]
+            i += size
+        buffer = chunk[i:]
+    if buffer:
+        yield buffer
+
+
+def index_typecode(n: int) -> str:
+    """
+    :param n: number of elements to be addressed
+    :return: the narrowest :mod:`array` typecode able to hold indexes in ``[-1, n]``
+    """
+    return 'i' if n < 2 ** 31 - 1 else 'q'
+
+
+def node_hash(value: Any, child_hashes: Tuple[int, ...]) -> int:
+    """
+    Merkle-style hash of a tree node
+
+    :param value: value of node
+    :param child_hashes: hashes of children nodes in order
+    :return: hash depending on value and whole structure of subtree
+    """
+    return hash((value, child_hashes))
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """
+    Pause cyclic garbage collector while building many nodes at once. Collector runs are triggered
+    by counts of allocated objects and rescan all young nodes over and over again, freshly built tree
+    has no garbage cycles, so the pause only saves time. Reference counting works as usual.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
     try:
-        return routine(*args)
-    except AssertionError as err:
-        if err.args and isinstance(err.args[0], ImmediateReturn):
-            return err.args[0].retval
-        raise
+        yield
+    finally:
+        if enabled:
+            gc.enable()
@@ -1,19 +1,58 @@
+import threading
+from array import array
 from collections import deque
 from copy import copy, deepcopy
 from itertools import repeat
-from typing import Any, Iterable, List, overload, Tuple, Optional, Union
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, Iterable, List, overload, Sequence, Tuple, \
+    Type, Optional, Union, TextIO, TYPE_CHECKING
 
+from .aio import BATCH_SIZE, batched, tree_abfs, tree_afreeze, tree_aheight, tree_asize, tree_ato_tuple
 from .bfs import non_recursive_tree_bfs_forward_original, non_recursive_tree_bfs_forward_mirror, \
+    non_recursive_tree_bfs_levels_original, non_recursive_tree_bfs_levels_mirror, \
+    non_recursive_tree_bfs_batches_original, non_recursive_tree_bfs_batches_mirror, \
     non_recursive_tree_bfs_reverse_original, non_recursive_tree_bfs_reverse_mirror, \
     non_recursive_tree_bfs_forward_original_ex, non_recursive_tree_bfs_reverse_mirror_ex, \
     non_recursive_tree_bfs_reverse_original_ex, non_recursive_tree_bfs_forward_mirror_ex
 from .dfs import non_recursive_tree_dfs_forward_original, non_recursive_tree_dfs_forward_mirror, \
+    non_recursive_tree_dfs_batches_original, non_recursive_tree_dfs_batches_mirror, \
     non_recursive_tree_dfs_reverse_original, non_recursive_tree_dfs_reverse_mirror, \
     non_recursive_tree_dfs_reverse_mirror_ex, non_recursive_tree_dfs_reverse_original_ex, \
     non_recursive_tree_dfs_forward_mirror_ex, non_recursive_tree_dfs_forward_original_ex
-from .tools import ImmediateReturn, immediate_return_routine
+from .diff import Operation, tree_apply, tree_diff
+from .intern import TreeInterner, default_interner
+from .lca import LcaIndex
+from .parallel import parallel_fold, parallel_map
+from .path import IndexPath, Path, as_indices
+from .serialization import CHUNK_SIZE, PickleCodec, ValueCodec, read_preorder, write_preorder
+from .tools import Descend, TreeIsFrozenError, TreeIsNotFrozenError, TreeIsNotLinkedError, gc_paused, \
+    index_typecode, node_hash
 from .tree_node import TreeNode
 
+if TYPE_CHECKING:
+    from .arrays import TreeArrays
+    from .frozen_tree import FrozenTree
+
+FROZEN = 1
+"""Flag of frozen node, see :meth:`Tree.freeze`"""
+LINKED = 2
+"""Flag of node linked with its parent, see :meth:`Tree.link`"""
+AUGMENTED = 4
+"""Flag of node keeping its size and height, see :meth:`Tree.augment`"""
+COW = 8
+"""Flag of copy-on-write node that may share frozen children, see :meth:`Tree.unfreeze`"""
+
+
+def flag_property(flag: int) -> property:
+    """
+    :return: boolean property reading and writing one bit of :attr:`Tree._flags`
+    """
+    def get(self: 'Tree') -> bool:
+        return bool(self._flags & flag)
+
+    def set(self: 'Tree', on: bool) -> None:
+        self._flags = self._flags | flag if on else self._flags & ~flag
+    return property(get, set)
+
 
 class Tree(TreeNode):
     """
@@ -26,16 +65,25 @@ class Tree(TreeNode):
             ...
     """
 
+    # Slots of opt-in features cost 8 bytes per node each and stay on the node:
+    # ``_parent`` is read on every mutation of augmented trees and per step of linked ones,
+    # ``__weakref__`` lets canonical nodes of interners be evicted as soon as they are unused,
+    # ``_cache`` must be owned by the node, its values (e.g. :class:`justree.lca.LcaIndex`) refer to
+    # the node, so a table aside would keep them alive forever
+    __slots__ = ('value', '_flags', '_hash', '_size', '_height', '_cache', '_parent', '__weakref__')
+
     value: Any
     """
     Value of a tree node
     """
 
     _children: List['Tree']
-    _is_frozen: bool
-    _hash = None
-    _size = None
-    _height = None
+    _flags: int
+    _hash: Optional[int]
+    _size: Optional[int]
+    _height: Optional[int]
+    _cache: Optional[Dict[str, Any]]
+    _parent: Optional['Tree']
 
     def __init__(self, value: Any, children: Iterable['Tree'] = ()) -> None:
         """
@@ -49,10 +97,25 @@ class Tree(TreeNode):
             >>> print(t)
             (Hello World!)
         """
-        super().__init__()
+        # TreeNode.__init__ is not called, saving a third of the time per node: it only sets
+        # ``_children``, the single slot of TreeNode, which is set here (checked by test_tree_slots),
+        # anything added to TreeNode.__init__ must be added here as well
         self.value = value
         self._children = list(children)
-        self._is_frozen = False
+        # modes of node packed into one int,
+        # see :data:`FROZEN`, :data:`LINKED`, :data:`AUGMENTED`, :data:`COW`
+        self._flags = 0
+        # cache fields are slots, so their ``None`` defaults live here instead of the class body
+        self._hash = None
+        self._size = None
+        self._height = None
+        self._cache = None
+        self._parent = None
+
+    _is_frozen = flag_property(FROZEN)
+    _is_linked = flag_property(LINKED)
+    _is_augmented = flag_property(AUGMENTED)
+    _is_cow = flag_property(COW)
 
     def __eq__(self, o: object) -> bool:
         """
@@ -61,7 +124,10 @@ class Tree(TreeNode):
         :param o: another Tree object to check equation with
         :return: boolean result of equation
         """
-        return immediate_return_routine(non_recursive_tree_eq, (self, o))
+        if not isinstance(o, Tree):
+            # let :class:`justree.frozen_tree.FrozenTree` compare itself with Tree
+            return NotImplemented
+        return non_recursive_tree_eq(self, o)
 
     def __ne__(self, o: object) -> bool:
         """
@@ -76,9 +142,15 @@ class Tree(TreeNode):
         """
         Overloaded hash method, working only on frozen tree (see :meth:`freeze`)
 
+        Hash of a node combines its value with hashes of its children, hashes of all frozen
+        subtrees are cached, so hashing a tree built over already hashed subtrees
+        costs only the new nodes.
+
         :return: hash value
         """
-        assert self._is_frozen
+        if not self._is_frozen:
+            raise TreeIsNotFrozenError(
+                f'unhashable type: {type(self).__name__} is not frozen, use freeze() first')
         if self._hash is None:
             self._hash = non_recursive_tree_hash(self)
         return self._hash
@@ -99,17 +171,31 @@ class Tree(TreeNode):
         """
         return non_recursive_tree_repr(self)
 
+    def write_to(self, fp: TextIO, representation: bool = False) -> None:
+        """
+        Write string representation of tree into text stream piece by piece,
+        so the whole string never sits in memory
+
+        :param fp: text stream with ``write`` method (opened file, :class:`io.StringIO`, etc.)
+        :param representation: write :func:`repr` of tree instead of :class:`str`
+        """
+        if representation:
+            fp.writelines(non_recursive_tree_repr_chunks(self))
+        else:
+            fp.writelines(non_recursive_tree_str_chunks(self))
+
     def append(self, tree: 'Tree') -> None:
         """Add another tree to the current tree's children list
 
         :param tree: Tree object to append in current tree's children list
         """
-        assert not self._is_frozen
+        ensure_not_frozen(self)
         self._children.append(tree)
+        if self._is_linked:
+            linked_attach(self, tree)
 
     def emplace(self, o: Any) -> None:
-        assert not self._is_frozen
-        self._children.append(Tree(o))
+        self.append(Tree(o))
 
     @overload
     def insert(self, index: int, tree: 'Tree') -> None:
@@ -131,14 +217,15 @@ class Tree(TreeNode):
         """
         ...
 
-    def insert(self, index: Union[int, Tuple[int, ...]], tree: 'Tree') -> None:
+    def insert(self, index: Union[int, Tuple[int, ...], IndexPath], tree: 'Tree') -> None:
         """
         Insert another tree as child into root node or sub-node children list
 
         :param index: int index of root node child position or tuple of int indexes of sub-node child position
         :param tree: :class:`Tree` object
         """
-        assert not self._is_frozen
+        ensure_not_frozen(self)
+        index = as_indices(index)
         if isinstance(index, int):
             self.insert((index,), tree)
         elif isinstance(index, tuple):
@@ -167,6 +254,7 @@ class Tree(TreeNode):
         ...
 
     def __getitem__(self, v: object) -> 'Tree':
+        v = as_indices(v)
         if isinstance(v, int):
             return self[v,]
         elif isinstance(v, tuple):
@@ -193,7 +281,8 @@ class Tree(TreeNode):
         ...
 
     def __setitem__(self, v: object, o: 'Tree') -> None:
-        assert not self._is_frozen
+        ensure_not_frozen(self)
+        v = as_indices(v)
         if isinstance(v, int):
             self[v,] = o
         elif isinstance(v, tuple):
@@ -220,7 +309,8 @@ class Tree(TreeNode):
         ...
 
     def __delitem__(self, v: object) -> None:
-        assert not self._is_frozen
+        ensure_not_frozen(self)
+        v = as_indices(v)
         if isinstance(v, int):
             del self[v,]
         elif isinstance(v, tuple):
@@ -238,7 +328,9 @@ class Tree(TreeNode):
         """
         :return: number of tree nodes
         """
-        if self._is_frozen:
+        if self._is_augmented:
+            return self._size
+        elif self._is_frozen:
             if self._size is None:
                 self._size = non_recursive_tree_size(self)
             return self._size
@@ -249,33 +341,277 @@ class Tree(TreeNode):
         """
         :return: height of tree
         """
-        if self._is_frozen:
+        if self._is_augmented:
+            return self._height
+        elif self._is_frozen:
             if self._height is None:
                 self._height = non_recursive_tree_height(self)
             return self._height
         else:
             return non_recursive_tree_height(self)
 
-    def freeze(self) -> None:
+    def fold(self, leaf_fn: Callable[[Any], Any], combine_fn: Callable[[Any, Tuple[Any, ...]], Any],
+             memoize: bool = False, memo_key: Any = None) -> Any:
+        """
+        Aggregate tree bottom-up without recursion, e.g. size of tree is
+        ``tree.fold(lambda v: 1, lambda v, sizes: 1 + sum(sizes))``
+
+        :param leaf_fn: function of leaf value, result of leaf node
+        :param combine_fn: function of node value and tuple of results of its children, result of inner node
+        :param memoize: keep results of frozen subtrees (until :meth:`unfreeze`) and reuse them
+            by next folds with the same function objects; every frozen node keeps one result
+            per pair of functions, so folds with fresh lambdas add a result to every node each call
+        :param memo_key: hashable name of aggregation to memoize results under instead of
+            the function objects, implies `memoize`
+        :return: result of root node
+        """
+        if memo_key is None and memoize:
+            memo_key = (leaf_fn, combine_fn)
+        return non_recursive_tree_fold(self, leaf_fn, combine_fn, memo_key)
+
+    def map_values(self, fn: Callable[[Any], Any]) -> 'Tree':
+        """
+        Make writable tree of the same shape with transformed values
+
+        :param fn: function of node value, parents are transformed before their children
+        :return: new tree
+        """
+        return non_recursive_tree_map_values(self, fn)
+
+    def parallel_map(self, fn: Callable[[Any], Any], workers: Optional[int] = None) -> 'Tree':
+        """
+        Make writable tree of the same shape with values transformed in worker processes
+        (see :mod:`justree.parallel`), worth it when ``fn`` is heavy compared to pickling of values
+
+        :param fn: picklable function of node value, called in no particular order
+        :param workers: number of processes, :func:`os.cpu_count` by default, 1 to run in this process
+        :return: new tree
+        """
+        values, counts = self.to_preorder()
+        values = parallel_map(fn, values, workers)
+        with gc_paused():
+            return non_recursive_tree_from_preorder(type(self), values, counts)
+
+    def parallel_fold(self, leaf_fn: Callable[[Any], Any], combine_fn: Callable[[Any, Tuple[Any, ...]], Any],
+                      workers: Optional[int] = None) -> Any:
+        """
+        Aggregate tree bottom-up as :meth:`fold` does, with subtrees folded in worker processes
+        (see :mod:`justree.parallel`)
+
+        :param leaf_fn: picklable function of leaf value, result of leaf node
+        :param combine_fn: picklable function of node value and tuple of results of its children,
+            result of inner node
+        :param workers: number of processes, :func:`os.cpu_count` by default, 1 to run in this process
+        :return: result of root node
+        """
+        values, counts = self.to_preorder()
+        return parallel_fold(leaf_fn, combine_fn, values, counts, workers)
+
+    def diff(self, other: 'Tree') -> List[Operation]:
+        """
+        Edit script turning the tree into another one (see :mod:`justree.diff`), identical subtrees
+        are skipped by their hashes, so frozen trees sharing subtrees are compared in time
+        proportional to the change, values of nodes must be hashable
+
+        :param other: target tree
+        :return: insert, delete, replace and move operations for :meth:`apply`
+        """
+        return tree_diff(self, other)
+
+    def apply(self, patch: Iterable[Operation]) -> None:
+        """
+        Apply edit script made by :meth:`diff` in place, shared frozen nodes of copy-on-write tree
+        are copied along changed paths
+
+        :param patch: operations in order
+        """
+        ensure_not_frozen(self)
+        tree_apply(self, patch)
+
+    def lca_index(self) -> LcaIndex:
+        """
+        Index answering lowest common ancestor, level ancestor and distance queries on frozen tree
+        (see :class:`justree.lca.LcaIndex`), built once and cached until :meth:`unfreeze`
+
+        :return: index of tree
+        """
+        cache = frozen_cache(self)
+        index = cache.get('lca')
+        if index is None:
+            # concurrent builders get the same index
+            index = cache.setdefault('lca', LcaIndex(self))
+        return index
+
+    def find(self, value: Any, key: Optional[Callable[[Any], Any]] = None) -> Optional[Tuple[int, ...]]:
+        """
+        Search node by value, pass a predicate as `key` and ``True`` as `value` to search by predicate.
+        Frozen tree builds and caches index of values, so the next searches cost O(1); index of `key` is used
+        if it was built by :meth:`index_by`. Otherwise (as well as for writable tree or unhashable values)
+        tree is traversed up to the first match.
+
+        :param value: value (or key of value) to search
+        :param key: function of node value, value itself by default
+        :return: path of the first found node in depth first pre-order, ``None`` if nothing found
+        """
+        paths = indexed_paths(self, value, key)
+        if paths is None:
+            return next(non_recursive_tree_find_all(self, value, key), None)
+        return paths[0].to_tuple() if paths else None
+
+    def find_all(self, value: Any, key: Optional[Callable[[Any], Any]] = None) -> Tuple[Tuple[int, ...], ...]:
+        """
+        Search all nodes by value (see :meth:`find`)
+
+        :param value: value (or key of value) to search
+        :param key: function of node value, value itself by default
+        :return: paths of found nodes in depth first pre-order
+        """
+        paths = indexed_paths(self, value, key)
+        if paths is None:
+            return tuple(non_recursive_tree_find_all(self, value, key))
+        return tuple(p.to_tuple() for p in paths)
+
+    def index_by(self, key: Optional[Callable[[Any], Any]] = None) -> Dict[Any, Tuple[IndexPath, ...]]:
+        """
+        Build hash index of nodes, keys must be hashable. Index of frozen tree is cached
+        (per `key` object) until :meth:`unfreeze`, index of writable tree is built on every call.
+
+        :param key: function of node value, value itself by default
+        :return: mapping of keys to paths of nodes in depth first pre-order, must not be changed
+        """
+        r = cached_index(self, key) if self._is_frozen else None
+        # rebuild to raise the error of unhashable keys
+        return non_recursive_tree_index(self, key) if r is None else r
+
+    def link(self) -> None:
+        """
+        Switch tree into linked mode in place: every node keeps a link to its parent node,
+        so :attr:`parent` costs O(1), :meth:`ancestors` and :meth:`root` cost O(depth) and :meth:`path`
+        costs O(number of ancestors and their preceding siblings), as positions are not stored.
+        All mutators keep links current, trees attached to linked tree are linked as well.
+        A linked node is expected to have one parent, attaching it elsewhere moves the link.
+        """
+        non_recursive_tree_link(self)
+
+    @property
+    def parent(self) -> Optional['Tree']:
+        """
+        Parent node (``None`` for root), available in linked mode only (see :meth:`link`)
+        """
+        ensure_linked(self)
+        return self._parent
+
+    def ancestors(self) -> Iterable['Tree']:
+        """
+        :return: ancestor nodes from the parent node up to the root node (see :meth:`link`)
+        """
+        ensure_linked(self)
+        return linked_tree_ancestors(self)
+
+    def root(self) -> 'Tree':
+        """
+        :return: root node of the whole tree (see :meth:`link`)
+        """
+        ensure_linked(self)
+        t = self
+        while t._parent is not None:
+            t = t._parent
+        return t
+
+    def path(self) -> Tuple[int, ...]:
+        """
+        Every index is found by scan of parent's children, so wide nodes along the path make it slower
+
+        :return: tuple of indexes addressing the node from :meth:`root`
+            (see :meth:`link` and :meth:`__getitem__`)
+        """
+        ensure_linked(self)
+        return linked_tree_path(self)
+
+    def augment(self) -> None:
+        """
+        Switch tree into augmented mode in place: every node keeps size and height of its subtree
+        along with a link to its parent node (see :meth:`link`),
+        all mutators (:meth:`append`, :meth:`emplace`, :meth:`insert`, item assignment and deletion)
+        update them along the path to the root,
+        so :meth:`size` and :meth:`height` of any node cost O(1).
+        Trees attached to augmented tree are augmented as well.
+        """
+        non_recursive_tree_augment(self)
+
+    def freeze(self, compact: bool = False) -> Optional['FrozenTree']:
         """
         Make tree readonly in place (to make it writable again use :meth:`unfreeze`)
+
+        :param compact: leave tree untouched and pack its readonly copy into flat arrays instead
+        :return: :class:`justree.frozen_tree.FrozenTree` if `compact` requested
         """
+        if compact:
+            from .frozen_tree import FrozenTree
+            return FrozenTree(self)
         non_recursive_tree_freeze(self)
+        return None
 
-    def unfreeze(self, unsafe: bool = False, deep: bool = False) -> 'Tree':
+    def finalize(self) -> None:
+        """
+        Freeze tree (see :meth:`freeze`) and compute hash, size and height of every node in one pass.
+        Otherwise frozen tree caches them on first access, so call it before sharing tree between
+        threads: reads of finalized tree do not write to nodes, lazily built indexes
+        (:meth:`lca_index`, :meth:`index_by`) are published atomically. Hashes are skipped if values
+        are unhashable.
+        """
+        non_recursive_tree_freeze(self)
+        non_recursive_tree_finalize(self)
+
+    def unfreeze(self, unsafe: bool = False, deep: bool = False, cow: bool = False) -> 'Tree':
         """
         Make writable copy of tree (opposite for :meth:`freeze`)
 
         :param unsafe: convert Tree to writable in place
         :param deep: cloning not only Tree's nodes but also nodes value
+        :param cow: copy-on-write clone of frozen tree in O(1) (the root's children list aside): clone shares
+            frozen subtrees with the tree, path based mutators of the clone (:meth:`insert`, item assignment
+            and deletion) and :meth:`thaw` copy only nodes along the path, incompatible with other params
         :return: writable tree
         """
+        if cow:
+            assert not (unsafe or deep), 'Param `cow` incompatible with params `unsafe` and `deep`'
+            if not self._is_frozen:
+                raise TreeIsNotFrozenError(
+                    f'{type(self).__name__} is not frozen, copy-on-write needs frozen tree')
+            return cow_thaw(self)
         if unsafe:
             non_recursive_tree_unfreeze(self)
             return self
         else:
             return self.clone(deep)
 
+    def thaw(self, index: Union[int, Tuple[int, ...], IndexPath]) -> 'Tree':
+        """
+        Get writable node of copy-on-write tree (see :meth:`unfreeze`),
+        copying shared frozen nodes along the path
+
+        :param index: int index of root node child or tuple of int indexes of sub-node
+        :return: writable node
+        """
+        ensure_not_frozen(self)
+        index = as_indices(index)
+        if isinstance(index, int):
+            index = (index,)
+        elif not isinstance(index, tuple):
+            raise TypeError(indices_type_error(self, index))
+        return cow_dereference(self, index)
+
+    def intern(self, interner: Optional[TreeInterner] = None) -> 'Tree':
+        """
+        Get canonical frozen copy of tree where equal subtrees are stored once (hash-consing),
+        equal interned trees are the same object, values of nodes must be hashable
+
+        :param interner: table of canonical subtrees, :data:`justree.intern.default_interner` by default
+        :return: canonical frozen tree equal to the tree
+        """
+        return (default_interner if interner is None else interner).intern(self)
+
     def clone(self, deep=False) -> 'Tree':
         """
         Clone the tree
@@ -290,63 +626,105 @@ class Tree(TreeNode):
 
     def __copy__(self) -> 'Tree':
         """
-        Shallow copy method implementation
+        Shallow copy method implementation, a subtree shared by several parents is copied once
+        and stays shared in the copy
 
         :return: copy of tree with preserved values references
         """
-        return non_recursive_tree_copy(self)
+        with gc_paused():
+            return non_recursive_tree_copy(self)
 
     def __deepcopy__(self, memo=None) -> 'Tree':
         """
-        Deep copy method implementation
+        Deep copy method implementation, a subtree shared by several parents is copied once
+        and stays shared in the copy
 
         :return: copy of tree with deep copied values
         """
         if memo is None:
             memo = {}
-        return non_recursive_tree_deepcopy(self, memo)
+        with gc_paused():
+            return non_recursive_tree_deepcopy(self, memo)
 
-    def bfs(self, reverse: bool = False, mirror: bool = False) -> Iterable['Tree']:
+    def bfs(self, reverse: bool = False, mirror: bool = False,
+            descend: Optional[Descend] = None) -> Iterable['Tree']:
         """
         Breadth First Search
 
         :param reverse: reverse resulting order of nodes (require O(n) memory)
         :param mirror: used reversed children order on whole tree
+        :param descend: predicate of node telling whether to visit its children,
+            subtrees of rejected nodes are skipped without being enqueued
         :return: nodes in requested order
         """
         if reverse:
             if mirror:
-                return non_recursive_tree_bfs_reverse_mirror(self)
+                return non_recursive_tree_bfs_reverse_mirror(self, descend)
             else:
-                return non_recursive_tree_bfs_reverse_original(self)
+                return non_recursive_tree_bfs_reverse_original(self, descend)
         else:
             if mirror:
-                return non_recursive_tree_bfs_forward_mirror(self)
+                return non_recursive_tree_bfs_forward_mirror(self, descend)
             else:
-                return non_recursive_tree_bfs_forward_original(self)
+                return non_recursive_tree_bfs_forward_original(self, descend)
 
-    def bfs_ex(self, depth: Optional[int] = None, reverse: bool = False, mirror: bool = False) \
-            -> Iterable[Tuple['Tree', int, Tuple[int, ...]]]:
+    def bfs_ex(self, depth: Optional[int] = None, reverse: bool = False, mirror: bool = False,
+               paths: str = 'tuple', descend: Optional[Descend] = None) -> Iterable[Tuple['Tree', int, Path]]:
         """
         Breadth First Search appended with nodes positions
 
         :param depth: limit search with max allowed depth
         :param reverse: reverse resulting order of nodes (require O(n) memory)
         :param mirror: used reversed children order on whole tree
+        :param paths: kind of nodes positions: ``'tuple'`` of indexes,
+            ``'lazy'`` :class:`justree.path.IndexPath` sharing prefixes with parent position (O(1) per node)
+            or ``'none'`` to skip positions
+        :param descend: predicate of node telling whether to visit its children,
+            subtrees of rejected nodes are skipped without being enqueued
         :return: nodes in requested order
         """
         if reverse:
             if mirror:
-                return non_recursive_tree_bfs_reverse_mirror_ex(self, depth)
+                return non_recursive_tree_bfs_reverse_mirror_ex(self, depth, paths, descend)
             else:
-                return non_recursive_tree_bfs_reverse_original_ex(self, depth)
+                return non_recursive_tree_bfs_reverse_original_ex(self, depth, paths, descend)
         else:
             if mirror:
-                return non_recursive_tree_bfs_forward_mirror_ex(self, depth)
+                return non_recursive_tree_bfs_forward_mirror_ex(self, depth, paths, descend)
             else:
-                return non_recursive_tree_bfs_forward_original_ex(self, depth)
+                return non_recursive_tree_bfs_forward_original_ex(self, depth, paths, descend)
+
+    def levels(self, mirror: bool = False, descend: Optional[Descend] = None) -> Iterable[List['Tree']]:
+        """
+        Breadth First Search level by level
 
-    def dfs(self, reverse: bool = False, mirror: bool = False, post_order: bool = False) -> Iterable['Tree']:
+        :param mirror: used reversed children order on whole tree
+        :param descend: predicate of node telling whether to visit its children
+        :return: lists of nodes of the same depth, from the root down
+        """
+        if mirror:
+            return non_recursive_tree_bfs_levels_mirror(self, descend)
+        else:
+            return non_recursive_tree_bfs_levels_original(self, descend)
+
+    def bfs_batches(self, size: int = 1024, mirror: bool = False, descend: Optional[Descend] = None) \
+            -> Iterable[List['Tree']]:
+        """
+        Breadth First Search yielding nodes in lists, e.g. to pass values to vectorized or bulk consumers
+
+        :param size: number of nodes in list, the last list may be shorter
+        :param mirror: used reversed children order on whole tree
+        :param descend: predicate of node telling whether to visit its children
+        :return: lists of nodes in order of :meth:`bfs`
+        """
+        ensure_batch_size(size)
+        if mirror:
+            return non_recursive_tree_bfs_batches_mirror(self, size, descend)
+        else:
+            return non_recursive_tree_bfs_batches_original(self, size, descend)
+
+    def dfs(self, reverse: bool = False, mirror: bool = False, post_order: bool = False,
+            descend: Optional[Descend] = None) -> Iterable['Tree']:
         """
         Depth First Search
 
@@ -354,28 +732,48 @@ class Tree(TreeNode):
         :param mirror: used reversed children order on whole tree
         :param post_order: taking node on leaving (usually on entering)
             (require twice more time, incompatible with param `reverse`)
+        :param descend: predicate of node telling whether to visit its children,
+            subtrees of rejected nodes are skipped without being enqueued
         :return: nodes in requested order
         """
         assert not (reverse and post_order), 'Param `post_order` incompatible with param `reverse`'
         if reverse:
             if mirror:
-                return non_recursive_tree_dfs_reverse_mirror(self)
+                return non_recursive_tree_dfs_reverse_mirror(self, descend)
             else:
-                return non_recursive_tree_dfs_reverse_original(self)
+                return non_recursive_tree_dfs_reverse_original(self, descend)
         elif post_order:
             if mirror:
-                return non_recursive_tree_dfs_reverse_original(self)
+                return non_recursive_tree_dfs_reverse_original(self, descend)
             else:
-                return non_recursive_tree_dfs_reverse_mirror(self)
+                return non_recursive_tree_dfs_reverse_mirror(self, descend)
         else:
             if mirror:
-                return non_recursive_tree_dfs_forward_mirror(self)
+                return non_recursive_tree_dfs_forward_mirror(self, descend)
             else:
-                return non_recursive_tree_dfs_forward_original(self)
+                return non_recursive_tree_dfs_forward_original(self, descend)
+
+    def dfs_batches(self, size: int = 1024, mirror: bool = False, descend: Optional[Descend] = None) \
+            -> Iterable[List['Tree']]:
+        """
+        Depth First Search (pre-order) yielding nodes in lists,
+        e.g. to pass values to vectorized or bulk consumers
+
+        :param size: number of nodes in list, the last list may be shorter
+        :param mirror: used reversed children order on whole tree
+        :param descend: predicate of node telling whether to visit its children
+        :return: lists of nodes in order of :meth:`dfs`
+        """
+        ensure_batch_size(size)
+        if mirror:
+            return non_recursive_tree_dfs_batches_mirror(self, size, descend)
+        else:
+            return non_recursive_tree_dfs_batches_original(self, size, descend)
 
     def dfs_ex(self, depth: Optional[int] = None,
-               reverse: bool = False, mirror: bool = False, post_order: bool = False) \
-            -> Iterable[Tuple['Tree', int, Tuple[int, ...]]]:
+               reverse: bool = False, mirror: bool = False, post_order: bool = False, paths: str = 'tuple',
+               descend: Optional[Descend] = None) \
+            -> Iterable[Tuple['Tree', int, Path]]:
         """
         Depth First Search appended with nodes positions
 
@@ -384,24 +782,206 @@ class Tree(TreeNode):
         :param mirror: used reversed children order on whole tree
         :param post_order: taking node on leaving (usually on entering)
             (require twice more time, incompatible with param `reverse`)
+        :param paths: kind of nodes positions: ``'tuple'`` of indexes,
+            ``'lazy'`` :class:`justree.path.IndexPath` sharing prefixes with parent position (O(1) per node)
+            or ``'none'`` to skip positions
+        :param descend: predicate of node telling whether to visit its children,
+            subtrees of rejected nodes are skipped without being enqueued
         :return: nodes in requested order
         """
         assert not (reverse and post_order), 'Param `post_order` incompatible with param `reverse`'
         if reverse:
             if mirror:
-                return non_recursive_tree_dfs_reverse_mirror_ex(self, depth)
+                return non_recursive_tree_dfs_reverse_mirror_ex(self, depth, paths, descend)
             else:
-                return non_recursive_tree_dfs_reverse_original_ex(self, depth)
+                return non_recursive_tree_dfs_reverse_original_ex(self, depth, paths, descend)
         elif post_order:
             if mirror:
-                return non_recursive_tree_dfs_reverse_original_ex(self, depth)
+                return non_recursive_tree_dfs_reverse_original_ex(self, depth, paths, descend)
             else:
-                return non_recursive_tree_dfs_reverse_mirror_ex(self, depth)
+                return non_recursive_tree_dfs_reverse_mirror_ex(self, depth, paths, descend)
         else:
             if mirror:
-                return non_recursive_tree_dfs_forward_mirror_ex(self, depth)
+                return non_recursive_tree_dfs_forward_mirror_ex(self, depth, paths, descend)
             else:
-                return non_recursive_tree_dfs_forward_original_ex(self, depth)
+                return non_recursive_tree_dfs_forward_original_ex(self, depth, paths, descend)
+
+    def abfs(self, reverse: bool = False, mirror: bool = False, descend: Optional[Descend] = None,
+             batch: int = BATCH_SIZE) -> AsyncIterator['Tree']:
+        """
+        Breadth First Search switching to asyncio event loop after every `batch` nodes
+        (see :mod:`justree.aio`)
+
+        :param reverse: reverse resulting order of nodes (require O(n) memory)
+        :param mirror: used reversed children order on whole tree
+        :param descend: predicate of node telling whether to visit its children
+        :param batch: number of nodes between switches
+        :return: async iterator of nodes in requested order
+        """
+        return tree_abfs(self, reverse, mirror, descend, batch)
+
+    def adfs(self, reverse: bool = False, mirror: bool = False, post_order: bool = False,
+             descend: Optional[Descend] = None, batch: int = BATCH_SIZE) -> AsyncIterator['Tree']:
+        """
+        Depth First Search switching to asyncio event loop after every `batch` nodes (see :mod:`justree.aio`)
+
+        :param reverse: reverse resulting order of nodes (require twice more time)
+        :param mirror: used reversed children order on whole tree
+        :param post_order: taking node on leaving (incompatible with param `reverse`)
+        :param descend: predicate of node telling whether to visit its children
+        :param batch: number of nodes between switches
+        :return: async iterator of nodes in requested order
+        """
+        return batched(self.dfs(reverse, mirror, post_order, descend), batch)
+
+    async def asize(self, batch: int = BATCH_SIZE) -> int:
+        """
+        :meth:`size` switching to asyncio event loop after every `batch` nodes
+
+        :return: number of tree nodes
+        """
+        return await tree_asize(self, batch)
+
+    async def aheight(self, batch: int = BATCH_SIZE) -> int:
+        """
+        :meth:`height` switching to asyncio event loop after every `batch` nodes
+
+        :return: height of tree
+        """
+        return await tree_aheight(self, batch)
+
+    async def afreeze(self, batch: int = BATCH_SIZE) -> None:
+        """
+        :meth:`freeze` switching to asyncio event loop after every `batch` nodes,
+        the tree is partially frozen until it completes
+        """
+        await tree_afreeze(self, batch)
+
+    async def ato_tuple(self, batch: int = BATCH_SIZE) -> Tuple[Any, Iterable[Tuple]]:
+        """
+        :meth:`to_tuple` switching to asyncio event loop after every `batch` nodes
+
+        :return: tuple of value and list of children tuples
+        """
+        return await tree_ato_tuple(self, batch)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """
+        Pickle support, tree is pickled as flat pre-order lists of values and children counts,
+        so trees of any depth are pickled without recursion (shared subtrees are pickled as copies)
+
+        :return: reconstruction function with its arguments
+        """
+        values, counts = non_recursive_tree_to_preorder(self)
+        return unpickle_tree, (type(self), values, counts, self._is_frozen)
+
+    @classmethod
+    def from_preorder(cls, values: Iterable[Any], counts: Iterable[int]) -> 'Tree':
+        """
+        Build tree from flat structure of pre-order (see :meth:`to_preorder`).
+
+        :param values: values of nodes in depth first pre-order
+        :param counts: numbers of children of nodes in the same order
+        :return: tree
+        """
+        with gc_paused():
+            return non_recursive_tree_from_preorder(cls, values, counts)
+
+    @classmethod
+    def from_parents(cls, values: Iterable[Any], parents: Iterable[int]) -> 'Tree':
+        """
+        Build tree from parent links, e.g. rows of a table referencing parent rows
+
+        :param values: values of nodes
+        :param parents: index of parent node of every node in the same order, ``-1`` for the root,
+            children of a node are ordered by their indexes
+        :return: tree
+        """
+        with gc_paused():
+            return non_recursive_tree_from_parents(cls, values, parents)
+
+    @classmethod
+    def from_paths(cls, nodes: Iterable[Tuple[Path, Any]]) -> 'Tree':
+        """
+        Build tree from positions of nodes,
+        e.g. from ``(path, node.value)`` of :meth:`bfs_ex` or :meth:`dfs_ex`
+
+        :param nodes: pairs of path (tuple of indexes or :class:`justree.path.IndexPath`) and value,
+            parent node precedes its children, children of a node go in order of indexes
+        :return: tree
+        """
+        with gc_paused():
+            return non_recursive_tree_from_paths(cls, nodes)
+
+    @classmethod
+    def from_dict(cls, d: Dict[Any, Any]) -> 'Tree':
+        """
+        Build tree from nested dicts mapping node value to dict of its children (``{}`` or ``None`` for leaf),
+        e.g. ``{1: {2: {3: None}, 4: None}}``
+
+        :param d: dict of the single root node
+        :return: tree with children in order of dicts
+        """
+        if len(d) != 1:
+            raise ValueError(f'dict must have exactly one root key, not {len(d)}')
+        with gc_paused():
+            return non_recursive_tree_from_dict(cls, d)
+
+    def to_preorder(self) -> Tuple[List[Any], Sequence[int]]:
+        """
+        Convert tree into flat structure of pre-order.
+
+        :return: values of nodes in depth first pre-order and numbers of children of nodes in the same order
+        """
+        return non_recursive_tree_to_preorder(self)
+
+    @classmethod
+    def from_arrays(cls, values: Sequence[Any], parent: Sequence[int]) -> 'Tree':
+        """
+        Build tree from parent links (see :mod:`justree.arrays`, requires ``numpy``),
+        e.g. from ``values`` and ``parent`` of :meth:`to_arrays`
+
+        :param values: values of nodes, NumPy array or any sequence
+        :param parent: index of parent node of every node, ``-1`` for the root,
+            children of a node are ordered by their indexes
+        :return: tree
+        """
+        from .arrays import tree_from_arrays
+        with gc_paused():
+            return tree_from_arrays(cls, values, parent)
+
+    def to_arrays(self) -> 'TreeArrays':
+        """
+        Convert tree into NumPy arrays of structure and values (see :mod:`justree.arrays`, requires ``numpy``)
+
+        :return: arrays indexed by pre-order numbers of nodes
+        """
+        from .arrays import tree_to_arrays
+        return tree_to_arrays(self)
+
+    def dump(self, fp: BinaryIO, codec: Optional[ValueCodec] = None, chunk_size: int = CHUNK_SIZE) -> None:
+        """
+        Write tree into binary stream in the format described in :mod:`justree.serialization`
+
+        :param fp: binary stream (opened file, socket file, :class:`io.BytesIO`, etc.)
+        :param codec: codec of values, :class:`justree.serialization.PickleCodec` by default
+        :param chunk_size: max number of nodes written at once
+        """
+        nodes = ((t.value, len(t._children)) for t in non_recursive_tree_dfs_forward_original(self))
+        write_preorder(fp, nodes, PickleCodec() if codec is None else codec, chunk_size)
+
+    @classmethod
+    def load(cls, fp: BinaryIO, codec: Optional[ValueCodec] = None) -> 'Tree':
+        """
+        Read tree written by :meth:`dump` from binary stream, stream is read chunk by chunk
+
+        :param fp: binary stream
+        :param codec: codec of values, the same as used by :meth:`dump`
+        :return: tree
+        """
+        with gc_paused():
+            pairs = read_preorder(fp, PickleCodec() if codec is None else codec)
+            return non_recursive_tree_from_preorder_pairs(cls, pairs)
 
     @classmethod
     def from_tuple(cls, itr: Tuple[Any, Iterable[Tuple]]) -> 'Tree':
@@ -411,7 +991,8 @@ class Tree(TreeNode):
         :param itr: flat structure of tree
         :return: tree with the same order of elements
         """
-        return non_recursive_tree_from_tuple(itr)
+        with gc_paused():
+            return non_recursive_tree_from_tuple(cls, itr)
 
     def to_tuple(self) -> Tuple[Any, Iterable[Tuple]]:
         """
@@ -421,102 +1002,402 @@ class Tree(TreeNode):
         """
         return non_recursive_tree_to_tuple(self)
 
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[int, Any]]) -> 'Tree':
+        """
+        Build tree from stream of records (see :meth:`to_records`), records are consumed one by one,
+        so besides the tree being built only the current branch is kept in memory
+
+        :param records: pairs of depth (1 for the root) and value in depth first pre-order
+        :return: tree
+        """
+        with gc_paused():
+            return non_recursive_tree_from_records(cls, records)
+
+    def to_records(self) -> Iterable[Tuple[int, Any]]:
+        """
+        Convert tree into lazy stream of flat records, e.g. to pipe it to a file or another process
+        without materializing nested structure (see :meth:`to_tuple`)
+
+        :return: pairs of depth (1 for the root) and value in depth first pre-order
+        """
+        return non_recursive_tree_to_records(self)
+
 
 def indices_type_error(self: Tree, indices: object) -> str:
     return f'{type(self).__name__} indices must be int or tuple of int, not {type(indices).__name__}'
 
 
-def non_recursive_tree_eq(self: Tree, other: object) -> bool:
-    assert isinstance(other, Tree), ImmediateReturn(False)
+def ensure_batch_size(size: int) -> None:
+    if size < 1:
+        raise ValueError(f'size of batch must be positive, not {size}')
+
+
+def ensure_not_frozen(self: Tree) -> None:
+    if self._is_frozen:
+        raise TreeIsFrozenError(f'{type(self).__name__} is frozen, use unfreeze() to get writable copy')
+
+
+def non_recursive_tree_eq(self: Tree, other: Tree) -> bool:
     q = deque([(self, other)])
     while q:
         f, s = q.popleft()
-        assert compare_nodes(f, s), ImmediateReturn(False)
+        if f is s:
+            continue
+        if not compare_nodes(f, s):
+            return False
         q.extend(zip(f._children, s._children))
     return True
 
 
 def non_recursive_tree_hash(self: Tree) -> int:
-    h = 0
-    for t in self.dfs():
-        h = hash((h, hash(t.value)))
-    return h
+    # pre-order without descending into subtrees with cached hash
+    o: List[Tree] = []
+    q: List[Tree] = [self]
+    while q:
+        t = q.pop()
+        o.append(t)
+        if t._hash is None:
+            q.extend(reversed(t._children))
+    # in reversed pre-order hashes of children lay on top of stack, the first child is the topmost
+    r: List[int] = []
+    for t in reversed(o):
+        h = t._hash
+        if h is None:
+            n = len(t._children)
+            h = node_hash(t.value, tuple(r[:-n - 1:-1]))
+            del r[len(r) - n:]
+            if t._flags & FROZEN:
+                t._hash = h
+        r.append(h)
+    return r[0]
+
+
+def non_recursive_tree_fold(self: Tree, leaf_fn: Callable[[Any], Any],
+                            combine_fn: Callable[[Any, Tuple[Any, ...]], Any], key: Any) -> Any:
+    # pre-order without descending into subtrees with memoized result
+    o: List[Tree] = []
+    q: List[Tree] = [self]
+    while q:
+        t = q.pop()
+        o.append(t)
+        if key is None or not (t._flags & FROZEN and t._cache and key in t._cache.get('fold', ())):
+            q.extend(reversed(t._children))
+    # in reversed pre-order results of children lay on top of stack, the first child is the topmost
+    r: List[Any] = []
+    for t in reversed(o):
+        memo = frozen_cache(t).setdefault('fold', {}) if key is not None and t._flags & FROZEN else None
+        if memo is not None and key in memo:
+            r.append(memo[key])
+            continue
+        n = len(t._children)
+        if n:
+            v = combine_fn(t.value, tuple(r[:-n - 1:-1]))
+            del r[len(r) - n:]
+        else:
+            v = leaf_fn(t.value)
+        if memo is not None:
+            memo[key] = v
+        r.append(v)
+    return r[0]
 
 
-def non_recursive_tree_copy(self: Tree) -> Tree:
-    memo = {}
-    t = Tree(self.value)
-    memo[id(self)] = t
-    q = deque(zip(self._children, repeat(t)))
+def non_recursive_tree_map_values(self: Tree, fn: Callable[[Any], Any]) -> Tree:
+    cls = type(self)
+    r = cls(fn(self.value))
+    q = [(self, r)]
     while q:
-        ct, p = q.popleft()
-        if id(ct) in memo:
-            nt = memo[id(ct)]
-        else:
-            nt = Tree(ct.value)
-        p.append(nt)
-        q.extend(zip(ct._children, repeat(nt)))
-    return t
+        s, d = q.pop()
+        d._children = [cls(fn(c.value)) for c in s._children]
+        q.extend(zip(s._children, d._children))
+    return r
+
+
+def non_recursive_tree_copy(self: Tree) -> Tree:
+    return non_recursive_tree_copy_with(self, None, {})
+
+
+def non_recursive_tree_deepcopy(self: Tree, memo: Dict[int, Any]) -> Tree:
+    def copy_value(v: Any) -> Any:
+        # immutable atomic values are kept as is, like deepcopy does, without a call per node
+        return v if type(v) in _ATOMIC else deepcopy(v, memo)
+    return non_recursive_tree_copy_with(self, copy_value, memo)
+
+
+_ATOMIC = frozenset({type(None), int, float, bool, complex, str, bytes, range, type, type(Ellipsis)})
 
 
-def non_recursive_tree_deepcopy(self: Tree, memo=None) -> Tree:
-    if memo is None:
-        memo = {}
-    t = Tree(deepcopy(self.value, memo))
-    memo[id(self)] = t
-    q = deque(zip(self._children, repeat(t)))
+def non_recursive_tree_copy_with(self: Tree, copy_value: Optional[Callable[[Any], Any]],
+                                 memo: Dict[int, Any]) -> Tree:
+    cls = type(self)
+    r = cls(self.value if copy_value is None else copy_value(self.value))
+    memo[id(self)] = r
+    q = [(self._children, r._children)] if self._children else []
     while q:
-        ct, p = q.popleft()
-        if id(ct) in memo:
-            nt = memo[id(ct)]
-        else:
-            nt = Tree(deepcopy(ct.value, memo))
-        p.append(nt)
-        q.extend(zip(ct._children, repeat(nt)))
-    return t
+        src, dst = q.pop()
+        for c in src:
+            # the single probe per node both finds shared subtrees and protects from copying them twice
+            nt = memo.get(id(c))
+            if nt is None:
+                nt = cls(c.value if copy_value is None else copy_value(c.value))
+                memo[id(c)] = nt
+                if c._children:
+                    q.append((c._children, nt._children))
+            dst.append(nt)
+    return r
 
 
 def non_recursive_tree_str(self: Tree) -> str:
-    s = ''
-    p = -1
-    q = deque([(self, 0)])
+    return ''.join(non_recursive_tree_str_chunks(self))
+
+
+def non_recursive_tree_str_chunks(self: Tree) -> Iterable[str]:
+    yield '(' + str(self.value)
+    p = 0
+    q = deque(zip(self._children, repeat(1)))
     while q:
         t, c = q.popleft()
-        s += ')' * (p - c + 1) + ' (' + str(t.value)
+        yield ')' * (p - c + 1) + ' (' + str(t.value)
         p = c
         q.extendleft(zip(reversed(t._children), repeat(c + 1)))
-    return s[1:] + ')' * (p + 1)
+    yield ')' * (p + 1)
 
 
 def non_recursive_tree_repr(self: Tree) -> str:
-    s = ''
-    p = -1
-    q = deque([(self, 0)])
+    return ''.join(non_recursive_tree_repr_chunks(self))
+
+
+def non_recursive_tree_repr_chunks(self: Tree) -> Iterable[str]:
+    yield f'Tree(value={repr(self.value)}, children=('
+    p = 0
+    q = deque(zip(self._children, repeat(1)))
     while q:
         t, c = q.popleft()
-        s += ')),' * (p - c + 1) + f' Tree(value={repr(t.value)}, children=('
+        yield ')),' * (p - c + 1) + f' Tree(value={repr(t.value)}, children=('
         p = c
         q.extendleft(zip(reversed(t._children), repeat(c + 1)))
-    return s[1:] + (')),' * (p + 1))[:-1]
+    yield ')),' * p + '))'
 
 
 def non_recursive_tree_freeze(self: Tree) -> None:
-    for t in self.dfs():
-        t._is_frozen = True
+    q = [self]
+    while q:
+        t = q.pop()
+        # whole subtree of a frozen node is frozen already
+        if not t._flags & FROZEN:
+            t._flags |= FROZEN
+            q.extend(t._children)
 
 
 def non_recursive_tree_unfreeze(self: Tree) -> None:
-    for t in self.dfs():
-        t._is_frozen = False
+    q = [self]
+    while q:
+        t = q.pop()
+        if t._flags & COW:
+            cow_thaw_children(t)
+        t._flags &= ~FROZEN
         t._hash = None
-        t._size = None
-        t._height = None
+        t._cache = None
+        if not t._flags & AUGMENTED:
+            t._size = None
+            t._height = None
+        q.extend(t._children)
+
+
+def frozen_cache(self: Tree) -> Dict[str, Any]:
+    if not self._is_frozen:
+        raise TreeIsNotFrozenError(f'{type(self).__name__} is not frozen, use freeze() first')
+    if self._cache is None:
+        with _cache_lock:
+            if self._cache is None:
+                self._cache = {}
+    return self._cache
+
+
+_cache_lock = threading.Lock()
+
+
+def indexed_paths(self: Tree, value: Any, key: Optional[Callable[[Any], Any]]) \
+        -> Optional[Tuple[IndexPath, ...]]:
+    if not self._is_frozen:
+        return None
+    if key is None:
+        r = cached_index(self, key)
+    else:
+        # index of a custom key is used only when built by index_by(), searches with
+        # a fresh function (e.g. lambda) on every call would build and keep a new one each time
+        r = self._cache.get('index', {}).get(key) if self._cache else None
+    if r is None:
+        return None
+    try:
+        return r.get(value, ())
+    except TypeError:
+        # unhashable value may still be equal to some key, leave it to traversal
+        return None
+
+
+def cached_index(self: Tree, key: Optional[Callable[[Any], Any]]) \
+        -> Optional[Dict[Any, Tuple[IndexPath, ...]]]:
+    indexes = frozen_cache(self).setdefault('index', {})
+    if key not in indexes:
+        try:
+            index = non_recursive_tree_index(self, key)
+        except TypeError:
+            # unhashable keys, searches traverse tree
+            index = None
+        return indexes.setdefault(key, index)
+    return indexes[key]
+
+
+def non_recursive_tree_find_all(self: Tree, value: Any, key: Optional[Callable[[Any], Any]]) \
+        -> Iterable[Tuple[int, ...]]:
+    if (self.value if key is None else key(self.value)) == value:
+        yield ()
+    # stack of children lists and positions of next child, positions make up the path
+    s = [[self._children, 0]]
+    while s:
+        top = s[-1]
+        ch, i = top
+        if i == len(ch):
+            s.pop()
+            continue
+        top[1] = i + 1
+        t = ch[i]
+        if (t.value if key is None else key(t.value)) == value:
+            yield tuple(e[1] - 1 for e in s)
+        if t._children:
+            s.append([t._children, 0])
+
+
+def non_recursive_tree_index(self: Tree, key: Optional[Callable[[Any], Any]]) \
+        -> Dict[Any, Tuple[IndexPath, ...]]:
+    r: Dict[Any, List[IndexPath]] = {}
+    for t, _, p in non_recursive_tree_dfs_forward_original_ex(self, paths='lazy'):
+        k = t.value if key is None else key(t.value)
+        ps = r.get(k)
+        if ps is None:
+            r[k] = [p]
+        else:
+            ps.append(p)
+    return {k: tuple(ps) for k, ps in r.items()}
+
+
+def ensure_linked(self: Tree) -> None:
+    if not self._is_linked:
+        raise TreeIsNotLinkedError(f'{type(self).__name__} is not linked with parent nodes, use link() first')
+
+
+def non_recursive_tree_link(self: Tree) -> None:
+    q = [self]
+    while q:
+        t = q.pop()
+        if t._flags & COW:
+            # shared frozen nodes can not link to parents in both trees
+            cow_thaw_children(t)
+        t._flags |= LINKED
+        for c in t._children:
+            c._parent = t
+        q.extend(t._children)
+
+
+def linked_tree_ancestors(self: Tree) -> Iterable[Tree]:
+    t = self._parent
+    while t is not None:
+        yield t
+        t = t._parent
+
+
+def linked_tree_path(self: Tree) -> Tuple[int, ...]:
+    r = []
+    t = self
+    while t._parent is not None:
+        # identity search, equal siblings must not be confused
+        r.append(next(i for i, c in enumerate(t._parent._children) if c is t))
+        t = t._parent
+    r.reverse()
+    return tuple(r)
+
+
+def non_recursive_tree_augment(self: Tree) -> None:
+    cow_thaw_shared(self)
+    for t in non_recursive_tree_dfs_reverse_mirror(self):
+        t._size = 1 + sum(c._size for c in t._children)
+        t._height = 1 + max((c._height for c in t._children), default=0)
+        t._flags |= LINKED | AUGMENTED
+        for c in t._children:
+            c._parent = t
+
+
+def linked_attach(p: Tree, o: Tree) -> None:
+    if p._is_augmented:
+        if not o._is_augmented:
+            non_recursive_tree_augment(o)
+    elif not o._is_linked:
+        non_recursive_tree_link(o)
+    o._parent = p
+    if p._is_augmented:
+        augmented_update(p, o._size, o._height, False)
+
+
+def linked_detach(p: Tree, o: Tree) -> None:
+    if o._parent is p:
+        o._parent = None
+    if p._is_augmented:
+        augmented_update(p, -o._size, o._height, True)
+
+
+def augmented_update(t: Optional[Tree], delta: int, height: Optional[int], removed: bool) -> None:
+    """
+    Update ancestors after a child of `delta` nodes and `height` was attached to (or removed from) node `t`,
+    children are rescanned only if the removed one was the highest
+    """
+    while t is not None and t._flags & AUGMENTED:
+        old = t._height
+        t._size += delta
+        if height is not None:
+            if not removed:
+                if height >= old:
+                    t._height = height + 1
+            elif height + 1 == old:
+                t._height = 1 + max((c._height for c in t._children), default=0)
+        if t._height == old:
+            if not delta:
+                break
+            height = None
+        else:
+            # parent compares the old height when it was lowered, the new one when it was raised
+            height = old if removed else t._height
+        t = t._parent
 
 
 def non_recursive_tree_size(self: Tree) -> int:
     return sum(1 for _ in self.dfs())
 
 
+def non_recursive_tree_finalize(self: Tree) -> None:
+    o: List[Tree] = []
+    q: List[Tree] = [self]
+    while q:
+        t = q.pop()
+        o.append(t)
+        q.extend(t._children)
+    # children precede their parents in reversed pre-order
+    hashes = True
+    for t in reversed(o):
+        ch = t._children
+        if ch:
+            t._size = 1 + sum([c._size for c in ch])
+            t._height = 1 + max([c._height for c in ch])
+        else:
+            t._size = t._height = 1
+        if hashes and t._hash is None:
+            try:
+                t._hash = node_hash(t.value, tuple([c._hash for c in ch]))
+            except TypeError:
+                # unhashable value, hash() of tree raises anyway
+                hashes = False
+
+
 def non_recursive_tree_height(self: Tree) -> int:
     h = 0
     q = deque([(self, 1)])
@@ -527,14 +1408,16 @@ def non_recursive_tree_height(self: Tree) -> int:
     return h
 
 
-def non_recursive_tree_from_tuple(itr: Tuple[Any, Iterable[Tuple]]) -> Tree:
-    t = Tree(itr[0])
-    q = deque(zip(itr[1], repeat(t)))
+def non_recursive_tree_from_tuple(cls: Type[Tree], itr: Tuple[Any, Iterable[Tuple]]) -> Tree:
+    t = cls(itr[0])
+    q = [(itr[1], t._children)]
     while q:
-        (d, i), p = q.popleft()
-        nt = Tree(d)
-        p.append(nt)
-        q.extend(zip(i, repeat(nt)))
+        i, ch = q.pop()
+        for d, di in i:
+            nt = cls(d)
+            ch.append(nt)
+            if di:
+                q.append((di, nt._children))
     return t
 
 
@@ -549,6 +1432,166 @@ def non_recursive_tree_to_tuple(self: Tree) -> Tuple[Any, Iterable[Tuple]]:
     return t
 
 
+def non_recursive_tree_to_records(self: Tree) -> Iterable[Tuple[int, Any]]:
+    q: List[Tuple[Tree, int]] = [(self, 1)]
+    while q:
+        t, d = q.pop()
+        q.extend(zip(reversed(t._children), repeat(d + 1)))
+        yield d, t.value
+
+
+def non_recursive_tree_from_records(cls: Type[Tree], records: Iterable[Tuple[int, Any]]) -> Tree:
+    root = None
+    # children lists of nodes of the current branch, the list of a node of depth d is at d - 1
+    s: List[List[Tree]] = []
+    for d, v in records:
+        t = cls(v)
+        if root is None:
+            if d != 1:
+                raise ValueError(f'the first record must be the root of depth 1, not of depth {d}')
+            root = t
+        elif 1 < d <= len(s) + 1:
+            del s[d - 1:]
+            s[-1].append(t)
+        else:
+            raise ValueError(f'record of depth {d} does not follow a node of depth {d - 1}')
+        s.append(t._children)
+    if root is None:
+        raise ValueError('records are empty')
+    return root
+
+
+def non_recursive_tree_to_preorder(self: Tree) -> Tuple[List[Any], Sequence[int]]:
+    values = []
+    counts = []
+    for t in non_recursive_tree_dfs_forward_original(self):
+        values.append(t.value)
+        counts.append(len(t._children))
+    return values, array(index_typecode(len(values)), counts)
+
+
+def non_recursive_tree_from_preorder(cls: Type[Tree], values: Iterable[Any], counts: Iterable[int]) -> Tree:
+    return non_recursive_tree_from_preorder_pairs(cls, zip(values, counts))
+
+
+def non_recursive_tree_from_preorder_pairs(cls: Type[Tree], nodes: Iterable[Tuple[Any, int]]) -> Tree:
+    root = None
+    # children lists waiting for more nodes along with numbers of nodes they are waiting for
+    q: List[List[Any]] = []
+    for v, c in nodes:
+        t = cls(v)
+        if q:
+            p = q[-1]
+            p[0].append(t)
+            p[1] -= 1
+            if not p[1]:
+                q.pop()
+        elif root is None:
+            root = t
+        else:
+            raise ValueError('pre-order contains more than one tree')
+        if c:
+            q.append([t._children, c])
+    if root is None or q:
+        raise ValueError('pre-order is incomplete')
+    return root
+
+
+def non_recursive_tree_from_parents(cls: Type[Tree], values: Iterable[Any], parents: Iterable[int]) -> Tree:
+    nodes = list(map(cls, values))
+    n = len(nodes)
+    root = None
+    k = -1
+    for k, p in enumerate(parents):
+        if p == -1:
+            if root is not None:
+                raise ValueError('parents contain more than one root node')
+            root = nodes[k]
+        elif 0 <= p < n:
+            nodes[p]._children.append(nodes[k])
+        else:
+            raise ValueError(f'parent index {p} of node {k} is out of range')
+    if k + 1 != n:
+        raise ValueError(f'number of parents {k + 1} differs from number of values {n}')
+    if root is None or non_recursive_tree_size(root) != n:
+        raise ValueError('parent links contain cycles, not all nodes are reachable from the root')
+    return root
+
+
+def non_recursive_tree_from_paths(cls: Type[Tree], nodes: Iterable[Tuple[Path, Any]]) -> Tree:
+    it = iter(nodes)
+    first = next(it, None)
+    if first is None or as_indices(first[0]):
+        raise ValueError('the first node must be the root with empty path')
+    root = cls(first[1])
+    index = {(): root}
+    for path, value in it:
+        path = as_indices(path)
+        p = index.get(path[:-1]) if path else None
+        if p is None or path[-1] != len(p._children):
+            raise ValueError(f'node {path!r} does not follow its parent or preceding sibling')
+        t = cls(value)
+        p._children.append(t)
+        index[path] = t
+    return root
+
+
+def non_recursive_tree_from_dict(cls: Type[Tree], d: Dict[Any, Any]) -> Tree:
+    (v, ch), = d.items()
+    root = cls(v)
+    q = [(ch, root._children)] if ch else []
+    while q:
+        dc, c = q.pop()
+        for v, ch in dc.items():
+            t = cls(v)
+            c.append(t)
+            if ch:
+                q.append((ch, t._children))
+    return root
+
+
+def unpickle_tree(cls: Type[Tree], values: Iterable[Any], counts: Iterable[int], frozen: bool) -> Tree:
+    t = non_recursive_tree_from_preorder(cls, values, counts)
+    if frozen:
+        t.freeze()
+    return t
+
+
+def cow_thaw(t: Tree) -> Tree:
+    c = type(t)(t.value, t._children)
+    c._flags = COW
+    return c
+
+
+def cow_dereference(t: Tree, ix: Tuple[int, ...]) -> Tree:
+    for i in ix:
+        c = t._children[i]
+        if t._flags & COW and c._flags & FROZEN:
+            c = t._children[i] = cow_thaw(c)
+        t = c
+    return t
+
+
+def cow_thaw_shared(self: Tree) -> None:
+    q = [self]
+    while q:
+        t = q.pop()
+        if t._flags & COW:
+            cow_thaw_children(t)
+        q.extend(t._children)
+
+
+def cow_thaw_children(t: Tree) -> None:
+    """
+    Replace frozen children of copy-on-write node, possibly shared with other trees, with their own copies
+    """
+    ch = t._children
+    for i, c in enumerate(ch):
+        if c._flags & FROZEN:
+            ch[i] = cow_thaw(c)
+    t._flags &= ~COW
+
+
 def dereference(t: Tree, ix: Tuple[int, ...]) -> Tree:
     for i in ix:
         t = t._children[i]
@@ -560,19 +1603,40 @@ def non_recursive_tree_getitem(self: Tree, ix: Tuple[int, ...]) -> Tree:
 
 
 def non_recursive_tree_setitem(self: Tree, ix: Tuple[int, ...], o: Tree) -> None:
-    t = dereference(self, ix[:-1])
+    t = cow_dereference(self, ix[:-1])
+    old = t._children[ix[-1]]
     t._children[ix[-1]] = o
+    if t._is_linked and old is not o:
+        linked_attach(t, o)
+        linked_detach(t, old)
 
 
 def non_recursive_tree_delitem(self: Tree, ix: Tuple[int, ...]) -> None:
-    t = dereference(self, ix[:-1])
+    t = cow_dereference(self, ix[:-1])
+    old = t._children[ix[-1]]
     del t._children[ix[-1]]
+    if t._is_linked:
+        linked_detach(t, old)
 
 
 def non_recursive_tree_insert(self: Tree, ix: Tuple[int, ...], o: Tree) -> None:
-    t = dereference(self, ix[:-1])
+    t = cow_dereference(self, ix[:-1])
     t._children.insert(ix[-1], o)
+    if t._is_linked:
+        linked_attach(t, o)
 
 
 def compare_nodes(f: Tree, s: Tree) -> bool:
-    return (f.value == s.value) and (len(f._children) == len(s._children))
+    if f._flags & s._flags & FROZEN and not compare_caches(f, s):
+        return False
+    return (len(f._children) == len(s._children)) and (f.value == s.value)
+
+
+def compare_caches(f: Tree, s: Tree) -> bool:
+    """
+    :return: False if aggregates already cached on both frozen nodes prove that nodes differ
+    """
+    for a, b in ((f._size, s._size), (f._height, s._height), (f._hash, s._hash)):
+        if a is not None and b is not None and a != b:
+            return False
+    return True
@@ -2,7 +2,10 @@ from typing import List
 
 
 class TreeNode:
+    __slots__ = ('_children',)
+
     _children: List['TreeNode']
 
     def __init__(self) -> None:
+        # :class:`justree.tree.Tree` sets this field itself instead of calling this constructor
         self._children = []
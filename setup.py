@@ -13,6 +13,9 @@ setup(
     long_description='''This is an idiomatic tree data structure implementation in python.''',
     license="MIT License",
     packages=['justree'],
+    extras_require={
+        'numpy': ['numpy'],
+    },
     keywords=['data structure', 'tree', 'tools'],
     classifiers=[
         'Development Status :: 3 - Alpha',
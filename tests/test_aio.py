@@ -0,0 +1,76 @@
+import asyncio
+import itertools
+
+import pytest
+
+from justree import Tree
+
+
+def sample():
+    return Tree.from_tuple((1, [(2, [(3, []), (4, [(5, [])])]), (6, []), (7, [(8, [])])]))
+
+
+def run(coroutine):
+    # asyncio.run() appeared in Python 3.7
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def collect(nodes):
+    async def gather():
+        return [t async for t in nodes]
+    return run(gather())
+
+
+@pytest.mark.parametrize('reverse,mirror,batch',
+                         list(itertools.product([False, True], [False, True], [1, 3, 100])))
+def test_aio_traversal(reverse, mirror, batch):
+    tree = sample()
+    assert collect(tree.abfs(reverse, mirror, batch=batch)) == list(tree.bfs(reverse, mirror))
+    assert collect(tree.adfs(reverse, mirror, batch=batch)) == list(tree.dfs(reverse, mirror))
+    assert collect(tree.adfs(mirror=mirror, post_order=True, batch=batch)) == \
+        list(tree.dfs(mirror=mirror, post_order=True))
+    descend = lambda t: t.value != 2
+    assert collect(tree.abfs(reverse, mirror, descend, batch)) == list(tree.bfs(reverse, mirror, descend))
+
+
+def test_aio_aggregates():
+    async def aggregates(tree):
+        return await tree.asize(2), await tree.aheight(2), await tree.ato_tuple(2)
+
+    tree = sample()
+    assert run(aggregates(tree)) == (8, 4, tree.to_tuple())
+    assert run(aggregates(Tree(1))) == (1, 1, (1, []))
+
+    run(tree.afreeze(batch=2))
+    assert all(t._is_frozen for t in tree.dfs())
+    assert run(aggregates(tree))[:2] == (8, 4) and (tree._size, tree._height) == (8, 4)
+    with pytest.raises(ValueError):
+        run(tree[0].unfreeze().asize(0))
+
+
+def test_aio_batches():
+    # Other tasks run between batches
+    async def count(tree, batch):
+        ticks = 0
+        done = False
+
+        async def ticker():
+            nonlocal ticks
+            while not done:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.ensure_future(ticker())
+        await asyncio.sleep(0)
+        size = await tree.asize(batch)
+        done = True
+        await task
+        return size, ticks
+
+    tree = Tree.from_preorder(range(1000), [1] * 999 + [0])
+    size, ticks = run(count(tree, 100))
+    assert size == 1000 and ticks >= 10
@@ -0,0 +1,67 @@
+import pytest
+
+from justree import Tree
+
+np = pytest.importorskip('numpy')
+
+TPL = (1, [(2, [(5, [(14, []), (15, [])]), (6, []), (7, [])]),
+           (3, [(8, []), (9, [(17, []), (18, [(25, []), (26, [])])])]),
+           (4, [])])
+
+
+def test_to_arrays():
+    tree = Tree.from_tuple(TPL)
+    arrays = tree.to_arrays()
+    nodes = [(t, d, p) for t, d, p in tree.dfs_ex()]
+    post = [id(t) for t in tree.dfs(post_order=True)]
+
+    assert arrays.values.dtype.kind == 'i'
+    assert arrays.values.tolist() == [t.value for t, _, _ in nodes]
+    assert arrays.depth.tolist() == [d for _, d, _ in nodes]
+    assert arrays.size.tolist() == [t.size() for t, _, _ in nodes]
+    assert arrays.postorder.tolist() == [post.index(id(t)) for t, _, _ in nodes]
+    assert arrays.child_count.tolist() == [len(t) for t, _, _ in nodes]
+    numbers = {p: k for k, (_, _, p) in enumerate(nodes)}
+    assert arrays.parent.tolist() == [numbers.get(p[:-1], -1) if p else -1 for _, _, p in nodes]
+    for k, (t, _, p) in enumerate(nodes):
+        children = arrays.children[arrays.child_offsets[k]:arrays.child_offsets[k + 1]]
+        assert children.tolist() == [numbers[p + (i,)] for i in range(len(t))]
+
+    # Subtree sums by the contiguous pre-order ranges of subtrees
+    sums = np.concatenate(([0], np.cumsum(arrays.values)))
+    assert (sums[np.arange(len(sums) - 1) + arrays.size] - sums[:-1])[0] == sum(t.value for t in tree.dfs())
+
+    assert Tree('a').to_arrays().values.dtype == object
+    assert Tree.from_tuple(('a', [(1, [])])).to_arrays().values.tolist() == ['a', 1]
+
+
+def test_from_arrays():
+    tree = Tree.from_tuple(TPL)
+    arrays = tree.to_arrays()
+    assert Tree.from_arrays(arrays.values, arrays.parent) == tree
+    assert type(Tree.from_arrays(arrays.values, arrays.parent)[0].value) is int
+
+    # Values not fitting one dtype exactly are kept as objects
+    for tpl in ((2 ** 63, [(-1, [])]), (1, [(True, []), (1.5, [])]), (2 ** 70, [(1, [])])):
+        tree = Tree.from_tuple(tpl)
+        arrays = tree.to_arrays()
+        assert arrays.values.dtype == object
+        back = Tree.from_arrays(arrays.values, arrays.parent)
+        assert back == tree
+        assert [type(t.value) for t in back.dfs()] == [type(t.value) for t in tree.dfs()]
+    assert Tree.from_tuple((2 ** 63, [(2 ** 64 - 1, [])])).to_arrays().values.dtype == np.uint64
+    assert Tree.from_tuple((0.5, [(1.0, [])])).to_arrays().values.dtype == np.float64
+
+    # Any order of nodes, children are ordered by numbers
+    assert Tree.from_arrays(['b', 'c', 'a', 'd'], [2, 2, -1, 0]) == \
+           Tree.from_tuple(('a', [('b', [('d', [])]), ('c', [])]))
+    assert Tree.from_arrays([7], [-1]) == Tree(7)
+
+    with pytest.raises(ValueError):
+        Tree.from_arrays([1, 2], [-1, -1])
+    with pytest.raises(ValueError):
+        Tree.from_arrays([1, 2], [-1, 2])
+    with pytest.raises(ValueError):
+        Tree.from_arrays([1, 2, 3], [-1, 2, 1])
+    with pytest.raises(ValueError):
+        Tree.from_arrays([1, 2], [-1])
@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from justree import Tree, TreeIsFrozenError
+from justree.diff import Delete, Insert, Move, Replace
+
+
+def random_tree(n, seed):
+    rnd = random.Random(seed)
+    nodes = [Tree(0)]
+    for i in range(1, n):
+        c = Tree(rnd.randrange(10))
+        rnd.choice(nodes).append(c)
+        nodes.append(c)
+    return nodes[0]
+
+
+def mutate(tree, k, seed):
+    rnd = random.Random(seed)
+    for _ in range(k):
+        nodes = list(tree.dfs())
+        t = rnd.choice(nodes)
+        action = rnd.randrange(4)
+        if action == 0:
+            t.value = rnd.randrange(10)
+        elif action == 1:
+            t.insert(rnd.randint(0, len(t)), random_tree(rnd.randint(1, 4), rnd.random()))
+        elif action == 2 and len(t):
+            del t[rnd.randrange(len(t))]
+        elif action == 3 and len(t) > 1:
+            c = t[rnd.randrange(len(t))]
+            del t[next(i for i, o in enumerate(t) if o is c)]
+            t.insert(rnd.randint(0, len(t)), c)
+
+
+def test_diff_operations():
+    a = Tree.from_tuple((1, [(2, []), (3, []), (4, [])]))
+    b = Tree.from_tuple((0, [(4, []), (2, []), (3, [(5, [])])]))
+    patch = a.diff(b)
+    assert patch == [Replace((), 0), Move((2,), (0,)), Insert((2, 0), b[(2, 0)])]
+    a.apply(patch)
+    assert a == b
+    assert a.diff(b) == [] and a.diff(a) == []
+
+    a = Tree.from_tuple((1, [(2, []), (3, [])]))
+    assert a.diff(Tree.from_tuple((1, [(3, [])]))) == [Delete((0,))]
+
+    # Inserted writable subtrees are copied, not shared with the target
+    b = Tree.from_tuple((1, [(2, []), (3, []), (4, [(5, [])])]))
+    a.apply(a.diff(b))
+    assert a == b and a[2] is not b[2]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_diff_random(seed):
+    a = random_tree(60, seed)
+    b = a.clone()
+    mutate(b, 8, seed)
+    patch = a.diff(b)
+    c = a.clone()
+    c.apply(patch)
+    assert c == b
+    assert all(isinstance(op, (Insert, Delete, Replace, Move)) for op in patch)
+
+    # Frozen and mixed trees give the same script
+    a.freeze()
+    assert a.diff(b) == patch
+    b.freeze()
+    c = a.unfreeze(cow=True)
+    c.apply(a.diff(b))
+    assert c == b and a._is_frozen
+
+
+def test_diff_frozen():
+    a = random_tree(2000, 1)
+    a.freeze()
+    hash(a)
+    b = a.unfreeze(cow=True)
+    path = next(p for _, _, p in a.dfs_ex() if len(p) == 4)
+    b.thaw(path).value = -1
+    b.insert(path[:2] + (0,), Tree(-2))
+    b.freeze()
+    patch = a.diff(b)
+    assert patch == [Insert(path[:2] + (0,), b[path[:2] + (0,)]),
+                     Replace(path[:2] + (path[2] + 1, path[3]), -1)]
+
+    # Frozen trees are not patched, copy-on-write clones keep the original intact
+    with pytest.raises(TreeIsFrozenError):
+        a.apply(patch)
+    c = a.unfreeze(cow=True)
+    c.apply(patch)
+    assert c == b and a != b and c[path[:1]] is not a[path[:1]]
+    with pytest.raises(TreeIsFrozenError):
+        Tree(0, [a[0]]).apply([Replace((0,), -1)])
+    with pytest.raises(TypeError):
+        c.apply([(0,)])
+
+
+def test_diff_linked():
+    a = Tree.from_tuple((1, [(2, [(3, [])]), (4, [])]))
+    a.augment()
+    b = Tree.from_tuple((1, [(4, [(5, [])]), (2, [(3, [])])]))
+    a.apply(a.diff(b))
+    assert a == b and a.size() == 5
+    assert all(c.parent is t for t in a.dfs() for c in t)
+
+
+def test_diff_hash_collisions():
+    # hash(-1) == hash(-2) in CPython, equal hashes must not be taken for equal subtrees
+    assert Tree(-1).diff(Tree(-2)) == [Replace((), -2)]
+    for tpl, other in (((0, [(-1, [])]), (0, [(-2, [])])),
+                       ((0, [(-1, []), (5, [])]), (0, [(5, []), (-2, [])])),
+                       ((0, [(1, [(-1, [])]), (2, [])]), (0, [(2, []), (1, [(-2, [])])]))):
+        for frozen in (False, True):
+            a, b = Tree.from_tuple(tpl), Tree.from_tuple(other)
+            if frozen:
+                a.freeze()
+                b.freeze()
+            c = a.unfreeze(cow=True) if frozen else a.clone()
+            c.apply(a.diff(b))
+            assert c == b
@@ -0,0 +1,125 @@
+import io
+import pickle
+
+import pytest
+
+from justree import Tree, FrozenTree
+
+TPL = (1, [(2, [(5, [(14, []), (15, []), (16, [(23, []), (24, [])])]), (6, []), (7, [])]),
+           (3, [(8, []), (9, [(17, []), (18, []), (19, [(25, []), (26, [])])]), (10, [])]),
+           (4, [(11, []), (12, []), (13, [(20, []), (21, []), (22, [(27, []), (28, [])])])])])
+
+
+def test_frozen_tree_compact_freeze():
+    tree = Tree.from_tuple(TPL)
+    frozen = tree.freeze(compact=True)
+    assert isinstance(frozen, FrozenTree)
+
+    # Check source tree stays writable and both trees are equal
+    assert tree._is_frozen == False
+    assert frozen == tree
+    assert tree == frozen
+    assert frozen == FrozenTree(Tree.from_tuple(TPL))
+    assert frozen != FrozenTree(Tree(1))
+    assert frozen.to_tuple() == TPL
+    assert frozen.unfreeze() == tree
+
+    # Check frozen trees are packed again as well
+    assert FrozenTree(frozen) == frozen and FrozenTree(frozen)._store is frozen._store
+    assert FrozenTree(frozen[1]) == tree[1] and FrozenTree(frozen[1])._index == 0
+    with pytest.raises(TypeError):
+        FrozenTree(1)
+
+
+def test_frozen_tree_navigation():
+    tree = Tree.from_tuple(TPL)
+    frozen = tree.freeze(compact=True)
+
+    assert frozen.value == 1
+    assert len(frozen) == 3
+    assert [t.value for t in frozen] == [2, 3, 4]
+    assert frozen[1].value == 3
+    assert frozen[-1].value == 4
+    assert frozen[0, 0, 2] == tree[0, 0, 2]
+    assert frozen[2, 2].to_tuple() == tree[2, 2].to_tuple()
+    assert str(frozen) == str(tree)
+    assert str(frozen[1]) == str(tree[1])
+    assert eval(repr(frozen)) == frozen
+
+    with pytest.raises(IndexError):
+        _ = frozen[3]
+    with pytest.raises(IndexError):
+        _ = frozen[0, 1, 0]
+    with pytest.raises(TypeError):
+        _ = frozen['a']
+
+
+def test_frozen_tree_aggregates():
+    tree = Tree.from_tuple(TPL)
+    frozen = tree.freeze(compact=True)
+    for path in [(), (0,), (0, 0), (2, 2, 2), (1, 2)]:
+        assert frozen[path].size() == tree[path].size()
+        assert frozen[path].height() == tree[path].height()
+
+    tree.freeze()
+    assert hash(frozen) == hash(tree)
+    assert hash(frozen[0, 0]) == hash(tree[0, 0])
+
+
+@pytest.mark.parametrize('path', [(), (0,), (2, 2)])
+@pytest.mark.parametrize('reverse', [False, True])
+@pytest.mark.parametrize('mirror', [False, True])
+def test_frozen_tree_traversal(path, reverse, mirror):
+    tree = Tree.from_tuple(TPL)[path]
+    frozen = FrozenTree(Tree.from_tuple(TPL))[path]
+
+    assert [t.value for t in frozen.bfs(reverse, mirror)] == [t.value for t in tree.bfs(reverse, mirror)]
+    assert [t.value for t in frozen.dfs(reverse, mirror)] == [t.value for t in tree.dfs(reverse, mirror)]
+    for depth in [None, 1, 3]:
+        assert [(t.value, d, i) for t, d, i in frozen.bfs_ex(depth, reverse, mirror)] == \
+               [(t.value, d, i) for t, d, i in tree.bfs_ex(depth, reverse, mirror)]
+        assert [(t.value, d, i) for t, d, i in frozen.dfs_ex(depth, reverse, mirror)] == \
+               [(t.value, d, i) for t, d, i in tree.dfs_ex(depth, reverse, mirror)]
+    if not reverse:
+        assert [t.value for t in frozen.dfs(mirror=mirror, post_order=True)] == \
+               [t.value for t in tree.dfs(mirror=mirror, post_order=True)]
+        assert [(t.value, d, i) for t, d, i in frozen.dfs_ex(3, mirror=mirror, post_order=True)] == \
+               [(t.value, d, i) for t, d, i in tree.dfs_ex(3, mirror=mirror, post_order=True)]
+    lazy = dict(reverse=reverse, mirror=mirror, paths='lazy')
+    assert [(t.value, d, i.to_tuple()) for t, d, i in frozen.dfs_ex(**lazy)] == \
+           [(t.value, d, i.to_tuple()) for t, d, i in tree.dfs_ex(**lazy)]
+    assert [(t.value, d, i) for t, d, i in frozen.dfs_ex(reverse=reverse, mirror=mirror, paths='none')] == \
+           [(t.value, d, i) for t, d, i in tree.dfs_ex(reverse=reverse, mirror=mirror, paths='none')]
+
+    # Check pruned traversals match ones of writable tree
+    def descend(t):
+        return t.value % 3 != 0
+    assert [t.value for t in frozen.bfs(reverse, mirror, descend)] == \
+           [t.value for t in tree.bfs(reverse, mirror, descend)]
+    assert [t.value for t in frozen.dfs(reverse, mirror, descend=descend)] == \
+           [t.value for t in tree.dfs(reverse, mirror, descend=descend)]
+    assert [(t.value, d, i) for t, d, i in frozen.bfs_ex(None, reverse, mirror, descend=descend)] == \
+           [(t.value, d, i) for t, d, i in tree.bfs_ex(None, reverse, mirror, descend=descend)]
+    assert [(t.value, d, i) for t, d, i in frozen.dfs_ex(None, reverse, mirror, descend=descend)] == \
+           [(t.value, d, i) for t, d, i in tree.dfs_ex(None, reverse, mirror, descend=descend)]
+
+
+def test_frozen_tree_write_to():
+    frozen = Tree.from_tuple(TPL).freeze(compact=True)
+    fp = io.StringIO()
+    frozen.write_to(fp)
+    assert fp.getvalue() == str(Tree.from_tuple(TPL))
+
+    fp = io.StringIO()
+    frozen[0].write_to(fp, representation=True)
+    assert fp.getvalue() == repr(frozen[0])
+    assert eval(fp.getvalue()) == frozen[0]
+    assert repr(FrozenTree(Tree(1))) == 'FrozenTree.from_tree(Tree(value=1, children=()))'
+
+
+def test_frozen_tree_pickle():
+    frozen = Tree.from_tuple(TPL).freeze(compact=True)
+    restored = pickle.loads(pickle.dumps(frozen))
+    assert restored == frozen
+    assert restored[2, 2] == frozen[2, 2]
+    assert hash(restored) == hash(frozen)
@@ -0,0 +1,72 @@
+import gc
+
+import pytest
+
+from justree import Tree, TreeInterner
+
+TPL = (1, [(2, [(3, []), (4, [])]), (5, [(2, [(3, []), (4, [])])]), (2, [(3, []), (4, [])])])
+
+
+def test_intern_shares_equal_subtrees():
+    interner = TreeInterner()
+    tree = Tree.from_tuple(TPL)
+    interned = interner.intern(tree)
+
+    assert interned == tree
+    assert interned._is_frozen and interned[(1, 0, 1)]._is_frozen
+    assert tree._is_frozen == False
+    assert interned[0] is interned[(1, 0)] is interned[2]
+    assert interned[(0, 0)] is interned[(2, 0)]
+    assert len(interner) == 5
+
+    # Check cached aggregates of canonical subtrees
+    assert interned._size == tree.size() and interned._height == tree.height()
+    assert hash(interned) == hash(Tree.from_tuple(TPL).freeze(compact=True))
+
+
+def test_intern_identity():
+    interner = TreeInterner()
+    a = interner.intern(Tree.from_tuple(TPL))
+    b = interner.intern(Tree.from_tuple(TPL))
+    c = interner.intern(Tree.from_tuple((1, [(2, [])])))
+    assert a is b
+    assert a != c
+    assert interner.intern(a) is a
+
+    # Check frozen trees are not adopted as canonical nodes
+    frozen = Tree.from_tuple((7, [(8, [])]))
+    frozen.freeze()
+    interned = interner.intern(frozen)
+    assert interned is not frozen and interned[0] is not frozen[0]
+    frozen.unfreeze(unsafe=True)
+    frozen[0].value = 9
+    frozen.link()
+    assert interner.intern(Tree.from_tuple((7, [(8, [])]))) is interned
+    assert interned == Tree.from_tuple((7, [(8, [])])) and not interned._is_linked
+
+    # Check default interner
+    assert Tree.from_tuple(TPL).intern() is Tree.from_tuple(TPL).intern()
+
+
+def test_intern_value_types():
+    interner = TreeInterner()
+    a = interner.intern(Tree(1, [Tree(1)]))
+    b = interner.intern(Tree(True, [Tree(1.0)]))
+    assert a == b and a is not b
+    assert type(b.value) is bool and type(b[0].value) is float
+    assert type(a.value) is int and type(a[0].value) is int
+    assert len(interner) == 4
+
+
+def test_intern_eviction():
+    interner = TreeInterner()
+    tree = interner.intern(Tree.from_tuple(TPL))
+    assert len(interner) == 5
+    del tree
+    gc.collect()
+    assert len(interner) == 0
+
+
+def test_intern_unhashable():
+    with pytest.raises(TypeError):
+        TreeInterner().intern(Tree([1]))
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from justree import IndexPath, Tree, TreeIsNotFrozenError
+from justree.lca import LcaIndex
+
+
+def random_tree(n, seed):
+    rnd = random.Random(seed)
+    nodes = [Tree(0)]
+    for i in range(1, n):
+        c = Tree(i)
+        rnd.choice(nodes).append(c)
+        nodes.append(c)
+    return nodes[0]
+
+
+def common_prefix(a, b):
+    k = 0
+    while k < min(len(a), len(b)) and a[k] == b[k]:
+        k += 1
+    return a[:k]
+
+
+def test_lca_matches_paths():
+    tree = random_tree(300, 1)
+    tree.freeze()
+    index = tree.lca_index()
+    nodes = [(t, p) for t, _, p in tree.dfs_ex()]
+    rnd = random.Random(2)
+    for _ in range(500):
+        (a, pa), (b, pb) = rnd.choice(nodes), rnd.choice(nodes)
+        p = common_prefix(pa, pb)
+        assert index.lca(pa, pb) == p
+        assert index.lca(a, b) is tree[p]
+        assert index.distance(a, pb) == len(pa) + len(pb) - 2 * len(p)
+        assert index.depth(a) == len(pa) + 1
+        k = rnd.randrange(len(pa) + 2)
+        assert index.ancestor(pa, k) == (pa[:len(pa) - k] if k <= len(pa) else None)
+        assert index.ancestor(a, k) is (tree[pa[:len(pa) - k]] if k <= len(pa) else None)
+
+
+def test_lca_edge_cases():
+    tree = Tree.from_tuple((1, [(2, [(3, []), (4, [])]), (5, [])]))
+    with pytest.raises(TreeIsNotFrozenError):
+        tree.lca_index()
+    tree.freeze()
+    index = tree.lca_index()
+    assert tree.lca_index() is index
+    assert index.lca((), (1,)) == () and index.lca(tree[(0, 1)], tree[0]) is tree[0]
+    assert index.lca(IndexPath(IndexPath(IndexPath(), 0), 1), (0, 0)) == (0,)
+    assert index.ancestor((0, 1), 0) == (0, 1) and index.distance((1,), (1,)) == 0
+    with pytest.raises(ValueError):
+        index.ancestor((0,), -1)
+    with pytest.raises(ValueError):
+        index.lca(Tree(2), (0,))
+    assert LcaIndex(Tree(1)).lca((), ()) == ()
+
+    # Index is dropped by unfreeze
+    tree.unfreeze(unsafe=True)
+    tree.emplace(6)
+    tree.freeze()
+    assert tree.lca_index() is not index and tree.lca_index().lca((0, 0), (2,)) == ()
+
+    # Nodes must have single positions
+    with pytest.raises(ValueError):
+        Tree.from_tuple((1, [(2, []), (2, [])])).intern().lca_index()
@@ -0,0 +1,55 @@
+import pytest
+
+from justree import Tree, FrozenTree
+from justree.serialization import IntCodec
+
+TPL = (1, [(2, [(5, [(14, []), (15, []), (16, [(23, []), (24, [])])]), (6, []), (7, [])]),
+           (3, [(8, []), (9, [(17, []), (18, []), (19, [(25, []), (26, [])])]), (10, [])]),
+           (4, [(11, []), (12, []), (13, [(20, []), (21, []), (22, [(27, []), (28, [])])])])])
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = str(tmp_path / 'tree.img')
+    with open(path, 'wb') as fp:
+        Tree.from_tuple(TPL).freeze(compact=True).save(fp, IntCodec())
+    return path
+
+
+def test_mapped_tree(image):
+    tree = Tree.from_tuple(TPL)
+    mapped = FrozenTree.open(image, IntCodec())
+
+    # Check arrays are views of mapped file
+    assert isinstance(mapped._store.first_child, memoryview)
+    assert isinstance(mapped._store.height(), memoryview)
+
+    assert mapped == tree and tree == mapped
+    assert mapped == tree.freeze(compact=True)
+    assert mapped.size() == tree.size() and mapped.height() == tree.height()
+    assert mapped[2, 2, 2].value == 22 and mapped[(1, 1)].size() == 6
+    assert [t.value for t in mapped.dfs()] == [t.value for t in tree.dfs()]
+    assert [t.value for t in mapped.bfs(reverse=True)] == [t.value for t in tree.bfs(reverse=True)]
+    assert [(t.value, d, i) for t, d, i in mapped.dfs_ex(post_order=True)] == \
+           [(t.value, d, i) for t, d, i in tree.dfs_ex(post_order=True)]
+    assert mapped.to_tuple() == TPL
+    assert str(mapped) == str(tree)
+    assert mapped.unfreeze() == tree
+    tree.freeze()
+    assert hash(mapped) == hash(tree)
+
+
+def test_mapped_subtree_save(image, tmp_path):
+    mapped = FrozenTree.open(image, IntCodec())
+    path = str(tmp_path / 'subtree.img')
+    with open(path, 'wb') as fp:
+        mapped[1].save(fp)
+    assert FrozenTree.open(path) == Tree.from_tuple(TPL)[1]
+
+
+def test_mapped_errors(tmp_path):
+    path = str(tmp_path / 'tree.bin')
+    with open(path, 'wb') as fp:
+        Tree.from_tuple(TPL).dump(fp)
+    with pytest.raises(ValueError):
+        FrozenTree.open(path)
@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from justree import Tree
+from justree.parallel import fold_chunk, preorder_sizes, subtree_chunks
+
+
+def random_tree(n):
+    rnd = random.Random(n)
+    nodes = [Tree(0)]
+    for i in range(1, n):
+        c = Tree(i)
+        rnd.choice(nodes).append(c)
+        nodes.append(c)
+    return nodes[0]
+
+
+def square(v):
+    return v * v
+
+
+def leaf_sum(v):
+    return v
+
+
+def node_sum(v, sums):
+    return v + sum(sums)
+
+
+def leaf_shape(v):
+    return (v,)
+
+
+def node_shape(v, shapes):
+    return (v, shapes)
+
+
+def test_parallel_chunks():
+    tree = Tree.from_tuple((1, [(2, [(3, []), (4, [])]), (5, [(6, [(7, [])])]), (8, [])]))
+    values, counts = tree.to_preorder()
+    sizes = preorder_sizes(counts)
+    assert sizes == [8, 3, 1, 1, 3, 2, 1, 1]
+    assert subtree_chunks(counts, sizes, 8) == [0]
+    assert subtree_chunks(counts, sizes, 3) == [1, 4, 7]
+    assert subtree_chunks(counts, sizes, 2) == [2, 3, 5, 7]
+    assert fold_chunk(leaf_sum, node_sum, values[1:], counts[1:]) == [9, 18, 8]
+
+
+@pytest.mark.parametrize('workers', [1, 2, 3])
+def test_parallel_map_fold(workers):
+    tree = random_tree(2000)
+    mapped = tree.parallel_map(square, workers=workers)
+    assert mapped == tree.map_values(square) and not mapped._is_frozen
+    assert tree.parallel_fold(leaf_sum, node_sum, workers=workers) == sum(range(2000))
+    assert tree.parallel_fold(leaf_shape, node_shape, workers=workers) == tree.fold(leaf_shape, node_shape)
+
+    leaf = Tree(3)
+    assert leaf.parallel_map(square, workers=workers) == Tree(9)
+    assert leaf.parallel_fold(leaf_sum, node_sum, workers=workers) == 3
+
+
+def test_parallel_workers():
+    with pytest.raises(ValueError):
+        Tree(1).parallel_map(square, workers=0)
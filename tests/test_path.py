@@ -0,0 +1,35 @@
+import pytest
+
+from justree import IndexPath
+
+
+def test_index_path_as_tuple():
+    root = IndexPath()
+    path = IndexPath(IndexPath(IndexPath(root, 1), 0), 2)
+
+    assert root == () and len(root) == 0 and not root
+    assert path == (1, 0, 2)
+    assert path.to_tuple() == (1, 0, 2)
+    assert len(path) == 3
+    assert list(path) == [1, 0, 2]
+    assert path[-1] == 2 and path[:2] == (1, 0)
+    assert path.parent == (1, 0)
+    assert hash(path) == hash((1, 0, 2))
+    assert {(1, 0, 2): 'x'}[path] == 'x'
+    assert path + (5,) == (1, 0, 2, 5)
+    assert (5,) + path == (5, 1, 0, 2)
+    assert repr(path) == 'IndexPath(1, 0, 2)'
+
+
+def test_index_path_compare():
+    a = IndexPath(IndexPath(IndexPath(), 1), 0)
+    b = IndexPath(IndexPath(IndexPath(), 1), 0)
+    c = IndexPath(a.parent, 1)
+
+    assert a == b and not a != b
+    assert a != c and a < c and c > b
+    assert a != (1,) and a != (1, 0, 0)
+    assert a < (1, 1) and a >= (1, 0)
+    assert a != 'x'
+    with pytest.raises(TypeError):
+        _ = a < 'x'
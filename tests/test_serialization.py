@@ -0,0 +1,67 @@
+import io
+
+import pytest
+
+from justree import Tree
+from justree.serialization import IntCodec, StrCodec, BytesCodec, ValueCodec
+
+TPL = ("a", [(2, [(3, [("a", []), ("b", [])])]), (4.5, []), (None, [])])
+
+
+def test_dump_load():
+    tree = Tree.from_tuple(TPL)
+    fp = io.BytesIO()
+    tree.dump(fp)
+    assert fp.getvalue().startswith(b'JTRE\x01')
+    fp.seek(0)
+    assert Tree.load(fp) == tree
+    assert fp.read() == b''
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 1000])
+def test_dump_load_chunks(chunk_size):
+    tree = Tree(0, [Tree(i, [Tree(-i * 10 ** 30)]) for i in range(1, 10)])
+    fp = io.BytesIO()
+    tree.dump(fp, IntCodec(), chunk_size=chunk_size)
+    fp.seek(0)
+    assert Tree.load(fp, IntCodec()) == tree
+
+
+def test_codecs():
+    for codec, values in ((StrCodec(), ['', 'ascii', 'юникод']), (BytesCodec(), [b'', b'\x00\xff']),
+                          (IntCodec(), [0, -1, 255, -256, 2 ** 100])):
+        for v in values:
+            assert codec.decode(memoryview(codec.encode(v))) == v
+
+    with pytest.raises(TypeError):
+        ValueCodec()
+
+    class EncodeOnly(ValueCodec):
+        def encode(self, value):
+            return b''
+
+    with pytest.raises(TypeError):
+        EncodeOnly()
+
+
+def test_load_errors():
+    fp = io.BytesIO()
+    Tree.from_tuple(TPL).dump(fp)
+    data = fp.getvalue()
+
+    with pytest.raises(ValueError):
+        Tree.load(io.BytesIO(b'XXXX' + data[4:]))
+    with pytest.raises(ValueError):
+        Tree.load(io.BytesIO(data[:4] + b'\x09' + data[5:]))
+    with pytest.raises(ValueError):
+        Tree.load(io.BytesIO(data[:-7]))
+
+
+def test_dump_deep_tree():
+    deep = Tree(0)
+    for i in range(1, 50_000):
+        deep = Tree(i, (deep,))
+    fp = io.BytesIO()
+    deep.dump(fp, IntCodec())
+    fp.seek(0)
+    assert Tree.load(fp, IntCodec()) == deep
@@ -1,6 +1,15 @@
+import io
+import os
+import pickle
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
-from justree import Tree
+from justree import Tree, TreeIsFrozenError, TreeIsNotFrozenError, TreeIsNotLinkedError
+from justree.tree import non_recursive_tree_size, non_recursive_tree_height
+from justree.tree_node import TreeNode
 from typing import Tuple, List
 
 
@@ -46,10 +55,17 @@ def test_tree_hash():
     tree.insert((0, 0), Tree(value=3))
     tree.freeze()
     initialized_tree = Tree.from_tuple(tpl)
-    initialized_tree.append(Tree(value=3))
+    initialized_tree[0].append(Tree(value=3))
     initialized_tree.freeze()
     assert hash(tree) == hash(initialized_tree)
 
+    # Check hash depends on shape of tree, not only on order of values
+    initialized_tree = Tree.from_tuple(tpl)
+    initialized_tree.append(Tree(value=3))
+    initialized_tree.freeze()
+    assert tree != initialized_tree
+    assert hash(tree) != hash(initialized_tree)
+
 
 def test_tree_str():
     tpl = (1, [(2, []), ])
@@ -326,3 +342,561 @@ def test_tree_to_tuple():
 def test_freeze_assert():
     with pytest.raises(AssertionError):
         hash(Tree(None))
+
+
+def test_tree_slots():
+    tree = Tree.from_tuple((1, [(2, []), ]))
+
+    # Check nodes are stored without per-instance dict
+    assert not hasattr(tree, '__dict__')
+    with pytest.raises(AttributeError):
+        tree.unknown_attribute = 1
+
+    # Check Tree sets all fields of TreeNode without calling its constructor
+    node = TreeNode.__new__(TreeNode)
+    TreeNode.__init__(node)
+    assert TreeNode.__slots__ == ('_children',) and node._children == [] and tree[0]._children == []
+
+    # Check cache fields still default to None
+    assert tree._hash is None
+    assert tree._size is None
+    assert tree._height is None
+
+
+def test_tree_write_to():
+    tpl = ("a", [(2, [(3, [("a", []), ("b", [])])]), (4, [])])
+    tree = Tree.from_tuple(tpl)
+
+    # Check streamed output matches str and repr
+    fp = io.StringIO()
+    tree.write_to(fp)
+    assert fp.getvalue() == str(tree) == "(a (2 (3 (a) (b))) (4))"
+
+    fp = io.StringIO()
+    tree.write_to(fp, representation=True)
+    assert fp.getvalue() == repr(tree)
+    assert eval(fp.getvalue()) == tree
+
+    # Check deep trees do not hit recursion limit
+    deep = Tree(0)
+    for i in range(1, 5000):
+        deep = Tree(i, (deep,))
+    assert str(deep).count('(') == 5000
+    assert eval(repr(Tree(1))) == Tree(1)
+
+
+def test_tree_ex_paths():
+    tpl = ("a", [(2, [(3, [("a", []), ("b", [])])]), (4, [])])
+    tree = Tree.from_tuple(tpl)
+
+    for traversal in (tree.bfs_ex, tree.dfs_ex):
+        for kwargs in ({}, {'reverse': True}, {'mirror': True}, {'depth': 3}):
+            expected = [(str(t), d, i) for t, d, i in traversal(**kwargs)]
+
+            # Check lazy paths are equal to tuple paths
+            lazy = [(str(t), d, i) for t, d, i in traversal(paths='lazy', **kwargs)]
+            assert lazy == expected
+            assert [tree[i] for _, _, i in traversal(paths='lazy', **kwargs)] == \
+                   [tree[i] for _, _, i in traversal(**kwargs)]
+
+            # Check depth is kept without paths
+            assert [(str(t), d, None) for t, d, _ in expected] == \
+                   [(str(t), d, i) for t, d, i in traversal(paths='none', **kwargs)]
+
+    assert [(t.value, d, i) for t, d, i in tree.dfs_ex(post_order=True, paths='lazy')] == \
+           [(t.value, d, i) for t, d, i in tree.dfs_ex(post_order=True)]
+
+    # Check lazy paths are accepted as indices
+    _, _, path = list(tree.dfs_ex(paths='lazy'))[-2]
+    assert path == (0, 0, 1)
+    assert tree[path].value == "b"
+    tree[path] = Tree(10)
+    assert tree[path].value == 10
+    del tree[path]
+
+    with pytest.raises(ValueError):
+        list(tree.bfs_ex(paths='list'))
+
+
+def test_tree_frozen_errors():
+    tree = Tree.from_tuple((1, [(2, []), ]))
+    with pytest.raises(TreeIsNotFrozenError):
+        hash(tree)
+
+    tree.freeze()
+    for mutate in (lambda: tree.append(Tree(3)), lambda: tree.emplace(3), lambda: tree.insert(0, Tree(3)),
+                   lambda: tree.__setitem__(0, Tree(3)), lambda: tree.__delitem__(0)):
+        with pytest.raises(TreeIsFrozenError):
+            mutate()
+    assert tree == Tree.from_tuple((1, [(2, []), ]))
+
+
+def test_tree_equals_frozen_shortcuts():
+    tree_1 = Tree.from_tuple((1, [(2, [(3, [])]), (4, [])]))
+    tree_2 = Tree.from_tuple((1, [(2, [(3, [])]), (4, [])]))
+    tree_1.freeze()
+    tree_2.freeze()
+    assert tree_1 == tree_2
+    assert tree_1.size() == tree_2.size() and hash(tree_1) == hash(tree_2)
+    assert tree_1 == tree_2
+
+    # Check shared subtrees and different sizes
+    tree_3 = Tree(1, (tree_1[0], Tree(4, (Tree(5),))))
+    tree_3.freeze()
+    assert tree_3.size() != tree_1.size()
+    assert tree_3 != tree_1
+    assert tree_3[0] == tree_1[0]
+    assert tree_1 != 1
+
+
+def test_tree_optimized_mode():
+    # Check equality and frozen guards do not depend on assert statements
+    code = '\n'.join([
+        'from justree import Tree, TreeIsFrozenError',
+        'assert False, "asserts are enabled"',
+        'tree = Tree.from_tuple((1, [(2, []), ]))',
+        'if tree == Tree.from_tuple((1, [(3, []), ])): raise SystemExit(1)',
+        'if tree != Tree.from_tuple((1, [(2, []), ])): raise SystemExit(2)',
+        'tree.freeze()',
+        'try: tree.append(Tree(3))',
+        'except TreeIsFrozenError: pass',
+        'else: raise SystemExit(3)',
+    ])
+    result = subprocess.run([sys.executable, '-O', '-c', code],
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.returncode == 0
+
+
+def test_tree_hash_incremental():
+    class Value:
+        hashed = 0
+
+        def __init__(self, v):
+            self.v = v
+
+        def __eq__(self, o):
+            return self.v == o.v
+
+        def __hash__(self):
+            Value.hashed += 1
+            return hash(self.v)
+
+    left = Tree.from_tuple((Value(1), [(Value(2), []), (Value(3), [])]))
+    right = Tree.from_tuple((Value(4), [(Value(5), [])]))
+    left.freeze()
+    right.freeze()
+    hash(left)
+    hash(right)
+    assert Value.hashed == 5
+
+    # Check only new nodes are hashed on top of frozen subtrees
+    Value.hashed = 0
+    tree = Tree(Value(0), (left, right))
+    tree.freeze()
+    hash(tree)
+    assert Value.hashed == 1
+    assert hash(tree) == hash(Tree.from_tuple(tree.to_tuple()).freeze(compact=True))
+
+
+def test_tree_preorder():
+    tpl = ("a", [(2, [(3, [("a", []), ("b", [])])]), (4, [])])
+    tree = Tree.from_tuple(tpl)
+    values, counts = tree.to_preorder()
+    assert values == ["a", 2, 3, "a", "b", 4]
+    assert list(counts) == [2, 1, 2, 0, 0, 0]
+    assert Tree.from_preorder(values, counts) == tree
+
+    with pytest.raises(ValueError):
+        Tree.from_preorder(["a", 2], [2, 0])
+    with pytest.raises(ValueError):
+        Tree.from_preorder(["a", 2], [0, 0])
+    with pytest.raises(ValueError):
+        Tree.from_preorder([], [])
+
+
+def test_tree_pickle():
+    tpl = ("a", [(2, [(3, [("a", []), ("b", [])])]), (4, [])])
+    tree = Tree.from_tuple(tpl)
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        restored = pickle.loads(pickle.dumps(tree, protocol))
+        assert restored == tree
+        assert restored._is_frozen == False
+
+    # Check frozen state is kept
+    tree.freeze()
+    restored = pickle.loads(pickle.dumps(tree))
+    assert restored == tree
+    assert restored._is_frozen and restored[(0, 0, 1)]._is_frozen
+    assert hash(restored) == hash(tree)
+
+    # Check degenerate deep tree does not hit recursion limit
+    deep = Tree(0)
+    for i in range(1, 100_000):
+        deep = Tree(i, (deep,))
+    restored = pickle.loads(pickle.dumps(deep))
+    assert restored.height() == 100_000
+    assert restored == deep
+
+
+def test_tree_augment():
+    def check(tree):
+        for t in tree.dfs():
+            assert t._is_augmented
+            assert t.size() == non_recursive_tree_size(t)
+            assert t.height() == non_recursive_tree_height(t)
+            assert all(c._parent is t for c in t._children)
+
+    tree = Tree.from_tuple(("a", [(2, [(3, [("a", []), ("b", [])])]), (4, [])]))
+    tree.augment()
+    check(tree)
+    assert tree.size() == 6 and tree.height() == 4
+
+    # Check every mutator keeps aggregates of all ancestors
+    tree[(0, 0)].append(Tree.from_tuple((5, [(6, [(7, [])])])))
+    check(tree)
+    assert tree.size() == 9 and tree.height() == 6
+    tree[(0, 0, 2, 0, 0)].emplace(8)
+    check(tree)
+    assert tree.height() == 7
+    tree.insert((1, 0), Tree(9))
+    check(tree)
+    tree[(0, 0)] = Tree(10)
+    check(tree)
+    assert tree.size() == 5 and tree.height() == 3
+    del tree[(1, 0)]
+    check(tree)
+    assert tree.size() == 4 and tree.height() == 3
+    tree[0] = tree[0]
+    check(tree)
+
+    # Heights drop only when the highest child is removed, equally high siblings keep it
+    wide = Tree.from_tuple((0, [(1, [(2, [])]), (3, [(4, [])]), (5, [])]))
+    wide.augment()
+    del wide[0]
+    check(wide)
+    assert wide.height() == 3
+    del wide[0]
+    check(wide)
+    assert wide.height() == 2 and wide.size() == 2
+
+    # Check aggregates survive freezing
+    tree.freeze()
+    tree.unfreeze(unsafe=True)
+    check(tree)
+    assert tree == Tree.from_tuple(("a", [(2, [(10, [])]), (4, [])]))
+
+
+def test_tree_link():
+    def check(tree):
+        for t, _, p in tree.dfs_ex():
+            assert t._is_linked
+            assert t.path() == p
+            assert t.root() is tree
+            assert tree[t.path()] is t
+            assert list(t.ancestors()) == [tree[p[:k]] for k in range(len(p) - 1, -1, -1)]
+
+    tree = Tree.from_tuple(("a", [(2, [(3, [("a", []), ("a", [])])]), (4, [])]))
+    with pytest.raises(TreeIsNotLinkedError):
+        tree[0].parent
+    tree.link()
+    check(tree)
+    assert tree.parent is None and tree[(0, 0)].parent is tree[0]
+    # Equal siblings are told apart by identity
+    assert tree[(0, 0, 1)].path() == (0, 0, 1)
+
+    # Check every mutator keeps links
+    tree[(0, 0)].append(Tree.from_tuple((5, [(6, [])])))
+    check(tree)
+    tree[(0, 0, 2)].emplace(7)
+    check(tree)
+    tree.insert((1, 0), Tree(8))
+    check(tree)
+    old = tree[(0, 0)]
+    tree[(0, 0)] = Tree(9)
+    check(tree)
+    assert old.parent is None and old[0].parent is old
+    moved = tree[(1, 0)]
+    del tree[(1, 0)]
+    check(tree)
+    assert moved.parent is None and moved.root() is moved
+    tree.insert(0, old)
+    check(tree)
+    assert not tree._is_augmented
+
+
+def test_tree_find():
+    tpl = (1, [(2, [(3, []), (2, [])]), (4, [(2, [])])])
+    for frozen in (False, True):
+        tree = Tree.from_tuple(tpl)
+        if frozen:
+            tree.freeze()
+        assert tree.find(2) == (0,) and tree.find(7) is None and tree.find(1) == ()
+        assert tree.find_all(2) == ((0,), (0, 1), (1, 0))
+        assert tree.find_all(1, key=lambda v: v % 2) == ((), (0, 0))
+        assert tree.find(True, key=lambda v: v > 3) == (1,)
+        assert tree.find_all(2.0) == tree.find_all(2)
+        assert tree.index_by()[3] == ((0, 0),)
+        assert all(tree[p].value == 2 for p in tree.find_all(2))
+
+    # Searches by custom key do not build indexes, index_by() does and they use it until unfreeze
+    def parity(v):
+        return v % 2
+    assert tree.find_all(1, parity) == ((), (0, 0)) and set(tree._cache['index']) == {None}
+    assert tree.index_by(parity) is tree.index_by(parity)
+    assert tree.find_all(1, parity) == ((), (0, 0)) and set(tree._cache['index']) == {None, parity}
+    tree.unfreeze(unsafe=True)
+    tree[0].emplace(5)
+    assert tree.find_all(1, parity) == ((), (0, 0), (0, 2))
+    tree.freeze()
+    assert tree.find_all(1, parity) == ((), (0, 0), (0, 2))
+
+    # Unhashable values are searched by traversal
+    tree = Tree.from_tuple(([1], [([2], []), ([1], [])]))
+    tree.freeze()
+    assert tree.find_all([1]) == ((), (1,))
+    assert tree.find(2, key=len) is None
+    with pytest.raises(TypeError):
+        tree.index_by()
+
+
+@pytest.mark.parametrize('reverse', [False, True])
+@pytest.mark.parametrize('mirror', [False, True])
+def test_tree_descend(reverse, mirror):
+    tree = Tree.from_tuple((1, [(2, [(3, [(4, [])]), (5, [(6, [])])]), (7, [(8, [])]), (9, [])]))
+    visited = []
+
+    def descend(t):
+        visited.append(t.value)
+        return t.value not in (3, 7)
+
+    def pruned(nodes):
+        # nodes having all proper ancestors accepted by predicate
+        return [(t.value, d, p) for t, d, p in nodes
+                if all(tree[p[:k]].value not in (3, 7) for k in range(len(p)))]
+
+    assert [t.value for t in tree.bfs(reverse, mirror, descend)] == \
+           [v for v, _, _ in pruned(tree.bfs_ex(reverse=reverse, mirror=mirror))]
+    assert [(t.value, d, p) for t, d, p in tree.bfs_ex(None, reverse, mirror, descend=descend)] == \
+           pruned(tree.bfs_ex(reverse=reverse, mirror=mirror))
+    assert [(t.value, d, p) for t, d, p in tree.dfs_ex(None, reverse, mirror, descend=descend)] == \
+           pruned(tree.dfs_ex(reverse=reverse, mirror=mirror))
+    if not reverse:
+        assert [t.value for t in tree.dfs(mirror=mirror, post_order=True, descend=descend)] == \
+               [v for v, _, _ in pruned(tree.dfs_ex(mirror=mirror, post_order=True))]
+
+    # Check subtrees of rejected nodes are not even visited
+    visited.clear()
+    assert [t.value for t in tree.dfs(reverse, mirror, descend=descend)] == \
+           [v for v, _, _ in pruned(tree.dfs_ex(reverse=reverse, mirror=mirror))]
+    assert sorted(visited) == [1, 2, 3, 5, 6, 7, 9]
+
+    # Depth limit and predicate work together
+    assert [t.value for t, _, _ in tree.bfs_ex(2, descend=lambda t: t.value != 2)] == [1, 2, 7, 9]
+
+
+def test_tree_fold():
+    tree = Tree.from_tuple((1, [(2, [(3, []), (4, [])]), (5, [(6, [])])]))
+    assert tree.fold(lambda v: 1, lambda v, r: 1 + sum(r)) == tree.size()
+    assert tree.fold(lambda v: 1, lambda v, r: 1 + max(r)) == tree.height()
+    assert tree.fold(lambda v: v, lambda v, r: max(v, *r)) == 6
+    assert tree.fold(lambda v: (v, []), lambda v, r: (v, list(r))) == tree.to_tuple()
+    assert Tree(7).fold(str, lambda v, r: None) == '7'
+
+    # Deep trees are folded without recursion
+    deep = Tree(0)
+    t = deep
+    for i in range(1, 100_000):
+        t.emplace(i)
+        t = t[0]
+    assert deep.fold(lambda v: 1, lambda v, r: r[0] + 1) == 100_000
+
+    # Results of frozen subtrees are memoized per functions
+    calls = []
+
+    def leaf(v):
+        calls.append(v)
+        return v
+
+    def combine(v, r):
+        calls.append(v)
+        return v + sum(r)
+
+    tree[1].freeze()
+    assert tree.fold(leaf, combine, memoize=True) == 21
+    assert tree.fold(leaf, combine, memoize=True) == 21
+    assert calls == [6, 5, 4, 3, 2, 1, 4, 3, 2, 1]
+    tree[1].unfreeze(unsafe=True)
+    tree[1].emplace(7)
+    assert tree.fold(leaf, combine, memoize=True) == 28
+
+    # Explicit key shares results between fresh function objects
+    calls.clear()
+    tree.freeze()
+    for _ in range(2):
+        assert tree.fold(lambda v: leaf(v), lambda v, r: combine(v, r), memo_key='sum') == 28
+    assert len(calls) == 7 and all(len(t._cache['fold']) == 1 for t in tree.dfs())
+
+
+def test_tree_map_values():
+    tree = Tree.from_tuple((1, [(2, [(3, []), (4, [])]), (5, [])]))
+    tree.freeze()
+    mapped = tree.map_values(str)
+    assert mapped.to_tuple() == ('1', [('2', [('3', []), ('4', [])]), ('5', [])])
+    assert not mapped._is_frozen
+    mapped[0].emplace('6')
+    assert tree.size() == 5
+
+
+def test_tree_bulk_builders():
+    tpl = (1, [(2, [(3, []), (4, [(5, [])])]), (6, []), (7, [(8, [])])])
+    tree = Tree.from_tuple(tpl)
+    assert tree.to_tuple() == tpl and not tree._is_frozen
+
+    # Parent links in any order
+    nodes = list(tree.bfs_ex())
+    numbers = {p: k for k, (_, _, p) in enumerate(nodes)}
+    parents = [numbers[p[:-1]] if p else -1 for _, _, p in nodes]
+    assert Tree.from_parents([t.value for t, _, _ in nodes], parents) == tree
+    assert Tree.from_parents('bca', [2, 2, -1]) == Tree.from_tuple(('a', [('b', []), ('c', [])]))
+    for values, parents in [('ab', [-1, -1]), ('ab', [-1, 2]), ('abc', [-1, 2, 1]),
+                            ('ab', [-1]), ('ab', [1, 0])]:
+        with pytest.raises(ValueError):
+            Tree.from_parents(values, parents)
+
+    # Paths of breadth and depth first traversals
+    assert Tree.from_paths((p, t.value) for t, _, p in tree.bfs_ex()) == tree
+    assert Tree.from_paths((p, t.value) for t, _, p in tree.dfs_ex(paths='lazy')) == tree
+    for pairs in [[], [((0,), 1)], [((), 1), ((1,), 2)], [((), 1), ((0, 0), 2)], [((), 1), ((), 2)]]:
+        with pytest.raises(ValueError):
+            Tree.from_paths(pairs)
+
+    # Nested dicts
+    assert Tree.from_dict({1: {2: {3: None, 4: {5: {}}}, 6: None, 7: {8: None}}}) == tree
+    assert Tree.from_dict({'a': None}) == Tree('a')
+    with pytest.raises(ValueError):
+        Tree.from_dict({1: None, 2: None})
+
+    # Builders keep the class of tree
+    class SubTree(Tree):
+        __slots__ = ()
+    assert type(SubTree.from_tuple(tpl)[(1,)]) is SubTree
+    assert type(SubTree.from_dict({1: {2: None}})[0]) is SubTree
+
+
+def test_tree_records():
+    tpl = (1, [(2, [(3, []), (4, [(5, [])])]), (6, []), (7, [(8, [])])])
+    tree = Tree.from_tuple(tpl)
+    records = tree.to_records()
+    assert not isinstance(records, (list, tuple))
+    records = list(records)
+    assert records == [(d, t.value) for t, d, _ in tree.dfs_ex()]
+    assert Tree.from_records(iter(records)) == tree
+    assert Tree.from_records([(1, 'a')]) == Tree('a')
+
+    # Records are piped through text lines without nested structure
+    stream = io.StringIO(''.join(f'{d} {v}\n' for d, v in tree.to_records()))
+    assert Tree.from_records((int(d), int(v)) for d, v in map(str.split, stream)) == tree
+
+    for bad in [[], [(2, 1)], [(1, 1), (1, 2)], [(1, 1), (3, 2)], [(1, 1), (2, 2), (0, 3)]]:
+        with pytest.raises(ValueError):
+            Tree.from_records(bad)
+
+
+def test_tree_copy_sharing():
+    shared = Tree.from_tuple(([1], [(2, []), (3, [])]))
+    tree = Tree(0, [shared, Tree(4, [shared])])
+
+    for copied in (tree.clone(), tree.clone(deep=True)):
+        assert copied == tree
+        assert copied[0] is copied[(1, 0)] and copied[0] is not shared
+        assert type(copied) is Tree and not copied._is_frozen
+    assert tree.clone()[0].value is shared.value
+    deep = tree.clone(deep=True)
+    assert deep[0].value is not shared.value and deep[0].value == [1]
+
+    # Values shared by nodes stay shared in deep copy
+    value = [1]
+    tree = Tree(value, [Tree(value), Tree('a')])
+    deep = tree.clone(deep=True)
+    assert deep.value is deep[0].value and deep.value is not value
+
+
+def test_tree_cow():
+    tpl = (1, [(2, [(3, []), (4, [])]), (5, [(6, [])])])
+    frozen = Tree.from_tuple(tpl)
+    with pytest.raises(TreeIsNotFrozenError):
+        frozen.unfreeze(cow=True)
+    frozen.freeze()
+    cow = frozen.unfreeze(cow=True)
+    assert cow == frozen and not cow._is_frozen
+    assert cow[0] is frozen[0] and cow[1] is frozen[1]
+
+    # Only nodes along the path are copied
+    cow.insert((0, 1, 0), Tree(7))
+    assert cow[0] is not frozen[0] and cow[(0, 1)] is not frozen[(0, 1)]
+    assert cow[(0, 0)] is frozen[(0, 0)] and cow[1] is frozen[1]
+    cow[(1, 0)] = Tree(8)
+    del cow[(0, 0)]
+    cow.thaw((1, 0)).emplace(9)
+    cow.emplace(10)
+    assert frozen.to_tuple() == tpl and frozen._is_frozen and frozen[(0, 1)]._is_frozen
+    assert cow.to_tuple() == (1, [(2, [(4, [(7, [])])]), (5, [(8, [(9, [])])]), (10, [])])
+
+    # Switching whole clone to writable or linked mode copies the rest of shared nodes
+    cow = frozen.unfreeze(cow=True)
+    cow.freeze()
+    cow.unfreeze(unsafe=True)
+    assert frozen[0]._is_frozen and not cow[(0, 0)]._is_frozen and cow == frozen
+    cow = frozen.unfreeze(cow=True)
+    cow.link()
+    assert frozen[(0, 0)]._parent is None and cow[(0, 0)].parent is cow[0]
+    cow = frozen.unfreeze(cow=True)
+    cow.augment()
+    assert cow.size() == 6 and not frozen[0]._is_augmented
+
+
+def test_tree_finalize():
+    tpl = (1, [(2, [(3, []), (4, [])]), (5, [(6, [(7, [])])])])
+    tree = Tree.from_tuple(tpl)
+    tree.finalize()
+    assert tree._is_frozen
+    caches = [(t._hash, t._size, t._height) for t in tree.dfs()]
+    lazy = Tree.from_tuple(tpl)
+    lazy.freeze()
+    assert caches == [(hash(t), non_recursive_tree_size(t), non_recursive_tree_height(t)) for t in lazy.dfs()]
+
+    # Concurrent readers see the same results and write nothing but atomically published indexes
+    def read(i):
+        t = tree[(i % 2,)]
+        return hash(tree), tree.size(), t.height(), tree.find(i % 7 + 1), id(tree.lca_index())
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(read, range(100)))
+    assert results == [read(i) for i in range(100)]
+    assert [(t._hash, t._size, t._height) for t in tree.dfs()] == caches
+
+    unhashable = Tree.from_tuple(([1], [(2, [])]))
+    unhashable.finalize()
+    assert unhashable.size() == 2 and unhashable._hash is None
+    with pytest.raises(TypeError):
+        hash(unhashable)
+
+
+@pytest.mark.parametrize('mirror', [False, True])
+@pytest.mark.parametrize('size', [1, 2, 3, 5, 100])
+def test_tree_batches(mirror, size):
+    tree = Tree.from_tuple((1, [(2, [(3, [(4, [])]), (5, [(6, [])])]), (7, [(8, [])]),
+                                (9, [(10, []), (11, [])])]))
+    for descend in (None, lambda t: t.value != 5):
+        batches = list(tree.bfs_batches(size, mirror, descend))
+        assert [t for b in batches for t in b] == list(tree.bfs(mirror=mirror, descend=descend))
+        assert all(len(b) == size for b in batches[:-1]) and 0 < len(batches[-1]) <= size
+        batches = list(tree.dfs_batches(size, mirror, descend))
+        assert [t for b in batches for t in b] == list(tree.dfs(mirror=mirror, descend=descend))
+        assert all(len(b) == size for b in batches[:-1]) and 0 < len(batches[-1]) <= size
+
+    levels = list(tree.levels(mirror))
+    assert [[t.value for t in level] for level in levels] == \
+           [[t.value for t, d, _ in tree.bfs_ex(mirror=mirror) if d == k] for k in range(1, 5)]
+    assert [len(level) for level in tree.levels(mirror, lambda t: t.value != 2)] == [1, 3, 3]
+    with pytest.raises(ValueError):
+        tree.bfs_batches(0)